@@ -0,0 +1,59 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+
+def run(events: int, window: float):
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        openkit = OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, transport=LocalSinkTransport(directory),
+                          event_aggregation_window=window or None)
+        openkit.wait_for_init_completion(5000)
+        session = openkit.create_session("127.0.0.1")
+        action = session.enter_action("incident")
+
+        start = time.perf_counter()
+        for i in range(events):
+            action.report_error("upstream timeout", 504, "connection reset")
+            action.trace_web_request("https://example.com/health").start().stop(503)
+        elapsed = time.perf_counter() - start
+        cache_size = openkit._beacon_cache.cache_size
+
+        action.leave_action()
+        session.end()
+        openkit.shutdown(timeout=30)
+
+        with open(os.path.join(directory, "beacons.ndjson"), encoding="UTF-8") as file:
+            uploaded = sum(len(json.loads(line)["body"] or "") for line in file)
+
+    label = f"window {window}s" if window else "no aggregation"
+    print(f"{label}: {events} errors and {events} web requests")
+    print(f"  {elapsed:.2f}s ({2 * events / elapsed:,.0f} events/s)")
+    print(f"  cache size before sending: {cache_size:,} bytes")
+    print(f"  uploaded: {uploaded:,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache and upload size of repeated errors and web requests")
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--window", type=float, default=60.0, help="aggregation window in seconds")
+    args = parser.parse_args()
+
+    run(args.events, 0)
+    run(args.events, args.window)
+
+
+if __name__ == "__main__":
+    main()
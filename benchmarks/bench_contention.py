@@ -0,0 +1,60 @@
+import argparse
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Many threads reporting into one session")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--actions", type=int, default=200, help="root actions per thread")
+    parser.add_argument("--events", type=int, default=20, help="events and values per action")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        openkit = OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, transport=LocalSinkTransport(directory))
+        openkit.wait_for_init_completion(5000)
+        session = openkit.create_session("127.0.0.1")
+
+        barrier = threading.Barrier(args.threads + 1)
+
+        def worker():
+            barrier.wait()
+            for _ in range(args.actions):
+                action = session.enter_action("action")
+                for i in range(args.events):
+                    action.report_event("event")
+                    action.report_value("value", i)
+                action.leave_action()
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        session.end()
+        openkit.shutdown(timeout=30)
+
+    operations = args.threads * args.actions * (2 * args.events + 2)
+    print(f"threads: {args.threads}, operations: {operations}")
+    print(f"  {elapsed:.2f}s ({operations / elapsed:,.0f} operations/s)")
+
+
+if __name__ == "__main__":
+    main()
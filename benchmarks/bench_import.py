@@ -0,0 +1,48 @@
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STATEMENTS = {
+    "import openkit": "import openkit",
+    "from openkit import OpenKit": "from openkit import OpenKit",
+}
+
+
+def import_time_us(statement: str, module: str) -> int:
+    # -X importtime reports on stderr: "import time: self [us] | cumulative | imported package"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f"{module} not found in the -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of the openkit package, measured with -X importtime")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="exit with status 1 when the median of 'from openkit import OpenKit' exceeds this budget")
+    args = parser.parse_args()
+
+    medians = {}
+    for name, statement in STATEMENTS.items():
+        module = "openkit" if statement == "import openkit" else "openkit.api.openkit"
+        import_time_us(statement, module)  # writes the bytecode caches
+        timings = [import_time_us(statement, module) for _ in range(args.runs)]
+        medians[name] = statistics.median(timings) / 1000
+        print(f"{name:<30} median {medians[name]:7.2f} ms, min {min(timings) / 1000:7.2f} ms")
+
+    # The budget guards the import a program actually does, "import openkit" alone loads nothing of the SDK
+    if args.budget_ms is not None and medians["from openkit import OpenKit"] > args.budget_ms:
+        print(f"'from openkit import OpenKit' exceeds the budget of {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
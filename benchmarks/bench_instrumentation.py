@@ -0,0 +1,100 @@
+import argparse
+import http.client
+import logging
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.instrumentation import instrument_http_client, traced_by, uninstrument_http_client  # noqa: E402
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, with Nagle every response would wait for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("content-length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def per_request(port: int, requests: int, rounds: int = 3) -> float:
+    # The server shares the interpreter, the best round is the one least disturbed by its threads
+    best = None
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            connection.request("GET", "/health")
+            connection.getresponse().read()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    connection.close()
+    return best / requests * 1e6
+
+
+def per_call(function, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead of the http.client instrumentation per request")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    with tempfile.TemporaryDirectory() as directory:
+        openkit = OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, transport=LocalSinkTransport(directory))
+        openkit.wait_for_init_completion(5000)
+        session = openkit.create_session("127.0.0.1")
+        action = session.enter_action("action")
+
+        # Warm up the connection handling of the server
+        per_request(port, args.requests // 10)
+        plain = per_request(port, args.requests)
+        instrument_http_client()
+        untraced = per_request(port, args.requests)
+        with traced_by(action):
+            traced = per_request(port, args.requests)
+        uninstrument_http_client()
+
+        tag = per_call(lambda: action.trace_web_request("https://example.com").get_tag(), args.calls)
+
+        action.leave_action()
+        session.end()
+        openkit.shutdown(timeout=30)
+
+    server.shutdown()
+    server.server_close()
+
+    print(f"requests: {args.requests}")
+    print(f"  not instrumented: {plain:8.1f}us per request")
+    print(f"  no current parent: {untraced:7.1f}us per request ({untraced - plain:+.1f}us)")
+    print(f"  traced: {traced:18.1f}us per request ({traced - plain:+.1f}us)")
+    print(f"trace_web_request + get_tag: {tag:.2f}us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import gc
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.core.caching import BeaconCache  # noqa: E402
+from openkit.core.caching.beacon_key import BeaconKey  # noqa: E402
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+RECORD_DATA = "et=1&na=bench&it=1&pa=0&s0=1&t0=100"
+
+
+def measure(create):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = create()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    start = time.perf_counter()
+    gc.collect()
+    gc_time = time.perf_counter() - start
+    return objects, allocated, gc_time
+
+
+def bench_cache_records(count: int):
+    logger = logging.getLogger("bench")
+    cache = BeaconCache(logger)
+    key = BeaconKey(1, 0)
+
+    def create():
+        for _ in range(count):
+            # Fresh timestamp and payload per record, like the beacon creates them
+            cache.add_event(key, datetime.now(), RECORD_DATA[:-1] + "0")
+        return cache
+
+    _, allocated, gc_time = measure(create)
+    payload = sys.getsizeof(RECORD_DATA)
+    print(f"cache records: {count}")
+    print(f"  bytes per record: {allocated / count:.0f} (payload string {payload})")
+    print(f"  full gc: {gc_time * 1000:.1f}ms")
+
+
+def bench_open_sessions(count: int):
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        openkit = OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, transport=LocalSinkTransport(directory))
+        openkit.wait_for_init_completion(5000)
+
+        def create():
+            sessions = []
+            for _ in range(count):
+                session = openkit.create_session("127.0.0.1")
+                action = session.enter_action("action")
+                action.trace_web_request("https://example.com").start()
+                sessions.append(session)
+            return sessions
+
+        _, allocated, gc_time = measure(create)
+        openkit.shutdown(timeout=30)
+
+    print(f"open sessions (one action and one web request each): {count}")
+    print(f"  bytes per session: {allocated / count:.0f}")
+    print(f"  full gc: {gc_time * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used per cached beacon record and per open session")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    args = parser.parse_args()
+
+    bench_cache_records(args.records)
+    bench_open_sessions(args.sessions)
+
+
+if __name__ == "__main__":
+    main()
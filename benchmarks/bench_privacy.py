@@ -0,0 +1,63 @@
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.core.configuration.privacy_configuration import (CrashReportingLevel, DataCollectionLevel,  # noqa: E402
+                                                              PrivacyConfiguration)
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+
+def per_call(function, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def bench_level(level: DataCollectionLevel, calls: int):
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        privacy_config = PrivacyConfiguration(level, CrashReportingLevel.OPT_IN_CRASHES)
+        openkit = OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, privacy_config=privacy_config,
+                          transport=LocalSinkTransport(directory))
+        openkit.wait_for_init_completion(5000)
+        session = openkit.create_session("127.0.0.1")
+        action = session.enter_action("action")
+
+        results = {
+            "report_event": per_call(lambda: action.report_event("event"), calls),
+            "report_value": per_call(lambda: action.report_value("value", 42), calls),
+            "report_error": per_call(lambda: action.report_error("error", 500, "reason"), calls),
+            "identify_user": per_call(lambda: session.identify_user("user"), calls),
+            "trace_web_request": per_call(lambda: action.trace_web_request("https://example.com").start().stop(200),
+                                          calls),
+        }
+
+        action.leave_action()
+        session.end()
+        openkit.shutdown(timeout=30)
+
+    print(f"{level.name}:")
+    for name, nanoseconds in results.items():
+        print(f"  {name:<18} {nanoseconds / 1000:6.2f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per call cost of the reporting API at each data collection level")
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for level in DataCollectionLevel:
+        bench_level(level, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open and close many sessions under one OpenKit instance")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=10_000, help="sessions kept open at the same time")
+    parser.add_argument("--requests", type=int, default=100_000,
+                        help="request scoped sessions: create, one action, end")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        openkit = OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, transport=LocalSinkTransport(directory))
+        openkit.wait_for_init_completion(5000)
+
+        open_time = close_time = 0.0
+        remaining = args.sessions
+        while remaining > 0:
+            batch = min(args.batch, remaining)
+            remaining -= batch
+
+            start = time.perf_counter()
+            sessions = [openkit.create_session("127.0.0.1") for _ in range(batch)]
+            open_time += time.perf_counter() - start
+
+            # Newest first, the worst case for a list backed composite
+            start = time.perf_counter()
+            for session in reversed(sessions):
+                session.end()
+            close_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            session = openkit.create_session("127.0.0.1")
+            session.enter_action("request").leave_action()
+            session.end()
+        request_time = time.perf_counter() - start
+
+        openkit.shutdown(timeout=30)
+
+    print(f"sessions: {args.sessions}, open at once: {args.batch}")
+    print(f"open:  {open_time:.2f}s ({args.sessions / open_time:,.0f}/s)")
+    print(f"close: {close_time:.2f}s ({args.sessions / close_time:,.0f}/s)")
+    print(f"request scoped sessions: {args.requests}")
+    print(f"  {request_time:.2f}s ({args.requests / request_time:,.0f} sessions/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openkit import OpenKit  # noqa: E402
+from openkit.protocol.transport import LocalSinkTransport  # noqa: E402
+
+
+def bench_mode(name: str, instances: int, idle_seconds: float, **options):
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.ERROR)
+    baseline_threads = threading.active_count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        transport = LocalSinkTransport(directory)
+
+        start = time.perf_counter()
+        openkits = [OpenKit("http://localhost/mbeacon", "bench", 1, logger=logger, transport=transport, **options)
+                    for _ in range(instances)]
+        construction = (time.perf_counter() - start) / instances
+        threads_unused = threading.active_count() - baseline_threads
+
+        start = time.perf_counter()
+        for openkit in openkits:
+            session = openkit.create_session("127.0.0.1")
+            session.enter_action("action").leave_action()
+            session.end()
+        first_session = (time.perf_counter() - start) / instances
+        threads_active = threading.active_count() - baseline_threads
+
+        # Long enough for the finished sessions to be sent and for an idle sender to park
+        time.sleep(idle_seconds)
+        threads_idle = threading.active_count() - baseline_threads
+
+        for openkit in openkits:
+            openkit.shutdown(timeout=5)
+
+    print(f"{name}:")
+    print(f"  construction       {construction * 1e6:8.1f} us/instance")
+    print(f"  first session      {first_session * 1e6:8.1f} us/instance")
+    print(f"  threads unused     {threads_unused / instances:8.1f} per instance")
+    print(f"  threads active     {threads_active / instances:8.1f} per instance")
+    print(f"  threads idle       {threads_idle / instances:8.1f} per instance")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup cost and background threads of idle OpenKit instances")
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--idle-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    idle_seconds = args.idle_timeout + 2.5
+    bench_mode("eager (prefetch_status=True)", args.instances, idle_seconds)
+    bench_mode("lazy (prefetch_status=False)", args.instances, idle_seconds, prefetch_status=False)
+    bench_mode(f"lazy, idle_timeout={args.idle_timeout}s", args.instances, idle_seconds, prefetch_status=False,
+               idle_timeout=args.idle_timeout)
+
+
+if __name__ == "__main__":
+    main()
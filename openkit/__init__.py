@@ -1,5 +1,13 @@
 """Python implementation of Dynatrace OpenKit."""
 
-from .api.openkit import OpenKit
-
 __version__ = "1.0.32"
+
+__all__ = ["OpenKit"]
+
+
+def __getattr__(name):
+    # The SDK is only loaded when it is used, tools which merely import openkit don't pay for it
+    if name == "OpenKit":
+        from .api.openkit import OpenKit
+        return OpenKit
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1 +1,8 @@
-from .openkit import OpenKit
+__all__ = ["OpenKit"]
+
+
+def __getattr__(name):
+    if name == "OpenKit":
+        from .openkit import OpenKit
+        return OpenKit
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,6 +7,7 @@ from .web_request_tracer import WebRequestTracer
 
 
 class Action(ABC, OpenKitObject):
+    __slots__ = ()
 
     @abstractmethod
     def report_event(self, event_name: str, timestamp: Optional[datetime] = None) -> "Action":
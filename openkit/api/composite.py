@@ -1,27 +1,26 @@
 from abc import abstractmethod
-from typing import List
+from typing import Dict, List
 
 from .openkit_object import OpenKitObject
 
 
 class OpenKitComposite:
+    __slots__ = ("_children", "_id")
     _DEFAULT_ACTION_ID = 0
 
     def __init__(self):
-        self._children: List[OpenKitObject] = []
+        # Keyed by identity, dicts keep the insertion order and remove in O(1)
+        self._children: Dict[int, OpenKitObject] = {}
         self._id = self._DEFAULT_ACTION_ID
 
     def _store_child_in_list(self, child: OpenKitObject):
-        self._children.append(child)
+        self._children[id(child)] = child
 
     def _remove_child_from_list(self, child: OpenKitObject):
-        try:
-            self._children.remove(child)
-        except ValueError:
-            pass
+        self._children.pop(id(child), None)
 
     def _copy_children(self) -> List[OpenKitObject]:
-        return self._children.copy()
+        return list(self._children.values())
 
     @property
     def _child_count(self) -> int:
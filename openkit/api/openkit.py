@@ -1,7 +1,10 @@
+import atexit
 import logging
+import os
+import weakref
 from datetime import datetime
 from threading import RLock
-from typing import List, Optional
+from typing import List, Optional, Sequence, TYPE_CHECKING, Union
 
 from .composite import OpenKitComposite
 from .constants import CrashReportingLevel, DEFAULT_APPLICATION_VERSION, \
@@ -9,25 +12,36 @@ from .constants import CrashReportingLevel, DEFAULT_APPLICATION_VERSION, \
     DEFAULT_MANUFACTURER, \
     DEFAULT_MAX_RECORD_AGE_IN_MILLIS, \
     DEFAULT_OPERATING_SYSTEM, \
-    DEFAULT_UPPER_MEMORY_BOUNDARY_IN_BYTES
+    DEFAULT_SERVER_CONFIGURATION_MAX_AGE_IN_MILLIS, \
+    DEFAULT_UPPER_MEMORY_BOUNDARY_IN_BYTES, \
+    DEFAULT_VALUE_HISTOGRAM_BUCKETS
 from .openkit_object import OpenKitObject
 from .session import Session
 from ..core.beacon_sender import BeaconSender
 from ..core.caching import BeaconCache, BeaconCacheEvictor
 from ..core.configuration import OpenkitConfiguration
 from ..core.configuration.privacy_configuration import DataCollectionLevel, PrivacyConfiguration
+from ..core.objects.metrics_aggregator import MetricsAggregator
 from ..core.objects.null_session import NullSession
-from ..core.objects.session_creator import SessionCreator
+from ..core.objects.session_creator import SessionCreator, SessionCreatorContext
 from ..core.objects.session_proxy import SessionProxy
 from ..core.session_watchdog import SessionWatchdog, SessionWatchdogContext
+from ..core.waiter import Waiter
 from ..protocol.http_client import AGENT_TECHNOLOGY_TYPE, DEFAULT_SERVER_ID, HttpClient
+from ..protocol.rate_limiter import AdaptiveRateLimiter
 from ..providers.session_id import SessionIDProvider
+from ..providers.traffic_control import traffic_control_value
+
+if TYPE_CHECKING:
+    from ..core.configuration.server_configuration_store import ServerConfigurationStore
+    from ..core.forwarding import BeaconAggregator
+    from ..protocol.transport import Transport
 
 
 class OpenKit(OpenKitObject, OpenKitComposite):
 
     def __init__(self,
-                 endpoint: str,
+                 endpoint: Union[str, List[str]],
                  application_id: str,
                  device_id: int,
                  logger: Optional[logging.Logger] = None,
@@ -40,7 +54,19 @@ class OpenKit(OpenKitObject, OpenKitComposite):
                  application_name: Optional[str] = "",
                  privacy_config: Optional[PrivacyConfiguration] = None,
                  verify_certificates: bool = True,
-                 technology_type: Optional[str] = AGENT_TECHNOLOGY_TYPE):
+                 technology_type: Optional[str] = AGENT_TECHNOLOGY_TYPE,
+                 max_requests_per_second: Optional[float] = None,
+                 max_bytes_per_second: Optional[float] = None,
+                 shutdown_timeout_at_exit: Optional[float] = None,
+                 transport: Optional["Transport"] = None,
+                 forwarder_socket: Optional[str] = None,
+                 server_configuration_path: Optional[str] = None,
+                 server_configuration_max_age: int = DEFAULT_SERVER_CONFIGURATION_MAX_AGE_IN_MILLIS,
+                 prefetch_status: bool = True,
+                 idle_timeout: Optional[float] = None,
+                 event_aggregation_window: Optional[float] = None,
+                 aggregate_values: bool = False,
+                 value_histogram_buckets: Sequence[float] = DEFAULT_VALUE_HISTOGRAM_BUCKETS):
         super().__init__()
         self._endpoint = endpoint
         self._application_id = application_id
@@ -55,6 +81,7 @@ class OpenKit(OpenKitObject, OpenKitComposite):
             privacy_config = PrivacyConfiguration(DataCollectionLevel.USER_BEHAVIOR, CrashReportingLevel.OPT_IN_CRASHES)
         self._privacy_config = privacy_config
         self._session_id_provider = SessionIDProvider()
+        self._traffic_control_value = traffic_control_value(device_id)
 
         if logger is None:
             logger = logging.getLogger(__name__)
@@ -66,37 +93,163 @@ class OpenKit(OpenKitObject, OpenKitComposite):
         self._logger = logger
         self._shutdown = False
 
-        # Sessions
-        self._children: List[Session] = []
+        self._beacon_cache_max_age = beacon_cache_max_age
+        self._beacon_cache_lower_memory = beacon_cache_lower_memory
+        self._beacon_cache_upper_memory = beacon_cache_upper_memory
+        self._verify_certificates = verify_certificates
+        self._max_requests_per_second = max_requests_per_second
+        self._max_bytes_per_second = max_bytes_per_second
+        self._transport = transport
+        self._forwarder_socket = forwarder_socket
+        # Without prefetching nothing starts before the first session, idle_timeout (seconds) lets the sender exit
+        self._prefetch_status = prefetch_status
+        self._idle_timeout = idle_timeout
+        # Seconds during which identical errors and web requests of a session are collapsed into one record
+        self._event_aggregation_window = event_aggregation_window
+        # Numeric values are summarized per action and name, see MetricsAggregator
+        self._value_histogram_buckets = None
+        if aggregate_values:
+            self._value_histogram_buckets = MetricsAggregator.check_bucket_bounds(value_histogram_buckets)
+
+        # Optional features import their modules only when they are used, "import openkit" stays cheap
+        self._server_configuration_store: Optional["ServerConfigurationStore"] = None
+        if server_configuration_path is not None:
+            from ..core.configuration.server_configuration_store import ServerConfigurationStore
+            self._server_configuration_store = ServerConfigurationStore(logger,
+                                                                        server_configuration_path,
+                                                                        application_id,
+                                                                        server_configuration_max_age)
+
+        self._aggregator: Optional["BeaconAggregator"] = None
+        self._lock = RLock()
+        self._openkit_configuration = OpenkitConfiguration(self)
+        self._create_components()
+
+        self._shutdown_timeout_at_exit = shutdown_timeout_at_exit
+        if shutdown_timeout_at_exit is not None:
+            atexit.register(self._shutdown_at_exit)
+
+        _instances.add(self)
+        self._initialize()
 
-        # Cache
-        self._beacon_cache = BeaconCache(logger)
-        self._beacon_cache_evictor = BeaconCacheEvictor(logger,
-                                                        self._beacon_cache,
-                                                        beacon_cache_max_age,
-                                                        beacon_cache_lower_memory,
-                                                        beacon_cache_upper_memory)
+    def _create_components(self):
+        self._started = False
+        # Every background thread waits on this, so shutdown wakes all of them at once
+        self._waiter = Waiter()
 
-        # HTTP Client
-        self._http_client = HttpClient(self._logger, endpoint, DEFAULT_SERVER_ID, application_id, verify_certificates)
+        if self._forwarder_socket is not None:
+            from ..core.forwarding import ForwardingBeaconCache, ForwardingBeaconSender
+            # Records go to the aggregator listening on forwarder_socket, which owns the cache and the sender
+            self._beacon_cache = ForwardingBeaconCache(self._logger, self._beacon_cache_upper_memory,
+                                                       waiter=self._waiter)
+            self._beacon_cache_evictor = None
+            self._http_client = None
+            self._beacon_sender = ForwardingBeaconSender(self._logger, self._forwarder_socket, self._beacon_cache,
+                                                         self._waiter)
+        else:
+            # Cache
+            self._beacon_cache = BeaconCache(self._logger)
+            self._beacon_cache_evictor = BeaconCacheEvictor(self._logger,
+                                                            self._beacon_cache,
+                                                            self._beacon_cache_max_age,
+                                                            self._beacon_cache_lower_memory,
+                                                            self._beacon_cache_upper_memory,
+                                                            self._waiter)
 
-        # Beacon Sender
-        self._beacon_sender = BeaconSender(self._logger, self._http_client)
+            # HTTP Client
+            rate_limiter = AdaptiveRateLimiter(self._max_requests_per_second, self._max_bytes_per_second)
+            self._http_client = HttpClient(self._logger,
+                                           self._endpoint,
+                                           DEFAULT_SERVER_ID,
+                                           self._application_id,
+                                           self._verify_certificates,
+                                           rate_limiter,
+                                           self._transport,
+                                           self._wait_for_rate_limit)
+
+            # Beacon Sender
+            self._beacon_sender = BeaconSender(self._logger, self._http_client, self._waiter,
+                                               self._server_configuration_store, self._idle_timeout)
 
         # Session Watchdog
-        self._session_watchdog = SessionWatchdog(self._logger, SessionWatchdogContext())
+        self._session_watchdog = SessionWatchdog(self._logger, SessionWatchdogContext(self._waiter))
+
+        self._session_creator_context = SessionCreatorContext(self._logger,
+                                                              self._openkit_configuration,
+                                                              self._privacy_config,
+                                                              self._beacon_cache,
+                                                              DEFAULT_SERVER_ID,
+                                                              self._session_id_provider,
+                                                              self._beacon_sender.capture_state)
 
+    def _initialize(self):
+        if self._prefetch_status:
+            self._beacon_sender.initialize()
+
+    def _ensure_started(self):
+        # The evictor and the watchdog only have work once there are sessions
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            if self._beacon_cache_evictor is not None:
+                self._beacon_cache_evictor.start()
+            self._session_watchdog.initialize()
+        self._beacon_sender.initialize()
+
+    def _reinitialize_after_fork(self):
+        # Only the forking thread survives: locks may be held by threads that no longer exist and the background
+        # threads are gone. Sessions and cached records belong to the parent, which still sends them.
         self._lock = RLock()
-        self._openkit_configuration = OpenkitConfiguration(self)
+        if self._shutdown:
+            return
+
+        if self._aggregator is not None:
+            self._aggregator.detach()
+            self._aggregator = None
+        if self._transport is not None:
+            self._transport.reset_after_fork()
 
+        # The application may still hold sessions of the parent, nothing would ever send what they capture here
+        self._beacon_sender.capture_state.enabled = False
+        for child in self._copy_children():
+            child._discard_after_fork()
+        self._beacon_cache.reset_after_fork()
+
+        self._children = {}
+        self._session_id_provider = SessionIDProvider()
+        self._create_components()
         self._initialize()
+        self._logger.debug(f"OpenKit restarted in forked process {os.getpid()}")
 
-    def _initialize(self):
-        self._beacon_cache_evictor.start()
-        self._beacon_sender.initialize()
-        self._session_watchdog.initialize()
+    def start_aggregator(self, socket_path: str) -> "BeaconAggregator":
+        """
+        Accepts the records of OpenKit instances created with forwarder_socket=socket_path, typically the workers of a
+        pre-forking server, and sends them with this instance's cache and connections.
+        """
+        if self._beacon_cache_evictor is None:
+            raise ValueError("A forwarding OpenKit instance can not aggregate")
+        self._ensure_started()
+        with self._lock:
+            if self._aggregator is None:
+                from ..core.forwarding import BeaconAggregator
+                self._aggregator = BeaconAggregator(self._logger,
+                                                    socket_path,
+                                                    self._beacon_cache,
+                                                    self._beacon_sender,
+                                                    self._session_creator_context)
+                self._aggregator.start()
+            return self._aggregator
 
     def wait_for_init_completion(self, timeout_ms: Optional[int] = None) -> bool:
+        """
+        Blocks until the initial status request completed or timeout_ms passed and returns whether init succeeded.
+
+        Returns right away once init has completed. A timeout no longer raises, it returns False.
+        """
+        self._beacon_sender.initialize()
         return self._beacon_sender.wait_for_init_completion(timeout_ms)
 
     def initialized(self) -> bool:
@@ -106,16 +259,18 @@ class OpenKit(OpenKitObject, OpenKitComposite):
                        ip_address: Optional[str] = None,
                        timestamp: Optional[datetime] = None,
                        device_id: Optional[int] = None) -> Session:
+        if not self._beacon_sender.capture_state.enabled:
+            return NullSession()
+
         self._logger.debug(f"create_session({ip_address}, {timestamp})")
+        if not self._sampled_in(device_id):
+            # Sampled out by traffic control, nothing gets allocated or captured for this session
+            return NullSession()
+
+        self._ensure_started()
         with self._lock:
             if not self._shutdown:
-                session_creator = SessionCreator(self._logger,
-                                                 self._openkit_configuration,
-                                                 self._privacy_config,
-                                                 self._beacon_cache,
-                                                 ip_address,
-                                                 DEFAULT_SERVER_ID,
-                                                 self._session_id_provider)
+                session_creator = SessionCreator(self._session_creator_context, ip_address)
                 session_proxy = SessionProxy(self._logger,
                                              self,
                                              session_creator,
@@ -128,20 +283,49 @@ class OpenKit(OpenKitObject, OpenKitComposite):
 
         return NullSession()
 
-    def shutdown(self) -> None:
+    def _sampled_in(self, device_id: Optional[int]) -> bool:
+        percentage = self._beacon_sender.last_server_configuration.traffic_control_percentage
+        if percentage >= 100:
+            return True
+        value = self._traffic_control_value if device_id is None else traffic_control_value(device_id)
+        return value < percentage
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Closes all sessions and flushes them to the server.
+
+        With a timeout (in seconds) this blocks until the data is sent or the deadline passes and returns True when
+        everything was sent. Without a timeout the flush runs in the background and False is returned while it runs,
+        True only when the sender had already stopped with nothing left to send, e.g. because it never started.
+        """
         self._logger.debug("Openkit shutdown requested")
         with self._lock:
             if self._shutdown:
-                return
+                return self._beacon_sender.flushed
             self._shutdown = True
 
+        if self._shutdown_timeout_at_exit is not None:
+            atexit.unregister(self._shutdown_at_exit)
+
+        if self._aggregator is not None:
+            self._aggregator.shutdown()
+
         children = self._copy_children()
         for child in children:
             child._close()
 
         self._session_watchdog.shutdown()
-        self._beacon_cache_evictor.stop()
-        self._beacon_sender.shutdown()
+        if self._beacon_cache_evictor is not None:
+            self._beacon_cache_evictor.stop()
+        return self._beacon_sender.shutdown(timeout)
+
+    def _wait_for_rate_limit(self, seconds: float) -> bool:
+        # Interrupted by shutdown, BeaconSender.shutdown sets the deadline before it requests the shutdown
+        context = self._beacon_sender.context
+        return self._waiter.wait(seconds, lambda: context.shutdown_requested)
+
+    def _shutdown_at_exit(self):
+        self.shutdown(self._shutdown_timeout_at_exit)
 
     def _close(self):
         self.shutdown()
@@ -149,3 +333,16 @@ class OpenKit(OpenKitObject, OpenKitComposite):
     def _on_child_closed(self, child: OpenKitObject):
         with self._lock:
             self._remove_child_from_list(child)
+
+
+# Instances to restart in the child after os.fork(), e.g. when a pre-forking server loads the application first
+_instances: "weakref.WeakSet[OpenKit]" = weakref.WeakSet()
+
+
+def _reinitialize_instances_after_fork():
+    for instance in list(_instances):
+        instance._reinitialize_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinitialize_instances_after_fork)
@@ -2,6 +2,7 @@ from abc import abstractmethod
 
 
 class OpenKitObject:
+    __slots__ = ()
 
     @abstractmethod
     def _close(self):
@@ -9,6 +10,7 @@ class OpenKitObject:
 
 
 class CancelableOpenKitObject(OpenKitObject):
+    __slots__ = ()
 
     @abstractmethod
     def _cancel(self):
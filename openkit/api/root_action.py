@@ -6,6 +6,7 @@ from .action import Action
 
 
 class RootAction(Action, ABC):
+    __slots__ = ()
 
     @abstractmethod
     def enter_action(self, name: str, timestamp: Optional[datetime] = None) -> Action:
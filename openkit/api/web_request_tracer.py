@@ -4,6 +4,7 @@ from typing import Optional
 
 
 class WebRequestTracer(ABC):
+    __slots__ = ()
 
     @abstractmethod
     def get_tag(self) -> str:
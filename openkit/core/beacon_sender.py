@@ -3,41 +3,90 @@ import time
 from threading import Event, RLock, Thread
 from typing import List, Optional, TYPE_CHECKING
 
-from .communication import AbstractBeaconSendingState, BeaconSendingInitState
 from .communication.countdown_latch import CountDownLatch
-from .configuration.server_configuration import ServerConfiguration
+from .capture_state import CaptureState
+from .configuration.server_configuration import ServerConfiguration, SharedServerConfiguration
+from .session_registry import SessionRegistry
+from .waiter import Waiter
 from ..protocol.http_client import HttpClient
 from ..protocol.status_response import StatusResponse
 
 if TYPE_CHECKING:
+    from .communication import AbstractBeaconSendingState
+    from .configuration.server_configuration_store import ServerConfigurationStore
     from .objects.session import SessionImpl
 
 
 class BeaconSendingContext:
-    def __init__(self, logger: logging.Logger, http_client: HttpClient):
+    def __init__(self,
+                 logger: logging.Logger,
+                 http_client: HttpClient,
+                 waiter: Optional[Waiter] = None,
+                 server_configuration_store: Optional["ServerConfigurationStore"] = None,
+                 idle_timeout: Optional[float] = None):
         self.logger = logger
         self.http_client = http_client
-        self.server_configuration = ServerConfiguration()  # Default Values
+        self.waiter = waiter if waiter is not None else Waiter()
+        self.server_configuration_store = server_configuration_store
+        self.idle_timeout = idle_timeout
+        self.last_activity_time = time.monotonic()
+        self.parked = False
+        self.capture_state = CaptureState()
+        # Configured sessions read the configuration through this object, see update_server_config() of the beacon
+        self.shared_server_configuration = SharedServerConfiguration(ServerConfiguration())
         self.last_response_attributes = StatusResponse(None)
 
-        self.sessions: List[SessionImpl] = []
+        self.sessions = SessionRegistry()
 
         self.last_open_session_beacon_send_time = None
         self.last_status_check_time = None
-        self.shutdown_requested = False
+        self._shutdown_requested = False
+        self._work_pending = False
         self.init_succeeded = False
+        # None until the flush sessions state ran
+        self.flush_succeeded: Optional[bool] = None
+        self.flush_deadline: Optional[float] = None
+        self.flush_threads: List[Thread] = []
 
         self.countdown_latch = CountDownLatch()
 
-        self.current_state: AbstractBeaconSendingState = BeaconSendingInitState()
+        from .communication import BeaconSendingInitState
+        self.current_state: "AbstractBeaconSendingState" = BeaconSendingInitState()
         self.next_state = None
 
         self._lock = RLock()
 
+    @property
+    def server_configuration(self) -> ServerConfiguration:
+        return self.shared_server_configuration.current
+
+    @server_configuration.setter
+    def server_configuration(self, server_configuration: ServerConfiguration):
+        published = self.shared_server_configuration.publish(server_configuration)
+        self.capture_state.enabled = server_configuration.capture_enabled
+        if published:
+            self.waiter.notify_all()
+
     @property
     def terminal(self):
         return self.current_state.terminal
 
+    @property
+    def shutdown_requested(self) -> bool:
+        return self._shutdown_requested
+
+    @shutdown_requested.setter
+    def shutdown_requested(self, value: bool):
+        self._shutdown_requested = value
+        if value:
+            self.waiter.notify_all()
+
+    @property
+    def flush_time_remaining(self) -> Optional[float]:
+        if self.flush_deadline is None:
+            return None
+        return max(0.0, self.flush_deadline - time.monotonic())
+
     @property
     def server_id(self):
         return self.http_client.server_id
@@ -54,12 +103,11 @@ class BeaconSendingContext:
 
     def disable_capture(self):
         with self._lock:
-            self.server_configuration.capture_enabled = False
+            self.server_configuration = self.server_configuration.with_capture_enabled(False)
 
     def clear_all_session_data(self):
         self.logger.debug(f"Deleting all session data from cache")
-        sessions = self.sessions.copy()
-        for session in sessions:
+        for session in self.sessions.all_sessions():
             session.clear_captured_data()
             if session.state.is_finished:
                 self.sessions.remove(session)
@@ -72,8 +120,17 @@ class BeaconSendingContext:
             self.logger.debug(f"State change from {self.current_state} to {self.next_state}")
             self.current_state = self.next_state
 
-    def sleep(self, millis):
-        time.sleep(millis / 1000)
+    def sleep(self, millis, wake_on_work: bool = False):
+        # Returns early when shutdown is requested. With wake_on_work also for a new session or a configuration which
+        # another thread published while sleeping, waits which honor a retry interval must not set it.
+        if not wake_on_work:
+            self.waiter.wait(millis / 1000, lambda: self._shutdown_requested)
+            return
+
+        version = self.shared_server_configuration.version
+        self.waiter.wait(millis / 1000, lambda: (self._shutdown_requested or self._work_pending or
+                                                 self.shared_server_configuration.version != version))
+        self._work_pending = False
 
     def handle_response(self, response: StatusResponse):
 
@@ -88,18 +145,48 @@ class BeaconSendingContext:
             self.clear_all_session_data()
 
     def get_configuration_timestamp(self):
-        return 0
+        # Sent as cts, the collector only returns what changed since then
+        return self.last_response_attributes.timestamp
 
     def add_session(self, session):
-        self.sessions.append(session)
+        self.sessions.add(session)
+        self._work_pending = True
+        self.waiter.notify_all()
 
     def update_from(self, status_response: StatusResponse):
-        self.last_response_attributes = status_response
-        self.server_configuration = ServerConfiguration.create_from(status_response)
-        self.logger.debug(f"Received new server configuration: {self.server_configuration}")
-        self.http_client.server_id = self.server_configuration.server_id
+        previous = self.last_response_attributes
+        if status_response.timestamp and status_response.timestamp == previous.timestamp:
+            # Same configuration version, only capture may have been turned off locally after an error response
+            self.server_configuration = self.server_configuration.with_capture_enabled(previous.capture)
+        else:
+            self.last_response_attributes = status_response.merged_into(previous)
+            self.server_configuration = ServerConfiguration.create_from(self.last_response_attributes)
+            self.logger.debug(f"Received new server configuration: {self.server_configuration}")
+
+        if self.server_configuration_store is not None:
+            server_ids = {endpoint.base_url: endpoint.server_id for endpoint in self.http_client.endpoints.endpoints}
+            self.server_configuration_store.save(self.server_configuration,
+                                                 self.last_response_attributes.send_interval,
+                                                 server_ids)
         return self.last_response_attributes
 
+    def apply_server_configuration_snapshot(self) -> bool:
+        if self.server_configuration_store is None:
+            return False
+        snapshot = self.server_configuration_store.load()
+        if snapshot is None:
+            return False
+
+        response_attributes = StatusResponse(None)
+        response_attributes.send_interval = snapshot.send_interval
+        self.last_response_attributes = response_attributes
+        self.server_configuration = snapshot.server_configuration
+        for endpoint in self.http_client.endpoints.endpoints:
+            endpoint.server_id = snapshot.server_ids.get(endpoint.base_url, endpoint.server_id)
+
+        self.logger.debug(f"Starting with the persisted server configuration: {self.server_configuration}")
+        return True
+
     @staticmethod
     def current_timestamp():
         return int(time.time() * 1000)
@@ -118,31 +205,33 @@ class BeaconSendingContext:
         self.clear_all_session_data()
 
     def get_all_not_configured_sessions(self) -> List["SessionImpl"]:
-        sessions = []
-        for session in self.sessions:
-            if not session.state.is_configured:
-                sessions.append(session)
-        return sessions
+        return self.sessions.not_configured_sessions()
 
     def get_all_finished_and_configured_sessions(self) -> List["SessionImpl"]:
-        sessions = []
-        for session in self.sessions:
-            if session.state.is_configured_and_finished:
-                sessions.append(session)
-        return sessions
-
-    def get_all_open_and_configured_sessions(self):
-        sessions = []
-        for session in self.sessions:
-            if session.state.is_configured_and_open:
-                sessions.append(session)
-        return sessions
+        return self.sessions.finished_and_configured_sessions()
+
+    def get_all_open_and_configured_sessions(self) -> List["SessionImpl"]:
+        return self.sessions.open_and_configured_sessions()
 
     def remove_session(self, finished_session):
-        return self.sessions.remove(finished_session)
+        self.sessions.remove(finished_session)
+
+    def wait_for_init_completion(self, timeout_ms) -> bool:
+        return self.countdown_latch.wait(timeout_ms) and self.init_succeeded
 
-    def wait_for_init_completion(self, timeout_ms):
-        self.countdown_latch.wait(timeout_ms)
+    def try_park(self) -> bool:
+        # The sender thread exits once it had no session for idle_timeout, BeaconSender.ensure_running() restarts it
+        if self.idle_timeout is None or not self.current_state.parkable or not self.capture_state.enabled:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self.sessions or self._shutdown_requested:
+                self.last_activity_time = now
+                return False
+            if now - self.last_activity_time < self.idle_timeout:
+                return False
+            self.parked = True
+            return True
 
 
 class BeaconSenderThread(Thread):
@@ -156,39 +245,93 @@ class BeaconSenderThread(Thread):
         self.logger.debug("BeaconSenderThread - Running")
         while not self.context.terminal:
             self.context.execute_current_state()
+            if self.context.try_park():
+                self.logger.debug("BeaconSenderThread - Parked while idle")
+                return
+
+        for flush_thread in self.context.flush_threads:
+            flush_thread.join()
+        self.context.http_client.close()
 
         self.logger.debug("BeaconSenderThread - Exiting")
 
 
 class BeaconSender:
-    def __init__(self, logger: logging.Logger, http_client: HttpClient):
+    def __init__(self,
+                 logger: logging.Logger,
+                 http_client: HttpClient,
+                 waiter: Optional[Waiter] = None,
+                 server_configuration_store: Optional["ServerConfigurationStore"] = None,
+                 idle_timeout: Optional[float] = None):
         self.logger = logger
-        self.context = BeaconSendingContext(logger, http_client)
+        self.context = BeaconSendingContext(logger, http_client, waiter, server_configuration_store, idle_timeout)
         self.thread: Optional[BeaconSenderThread] = None
 
     @property
     def server_id(self):
         return self.context.server_id
 
-    def initialize(self):
-        self.thread = BeaconSenderThread(self.logger, self.context)
-        self.thread.start()
+    @property
+    def capture_state(self) -> CaptureState:
+        return self.context.capture_state
 
-    def shutdown(self):
+    def initialize(self):
+        self.ensure_running()
+
+    def ensure_running(self):
+        context = self.context
+        with context._lock:
+            context.last_activity_time = time.monotonic()
+            if context.shutdown_requested or (self.thread is not None and not context.parked):
+                return
+            context.parked = False
+            self.thread = BeaconSenderThread(self.logger, context)
+            self.thread.start()
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+            self.context.flush_deadline = deadline
+            self.context.http_client.deadline = deadline
+
+        # The deadline is set before the waiter is notified, a request waiting for the rate limiter then sees it
         self.context.shutdown_requested = True
-        if self.thread is not None:
-            self.thread.shutdown_flag.set()
+        if self.thread is None:
+            return self.flushed
+        if self.context.parked:
+            self.context.http_client.close()
+            return self.flushed
+
+        self.thread.shutdown_flag.set()
+        if timeout is not None:
+            self.thread.join(self.context.flush_time_remaining)
+        return self.flushed
+
+    @property
+    def flushed(self) -> bool:
+        if self.thread is not None and self.thread.is_alive():
+            return False
+        if self.context.flush_succeeded is not None:
+            return self.context.flush_succeeded
+        # Shut down before the flush ran, e.g. while parked
+        return not self.context.sessions
 
     def add_session(self, session):
         self.logger.debug(f"Adding session {session}")
         self.context.add_session(session)
+        # Under the context lock, a thread deciding to park either sees this session or is restarted here
+        self.ensure_running()
 
     @property
     def last_server_configuration(self):
         return self.context.last_server_configuration
 
-    def wait_for_init_completion(self, timeout_ms):
-        self.context.wait_for_init_completion(timeout_ms)
+    @property
+    def shared_server_configuration(self) -> SharedServerConfiguration:
+        return self.context.shared_server_configuration
+
+    def wait_for_init_completion(self, timeout_ms) -> bool:
+        return self.context.wait_for_init_completion(timeout_ms)
 
     def initialized(self):
         return self.context.init_succeeded
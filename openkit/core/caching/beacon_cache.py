@@ -11,19 +11,26 @@ LOCK_ACQUIRE_TIMEOUT = 3.0  # seconds
 
 @functools.total_ordering
 class BeaconCacheRecord:
+    # Millions of these can be cached, keep them small: no __dict__ and an int timestamp instead of a datetime
+    __slots__ = ("timestamp_ms", "data", "marked_for_sending")
+
     def __init__(self, timestamp: datetime, data: str):
-        self.timestamp = timestamp
+        self.timestamp_ms = int(timestamp.timestamp() * 1000)
         self.data = data
         self.marked_for_sending = False
 
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp_ms / 1000)
+
     def size(self):
         return sys.getsizeof(self.data)
 
     def __lt__(self, other):
-        return self.timestamp < other.timestamp
+        return self.timestamp_ms < other.timestamp_ms
 
     def __eq__(self, other):
-        return self.timestamp == other.timestamp and self.data == other.data
+        return self.timestamp_ms == other.timestamp_ms and self.data == other.data
 
     def __repr__(self):
         return f"BeaconCacheRecord({self.timestamp}, '{self.data}', {self.size()})"
@@ -36,6 +43,8 @@ class BeaconCacheEntry:
         self.events_being_sent: List[BeaconCacheRecord] = []
         self.actions_being_sent: List[BeaconCacheRecord] = []
         self.total_bytes = 0
+        # Records the evictor removed before they were sent
+        self.records_evicted = 0
         self.lock = RLock()
 
     def needs_data_copied_before_chunking(self):
@@ -126,6 +135,13 @@ class BeaconCache:
         self.observers: List[BeaconCacheEvictor] = []
         self.changed = False
 
+    def reset_after_fork(self):
+        # The copy in a forked child belongs to the parent, which still sends it. The lock may have been held by one
+        # of the parent's threads.
+        self._lock = RLock()
+        self.beacons = dict()
+        self.cache_size = 0
+
     def add_observer(self, observer):
         self.observers.append(observer)
 
@@ -305,7 +321,13 @@ class BeaconCache:
         with self._lock:
             entry = self.beacons.get(key)
 
-        return entry.has_data_to_send()
+        # Sessions that never captured anything, e.g. with data collection off, have no entry
+        return entry is not None and entry.has_data_to_send()
+
+    def records_evicted(self, beacon_key: BeaconKey) -> int:
+        with self._lock:
+            entry = self.beacons.get(hash(beacon_key))
+        return entry.records_evicted if entry is not None else 0
 
     def get_beacons(self) -> Dict[int, BeaconCacheEntry]:
         with self._lock:
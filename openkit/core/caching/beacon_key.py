@@ -1,4 +1,6 @@
 class BeaconKey:
+    __slots__ = ("beacon_id", "beacon_seq_number")
+
     def __init__(self, beacon_id: int, beacon_seq_num: int):
         self.beacon_id = beacon_id
         self.beacon_seq_number = beacon_seq_num
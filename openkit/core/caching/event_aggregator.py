@@ -0,0 +1,86 @@
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class EventGroup:
+    __slots__ = ("timestamp", "data", "opened_at", "count", "duration_sum", "duration_min", "duration_max",
+                 "bytes_sent", "bytes_received")
+
+    def __init__(self, timestamp: datetime, data: str, opened_at: float):
+        self.timestamp = timestamp
+        # Encoded first occurrence, see Beacon.encode_event_group()
+        self.data = data
+        self.opened_at = opened_at
+        self.count = 0
+        self.duration_sum: Optional[int] = None
+        self.duration_min: Optional[int] = None
+        self.duration_max: Optional[int] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add(self, duration: Optional[int], bytes_sent: int, bytes_received: int):
+        self.count += 1
+        if duration is not None:
+            if self.duration_sum is None:
+                self.duration_sum = self.duration_min = self.duration_max = duration
+            else:
+                self.duration_sum += duration
+                self.duration_min = min(self.duration_min, duration)
+                self.duration_max = max(self.duration_max, duration)
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+
+
+class EventAggregator:
+    """
+    Collapses identical events of one beacon that occur within window seconds into a single cache record.
+
+    Only the first occurrence of a group is encoded, later ones just update its count, durations and byte counters.
+    Groups are handed back to the beacon once their window expired, or all at once before the beacon is sent.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        # Insertion ordered, the first group is always the one that expires first
+        self._groups: Dict[Hashable, EventGroup] = {}
+        self._lock = Lock()
+
+    def add(self,
+            key: Hashable,
+            timestamp: datetime,
+            encode: Callable[[], str],
+            duration: Optional[int] = None,
+            bytes_sent: int = 0,
+            bytes_received: int = 0) -> List[EventGroup]:
+        now = time.monotonic()
+        with self._lock:
+            expired = self._take_expired(now)
+            group = self._groups.get(key)
+            if group is None:
+                group = EventGroup(timestamp, encode(), now)
+                self._groups[key] = group
+            group.add(duration, bytes_sent, bytes_received)
+        return expired
+
+    def _take_expired(self, now: float) -> List[EventGroup]:
+        expired_keys = []
+        for key, group in self._groups.items():
+            if now - group.opened_at < self.window:
+                break
+            expired_keys.append(key)
+        return [self._groups.pop(key) for key in expired_keys]
+
+    def take_expired(self) -> List[EventGroup]:
+        with self._lock:
+            return self._take_expired(time.monotonic())
+
+    def take_all(self) -> List[EventGroup]:
+        with self._lock:
+            groups = list(self._groups.values())
+            self._groups.clear()
+        return groups
+
+    def __len__(self):
+        return len(self._groups)
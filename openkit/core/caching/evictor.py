@@ -1,11 +1,15 @@
 import logging
 from datetime import datetime, timedelta
-from threading import Condition, Event, Thread
+from threading import Event, Thread
+from typing import Optional
 
 from .beacon_cache import BeaconCache
+from ..waiter import Waiter
 
 
 class BeaconCacheEvictor(Thread):
+    EVICTION_INTERVAL = timedelta(seconds=60)
+
     def __init__(
             self,
             logger: logging.Logger,
@@ -13,6 +17,7 @@ class BeaconCacheEvictor(Thread):
             beacon_cache_max_age: int,
             beacon_cache_lower_memory: int,
             beacon_cache_upper_memory: int,
+            waiter: Optional[Waiter] = None,
     ):
         self.logger = logger
         self.beacon_cache = beacon_cache
@@ -21,7 +26,7 @@ class BeaconCacheEvictor(Thread):
         self.beacon_cache_upper_memory = beacon_cache_upper_memory
 
         self.record_added = False
-        self._lock = Condition()
+        self.waiter = waiter if waiter is not None else Waiter()
         self.shutdown_flag = Event()
         self.last_time_eviction = None
         self.last_space_eviction = None
@@ -31,40 +36,42 @@ class BeaconCacheEvictor(Thread):
         self.beacon_cache.add_observer(self)
 
         while not self.shutdown_flag.is_set():
-            with self._lock:
-                while not self.record_added:
-                    self._lock.wait()
+            self.waiter.wait(None, lambda: self.record_added or self.shutdown_flag.is_set())
 
-                self.record_added = False
+            # Evictions run at most once per interval, wait for the rest of it (or for shutdown)
+            if self.last_time_eviction is not None:
+                remaining = self.EVICTION_INTERVAL - (datetime.now() - self.last_time_eviction)
+                if remaining.total_seconds() > 0:
+                    self.waiter.wait(remaining.total_seconds(), self.shutdown_flag.is_set)
+            if self.shutdown_flag.is_set():
+                break
 
+            self.record_added = False
             self.logger.debug("Running Beacon Cache Evictor")
-            
-            # Only run evictions every 60 seconds
+
             now = datetime.now()
-            if self.last_time_eviction is None or (now - self.last_time_eviction).total_seconds() >= 60:
-                self.time_eviction()
-                self.last_time_eviction = now
-            
-            if self.last_space_eviction is None or (now - self.last_space_eviction).total_seconds() >= 60:
-                self.space_eviction()
-                self.last_space_eviction = now
+            self.time_eviction()
+            self.last_time_eviction = now
+
+            self.space_eviction()
+            self.last_space_eviction = now
 
         self.logger.debug("Exiting Beacon Cache Evictor Thread")
 
     def update(self):
-        with self._lock:
+        # Only the first record after an eviction run needs to wake the thread up
+        if not self.record_added:
             self.record_added = True
-            self._lock.notify_all()
+            self.waiter.notify_all()
 
     def stop(self):
-        with self._lock:
-            self.record_added = True
-            self.shutdown_flag.set()
-            self._lock.notify_all()
+        self.shutdown_flag.set()
+        self.waiter.notify_all()
 
     def time_eviction(self):
         try:
             min_allowed_time = datetime.now() - timedelta(milliseconds=self.beacon_cache_max_age)
+            min_allowed_timestamp_ms = int(min_allowed_time.timestamp() * 1000)
             self.logger.debug(f"Deleting all beacon records with a timestamp older than {min_allowed_time}")
 
             actions_deleted = 0
@@ -77,12 +84,13 @@ class BeaconCacheEvictor(Thread):
                 with entry.lock:
                     old_len_actions = len(entry.actions)
                     old_len_events = len(entry.events)
-                    entry.actions = [action for action in entry.actions if action.timestamp > min_allowed_time]
-                    entry.events = [event for event in entry.events if event.timestamp > min_allowed_time]
+                    entry.actions = [action for action in entry.actions if action.timestamp_ms > min_allowed_timestamp_ms]
+                    entry.events = [event for event in entry.events if event.timestamp_ms > min_allowed_timestamp_ms]
                     entry.total_bytes = sum(action.size() for action in entry.actions) + sum(
                         event.size() for event in entry.events)
                     actions_deleted += old_len_actions - len(entry.actions)
                     events_deleted += old_len_events - len(entry.events)
+                    entry.records_evicted += old_len_actions + old_len_events - len(entry.actions) - len(entry.events)
 
             self.logger.debug(f"Deleted {actions_deleted} actions and {events_deleted} events from the cache")
             self.beacon_cache.update_size()
@@ -108,6 +116,7 @@ class BeaconCacheEvictor(Thread):
                             oldest_event = min(entry.events)
                             entry.events.remove(oldest_event)
                             entry.total_bytes -= oldest_event.size()
+                            entry.records_evicted += 1
                             break
 
                         # If there are no events, remove the oldest action
@@ -115,6 +124,7 @@ class BeaconCacheEvictor(Thread):
                             oldest_action = min(entry.actions)
                             entry.actions.remove(oldest_action)
                             entry.total_bytes -= oldest_action.size()
+                            entry.records_evicted += 1
                             break
 
                         # If there are events and actions, remove the oldest of the two
@@ -124,10 +134,12 @@ class BeaconCacheEvictor(Thread):
                             if oldest_event < oldest_action:
                                 entry.events.remove(oldest_event)
                                 entry.total_bytes -= oldest_event.size()
+                                entry.records_evicted += 1
                                 break
                             else:
                                 entry.actions.remove(oldest_action)
                                 entry.total_bytes -= oldest_action.size()
+                                entry.records_evicted += 1
                                 break
                 self.beacon_cache.update_size()
 
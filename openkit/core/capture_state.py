@@ -0,0 +1,12 @@
+class CaptureState:
+    """
+    Server side capture switch of an OpenKit instance.
+
+    Owned by the beacon sender and shared by reference with every session, action and beacon, so checking it is a
+    single attribute read. While capture is off the API hands out null objects without doing any work.
+    """
+
+    __slots__ = ("enabled",)
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
@@ -1,6 +1,20 @@
-from .beacon_abstract import AbstractBeaconSendingState
-from .beacon_capture_on import BeaconSendingCaptureOnState
-from .beacon_capture_off import BeaconSendingCaptureOffState
-from .beacon_init import BeaconSendingInitState
-from .beacon_flush import BeaconSendingFlushSessionsState
-from .beacon_terminal import BeaconSendingTerminalState
+# The sending states are loaded with the first BeaconSendingContext, "from openkit import OpenKit" doesn't pay for them
+_STATE_MODULES = {
+    "AbstractBeaconSendingState": "beacon_abstract",
+    "BeaconSendingCaptureOnState": "beacon_capture_on",
+    "BeaconSendingCaptureOffState": "beacon_capture_off",
+    "BeaconSendingInitState": "beacon_init",
+    "BeaconSendingFlushSessionsState": "beacon_flush",
+    "BeaconSendingTerminalState": "beacon_terminal",
+}
+
+
+def __getattr__(name):
+    module_name = _STATE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    state = getattr(import_module(f"{__name__}.{module_name}"), name)
+    # Later lookups, e.g. comm.BeaconSendingTerminalState() on every transition, find it without __getattr__
+    globals()[name] = state
+    return state
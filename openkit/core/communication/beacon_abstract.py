@@ -7,6 +7,9 @@ if TYPE_CHECKING:
 
 
 class AbstractBeaconSendingState(ABC):
+    # States after which the sender thread may exit while there is nothing to send
+    parkable = False
+
     def __init__(self):
         self.terminal = None
 
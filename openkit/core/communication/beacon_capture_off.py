@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 
 class BeaconSendingCaptureOffState(AbstractBeaconSendingState):
+    # Not parkable: create_session() hands out null sessions while capture is off and would never restart the sender,
+    # only the status checks of this state can turn capture back on
     STATUS_CHECK_INTERVAL = 2 * 60 * 60 * 1000
     STATUS_REQUEST_RETRIES = 5
     INITIAL_RETRY_SLEEP_TIME_MILLISECONDS = 1000
@@ -43,7 +45,9 @@ class BeaconSendingCaptureOffState(AbstractBeaconSendingState):
         if response is not None:
             context.handle_response(response)
 
-            if response.is_error_response():
+            if response.is_too_many_requests():
+                context.next_state = BeaconSendingCaptureOffState(response.get_retry_after_in_milliseconds())
+            elif response.is_error_response():
                 context.next_state = BeaconSendingCaptureOffState(10 * 60 * 1000)
             elif response.is_ok_response() and context.capture_on:
                 context.next_state = comm.BeaconSendingCaptureOnState()
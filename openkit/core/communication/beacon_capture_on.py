@@ -2,7 +2,6 @@ from typing import TYPE_CHECKING, Union
 
 import openkit.core.communication as comm
 from . import AbstractBeaconSendingState
-from ..configuration.server_configuration import ServerConfiguration
 from ...protocol.status_response import StatusResponse
 
 if TYPE_CHECKING:
@@ -10,31 +9,42 @@ if TYPE_CHECKING:
 
 
 class BeaconSendingCaptureOnState(AbstractBeaconSendingState):
+    parkable = True
+
     def __init__(self):
         super().__init__()
         self.terminal = False
 
     def do_execute(self, context: "BeaconSendingContext"):
-        context.sleep(1000)
-
-        new_sessions_response = self.send_new_session_requests(context)
-        if new_sessions_response is not None and new_sessions_response.is_too_many_requests():
-            context.next_state = comm.BeaconSendingCaptureOffState()
+        context.sleep(1000, wake_on_work=True)
+        if context.shutdown_requested:
             return
 
+        # Finished sessions go first, they hold complete data and are dropped on the next capture off
         finished_sessions_response = self.send_finished_sessions(context)
         if finished_sessions_response is not None and finished_sessions_response.is_too_many_requests():
-            context.next_state = comm.BeaconSendingCaptureOffState()
+            self.handle_too_many_requests(context, finished_sessions_response)
+            return
+
+        new_sessions_response = self.send_new_session_requests(context)
+        if new_sessions_response is not None and new_sessions_response.is_too_many_requests():
+            self.handle_too_many_requests(context, new_sessions_response)
             return
 
         open_sessions_response = self.send_open_sessions(context)
-        if finished_sessions_response is not None and finished_sessions_response.is_too_many_requests():
-            context.next_state = comm.BeaconSendingCaptureOffState()
+        if open_sessions_response is not None and open_sessions_response.is_too_many_requests():
+            self.handle_too_many_requests(context, open_sessions_response)
             return
 
         last_status_response = new_sessions_response or open_sessions_response or finished_sessions_response
         self.handle_status_response(context, last_status_response)
 
+    @staticmethod
+    def handle_too_many_requests(context: "BeaconSendingContext", response: StatusResponse):
+        # Capture stays on and nothing is dropped. The rate limiter has halved its rate and holds the next requests
+        # until Retry-After, the unsent sessions are picked up again in the next cycle.
+        context.logger.debug(f"Collector is rate limiting, retry after {response.get_retry_after_in_milliseconds()} ms")
+
     def get_shutdown_state(self):
         return comm.BeaconSendingFlushSessionsState()
 
@@ -44,12 +54,13 @@ class BeaconSendingCaptureOnState(AbstractBeaconSendingState):
         not_configured_sessions = context.get_all_not_configured_sessions()
 
         for session in not_configured_sessions:
-            response = context.http_client.send_new_session_request(context)
+            response = context.http_client.send_new_session_request(context, session.beacon.session_number)
+            if response.is_too_many_requests():
+                break
 
             if response.is_ok_response():
-                updated_attributes = context.update_from(response)
-                new_server_config = ServerConfiguration.create_from(updated_attributes)
-                session.update_server_configuration(new_server_config)
+                context.update_from(response)
+                session.update_server_config(context.shared_server_configuration)
         return response
 
     def send_finished_sessions(self, context: "BeaconSendingContext") -> StatusResponse:
@@ -61,8 +72,11 @@ class BeaconSendingCaptureOnState(AbstractBeaconSendingState):
 
             if session.data_sending_allowed:
                 response = session.send_beacon(context.http_client, context)
+                if response is not None and response.is_too_many_requests():
+                    # The unsent records went back to the cache, the session is sent again in the next cycle
+                    break
 
-            context.sessions.remove(session)
+            context.remove_session(session)
             session.clear_captured_data()
             session.end()
         return response
@@ -81,6 +95,9 @@ class BeaconSendingCaptureOnState(AbstractBeaconSendingState):
         for session in open_sessions:
             if session.data_sending_allowed:
                 response = session.send_beacon(context.http_client, context)
+                if response is not None and response.is_too_many_requests():
+                    # Not marked as sent, the remaining sessions follow in the next cycle
+                    return response
             else:
                 session.clear_captured_data()
 
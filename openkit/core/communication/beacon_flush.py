@@ -1,12 +1,17 @@
-from typing import TYPE_CHECKING
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import List, TYPE_CHECKING
 
 import openkit.core.communication as comm
 
 if TYPE_CHECKING:
     from ..beacon_sender import BeaconSendingContext
+    from ..objects.session import SessionImpl
 
 
 class BeaconSendingFlushSessionsState(comm.AbstractBeaconSendingState):
+    MAX_FLUSH_THREADS = 8
+
     def __init__(self):
         super().__init__()
         self.terminal = False
@@ -23,20 +28,69 @@ class BeaconSendingFlushSessionsState(comm.AbstractBeaconSendingState):
         for open_session in open_sessions:
             open_session.end(send_end_event=False)
 
-        too_many_requests = False
-
         finished_sessions = context.get_all_finished_and_configured_sessions()
-        for finished_session in finished_sessions:
-            if not too_many_requests and finished_session.data_sending_allowed:
-                response = finished_session.send_beacon(context.http_client, context)
-                if response.is_too_many_requests():
-                    too_many_requests = True
-
-            finished_session.clear_captured_data()
-            context.remove_session(finished_session)
+        context.flush_succeeded = self.flush_sessions(context, finished_sessions)
 
         context.next_state = comm.BeaconSendingTerminalState()
 
+    def flush_sessions(self, context: "BeaconSendingContext", sessions: List["SessionImpl"]) -> bool:
+        if not sessions:
+            return True
+
+        pending: Queue = Queue()
+        for session in sessions:
+            pending.put(session)
+
+        failed = Event()
+        too_many_requests = Event()
+
+        # Daemon threads, a flush that misses the deadline must never keep the interpreter alive
+        threads = [Thread(target=self.send_sessions,
+                          args=(context, pending, failed, too_many_requests),
+                          name=f"BeaconFlushThread-{i}",
+                          daemon=True)
+                   for i in range(min(self.MAX_FLUSH_THREADS, len(sessions)))]
+        for thread in threads:
+            thread.start()
+        # Stragglers still send through the http client, it is only closed once they are gone
+        context.flush_threads = threads
+
+        for thread in threads:
+            thread.join(context.flush_time_remaining)
+
+        if any(thread.is_alive() for thread in threads):
+            context.logger.warning(f"Flushing {len(sessions)} sessions did not finish before the shutdown deadline")
+            return False
+
+        return not failed.is_set()
+
+    @staticmethod
+    def send_sessions(context: "BeaconSendingContext", pending: Queue, failed: Event, too_many_requests: Event):
+        while True:
+            remaining = context.flush_time_remaining
+            if remaining is not None and remaining <= 0:
+                return
+            try:
+                session = pending.get_nowait()
+            except Empty:
+                return
+
+            try:
+                if too_many_requests.is_set():
+                    failed.set()
+                elif session.data_sending_allowed:
+                    response = session.send_beacon(context.http_client, context)
+                    if response is not None and response.is_too_many_requests():
+                        too_many_requests.set()
+                    if response is not None and response.is_error_response():
+                        failed.set()
+            except Exception as e:
+                context.logger.error(f"Could not flush session {session}: {e}")
+                failed.set()
+
+            session.clear_captured_data()
+            context.remove_session(session)
+
     def get_shutdown_state(self):
         return comm.BeaconSendingTerminalState()
 
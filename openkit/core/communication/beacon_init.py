@@ -25,6 +25,10 @@ class BeaconSendingInitState(comm.AbstractBeaconSendingState):
         self.reinitialize_delay_index = 0
 
     def do_execute(self, context: "BeaconSendingContext"):
+        if context.apply_server_configuration_snapshot():
+            self.warm_start(context)
+            return
+
         r = self.execute_status_request(context)
 
         if context.shutdown_requested:
@@ -34,6 +38,25 @@ class BeaconSendingInitState(comm.AbstractBeaconSendingState):
             context.next_state = comm.BeaconSendingCaptureOnState() if context.capture_on else comm.BeaconSendingCaptureOffState()
             context.init_completed(True)
 
+    @staticmethod
+    def warm_start(context: "BeaconSendingContext"):
+        # Sessions get configured and sent with the persisted configuration from the first cycle on. A single status
+        # request refreshes it, when that fails the regular requests of the capture states take over.
+        context.init_completed(True)
+
+        current_timestamp = context.current_timestamp()
+        context.last_open_session_beacon_send_time = current_timestamp
+        context.last_status_check_time = current_timestamp
+
+        try:
+            r = context.http_client.send_status_request(context)
+            if r.is_ok_response():
+                context.handle_response(r)
+        except Exception as e:
+            context.logger.error(f"DEC:1A9 Error while trying to refresh the persisted configuration: {e}")
+
+        context.next_state = comm.BeaconSendingCaptureOnState() if context.capture_on else comm.BeaconSendingCaptureOffState()
+
     def execute_status_request(self, context: "BeaconSendingContext"):
         try:
 
@@ -50,9 +73,8 @@ class BeaconSendingInitState(comm.AbstractBeaconSendingState):
 
                 sleep_time = self.REINIT_DELAY_MILLISECONDS[self.reinitialize_delay_index]
                 if r.is_too_many_requests():
-                    if "retry-after" in r.headers:
-                        sleep_time = int(r.headers.get("retry-after")) * 1000
-                        context.disable_capture_and_clear()
+                    # Sessions keep capturing while the collector is rate limiting, their data is sent after init
+                    sleep_time = r.get_retry_after_in_milliseconds()
 
                 context.sleep(sleep_time)
                 self.reinitialize_delay_index = min(self.reinitialize_delay_index + 1,
@@ -13,9 +13,7 @@ class CountDownLatch(object):
             self.lock.notify_all()
         self.lock.release()
 
-    def wait(self, timeout_ms):
-        self.lock.acquire()
-        self.lock.wait(timeout_ms / 1000.0)
-        if self.count > 0:
-            raise Exception("Timeout waiting for initialization")
-        self.lock.release()
+    def wait(self, timeout_ms) -> bool:
+        timeout = timeout_ms / 1000.0 if timeout_ms is not None else None
+        with self.lock:
+            return self.lock.wait_for(lambda: self.count <= 0, timeout)
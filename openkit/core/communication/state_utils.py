@@ -12,7 +12,7 @@ def send_status_request(context: "BeaconSendingContext", num_retries: int, init_
         if response.is_ok_response() or response.is_too_many_requests() or retries >= num_retries or context.shutdown_requested:
             break
         else:
-            context.logger.warning(f"Status request failed for {response.http_response.url}, response: {response.http_response}")
+            context.logger.warning(f"Status request failed, response: {response.http_response}")
 
         context.sleep(sleep_time)
         sleep_time *= 2
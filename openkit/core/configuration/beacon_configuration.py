@@ -1,10 +1,9 @@
-from threading import RLock
 from typing import Optional
 
 from .http_client_configuration import HttpClientConfiguration
 from .openkit_configuration import OpenkitConfiguration
 from .privacy_configuration import PrivacyConfiguration
-from .server_configuration import ServerConfiguration
+from .server_configuration import DEFAULT_SERVER_CONFIGURATION, ServerConfiguration, SharedServerConfiguration
 
 
 class BeaconConfiguration:
@@ -12,31 +11,36 @@ class BeaconConfiguration:
             self,
             openkit_config: OpenkitConfiguration,
             privacy_config: PrivacyConfiguration,
-            server_id: int
+            server_id: int,
+            http_client_config: Optional[HttpClientConfiguration] = None
     ):
         self.openkit_config = openkit_config
         self.privacy_config = privacy_config
-        self.http_client_config = HttpClientConfiguration(openkit_config.endpoint_url,
-                                                          openkit_config.default_server_id,
-                                                          openkit_config.application_id)
+        if http_client_config is None:
+            http_client_config = HttpClientConfiguration(openkit_config.endpoint_url,
+                                                         openkit_config.default_server_id,
+                                                         openkit_config.application_id)
+        self.http_client_config = http_client_config
 
         self.server_configured = False
 
-        self._server_configuration: Optional[ServerConfiguration] = None
+        # Replaced as a whole and never mutated, so it can be read without locking
+        self._server_configuration: ServerConfiguration = DEFAULT_SERVER_CONFIGURATION
+        # While set, the configuration published by the beacon sender is used instead of the own one
+        self._shared_server_configuration: Optional[SharedServerConfiguration] = None
         self.server_config_update_callback = None
-        self._lock = RLock()
 
     @property
     def server_configuration(self) -> ServerConfiguration:
-        with self._lock:
-            if self._server_configuration is None:
-                self._server_configuration = ServerConfiguration()
-            return self._server_configuration
+        shared = self._shared_server_configuration
+        if shared is not None:
+            return shared.current
+        return self._server_configuration
 
     @server_configuration.setter
-    def server_configuration(self, server_configuration):
-        with self._lock:
-            self._server_configuration = server_configuration
+    def server_configuration(self, server_configuration: ServerConfiguration):
+        self._server_configuration = server_configuration
+        self._shared_server_configuration = None
 
     @staticmethod
     def create_from(openkit_conf: OpenkitConfiguration, privacy_config: PrivacyConfiguration, server_id: int) -> \
@@ -48,16 +52,24 @@ class BeaconConfiguration:
                                    server_id)
 
     def enable_capture(self):
-        self.server_configuration.capture_enabled = True
+        self.server_configuration = self.server_configuration.with_capture_enabled(True)
+        self.server_configured = True
 
     def disable_capture(self):
-        self.server_configuration.capture_enabled = False
+        self.server_configuration = self.server_configuration.with_capture_enabled(False)
 
     def update_capture(self, capture_enabled):
-        self.server_configuration.capture_enabled = capture_enabled
+        self.server_configuration = self.server_configuration.with_capture_enabled(capture_enabled)
+        self.server_configured = True
+
+    def initialize_server_configuration(self, shared_server_configuration: SharedServerConfiguration):
+        self._shared_server_configuration = shared_server_configuration
+
+    def update_server_configuration(self, shared_server_configuration: SharedServerConfiguration):
+        self._shared_server_configuration = shared_server_configuration
         self.server_configured = True
 
-    # TODO initializeServerConfiguration
-    # TODO updateServerConfiguration
-    # TODO notifyServerConfigurationUpdate
-    # TODO setServerConfigurationUpdateCallback
+    def notify_server_configuration_update(self):
+        callback = self.server_config_update_callback
+        if callback is not None:
+            callback.on_server_configuration_update(self.server_configuration)
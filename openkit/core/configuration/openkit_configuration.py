@@ -17,3 +17,5 @@ class OpenkitConfiguration:
         self.model_id = "OpenKitDevice"
         self.default_server_id = 1
         self.technology_type = openkit._technology_type
+        self.event_aggregation_window = openkit._event_aggregation_window
+        self.value_histogram_buckets = openkit._value_histogram_buckets
@@ -28,47 +28,26 @@ class CrashReportingLevel(Enum):
 
 
 class PrivacyConfiguration:
+    # The checks run on every reporting call, they are computed once instead of comparing enums each time
+    __slots__ = ("data_collection_level", "crash_reporting_level", "device_id_sending_allowed",
+                 "session_number_reporting_allowed", "web_request_tracing_allowed", "session_reporting_allowed",
+                 "action_reporting_allowed", "value_reporting_allowed", "event_reporting_allowed",
+                 "error_reporting_allowed", "crash_reporting_allowed", "user_identification_allowed")
 
     def __init__(self, data_collection_level: DataCollectionLevel, crash_reporting_level: CrashReportingLevel):
         self.data_collection_level = data_collection_level
         self.crash_reporting_level = crash_reporting_level
 
-    @property
-    def device_id_sending_allowed(self) -> bool:
-        return self.data_collection_level == DataCollectionLevel.USER_BEHAVIOR
-
-    @property
-    def session_number_reporting_allowed(self) -> bool:
-        return self.data_collection_level == DataCollectionLevel.USER_BEHAVIOR
-
-    @property
-    def web_request_tracing_allowed(self) -> bool:
-        return self.data_collection_level != DataCollectionLevel.OFF
-
-    @property
-    def session_reporting_allowed(self) -> bool:
-        return self.data_collection_level != DataCollectionLevel.OFF
-
-    @property
-    def action_reporting_allowed(self) -> bool:
-        return self.data_collection_level != DataCollectionLevel.OFF
-
-    @property
-    def value_reporting_allowed(self) -> bool:
-        return self.data_collection_level == DataCollectionLevel.USER_BEHAVIOR
-
-    @property
-    def event_reporting_allowed(self) -> bool:
-        return self.data_collection_level == DataCollectionLevel.USER_BEHAVIOR
-
-    @property
-    def error_reporting_allowed(self) -> bool:
-        return self.data_collection_level != DataCollectionLevel.OFF
-
-    @property
-    def crash_reporting_allowed(self) -> bool:
-        return self.crash_reporting_level == CrashReportingLevel.OPT_IN_CRASHES
-
-    @property
-    def user_identification_allowed(self) -> bool:
-        return self.data_collection_level == DataCollectionLevel.USER_BEHAVIOR
+        user_behavior = data_collection_level == DataCollectionLevel.USER_BEHAVIOR
+        not_off = data_collection_level != DataCollectionLevel.OFF
+
+        self.device_id_sending_allowed = user_behavior
+        self.session_number_reporting_allowed = user_behavior
+        self.web_request_tracing_allowed = not_off
+        self.session_reporting_allowed = not_off
+        self.action_reporting_allowed = not_off
+        self.value_reporting_allowed = user_behavior
+        self.event_reporting_allowed = user_behavior
+        self.error_reporting_allowed = not_off
+        self.crash_reporting_allowed = crash_reporting_level == CrashReportingLevel.OPT_IN_CRASHES
+        self.user_identification_allowed = user_behavior
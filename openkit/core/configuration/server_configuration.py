@@ -1,3 +1,4 @@
+import copy
 from abc import ABC, abstractmethod
 
 from ...protocol.status_response import StatusResponse
@@ -19,6 +20,7 @@ class ServerConfiguration:
             session_timeout_in_milliseconds = 10 * 60 * 1000,  # 10 minutes
             session_split_by_idle_timeout_enabled = True,
             visit_store_version = 1,
+            traffic_control_percentage: int = 100,
     ):
         self.capture_enabled = capture_enabled
         self.crash_reporting_enabled = crash_reporting_enabled
@@ -34,7 +36,7 @@ class ServerConfiguration:
         self.session_split_by_idle_timeout_enabled = session_split_by_idle_timeout_enabled
         self.visit_store_version = visit_store_version
         self.send_interval_in_milliseconds = 120 * 1000  # 2 minutes
-        self.traffic_control_percentage = 100  # TODO - Implement
+        self.traffic_control_percentage = traffic_control_percentage
 
     @staticmethod
     def create_from(status_response: StatusResponse) -> "ServerConfiguration":
@@ -52,8 +54,29 @@ class ServerConfiguration:
             status_response.session_timeout,
             status_response.session_timeout is not None,
             status_response.visit_store_version,
+            status_response.traffic_control_percentage,
         )
 
+    def with_capture_enabled(self, capture_enabled: bool) -> "ServerConfiguration":
+        # Configurations are shared by reference between threads, changes publish a copy instead of mutating
+        if self.capture_enabled == capture_enabled:
+            return self
+        server_configuration = copy.copy(self)
+        server_configuration.capture_enabled = capture_enabled
+        return server_configuration
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @staticmethod
+    def from_dict(values: dict) -> "ServerConfiguration":
+        # Unknown keys are ignored, so both sides of a serialized configuration can differ in version
+        server_configuration = ServerConfiguration()
+        for key, value in values.items():
+            if key in server_configuration.__dict__:
+                setattr(server_configuration, key, value)
+        return server_configuration
+
     def __str__(self):
         return str(self.__dict__)
 
@@ -62,6 +85,32 @@ class ServerConfiguration:
         return self.capture_enabled and self.multiplicity > 0
 
 
+# Never mutated, see with_capture_enabled()
+DEFAULT_SERVER_CONFIGURATION = ServerConfiguration()
+
+
+class SharedServerConfiguration:
+    """
+    The current server configuration of a beacon sender, published with a version number.
+
+    Configured sessions keep a reference to this object and read current on every access, so publishing a new
+    configuration is a single assignment no matter how many sessions are live. Published configurations are never
+    mutated, readers therefore need no lock.
+    """
+    __slots__ = ("current", "version")
+
+    def __init__(self, server_configuration: ServerConfiguration = DEFAULT_SERVER_CONFIGURATION):
+        self.current = server_configuration
+        self.version = 0
+
+    def publish(self, server_configuration: ServerConfiguration) -> bool:
+        if server_configuration is self.current:
+            return False
+        self.version += 1
+        self.current = server_configuration
+        return True
+
+
 class ServerConfigurationUpdateCallback(ABC):
 
     @abstractmethod
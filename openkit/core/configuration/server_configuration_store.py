@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+from .server_configuration import ServerConfiguration
+
+SNAPSHOT_VERSION = 1
+
+
+class ServerConfigurationSnapshot:
+    def __init__(self,
+                 server_configuration: ServerConfiguration,
+                 send_interval: int,
+                 server_ids: Dict[str, int],
+                 saved_at: int):
+        self.server_configuration = server_configuration
+        self.send_interval = send_interval
+        self.server_ids = server_ids
+        self.saved_at = saved_at
+
+
+class ServerConfigurationStore:
+    """
+    Persists the last server configuration, so a new process can configure and send its sessions right away instead
+    of waiting for the initial status request.
+
+    Snapshots are written to a temporary file first and moved over the old one, concurrent processes therefore only
+    ever read complete snapshots. Snapshots of another application or older than max_age_ms are ignored.
+    """
+
+    def __init__(self, logger: logging.Logger, path: str, application_id: str, max_age_ms: int):
+        self.logger = logger
+        self.path = path
+        self.application_id = application_id
+        self.max_age_ms = max_age_ms
+        self._last_saved: Optional[dict] = None
+        self._last_saved_at = 0
+
+    @staticmethod
+    def current_timestamp() -> int:
+        return int(time.time() * 1000)
+
+    def load(self) -> Optional[ServerConfigurationSnapshot]:
+        try:
+            with open(self.path, encoding="UTF-8") as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read the server configuration snapshot {self.path}: {e}")
+            return None
+
+        if not isinstance(snapshot, dict):
+            self.logger.warning(f"Ignoring the malformed server configuration snapshot {self.path}")
+            return None
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("application_id") != self.application_id:
+            return None
+
+        # Treated like a missing snapshot, a broken file must never keep the sender from starting
+        try:
+            saved_at = snapshot.get("saved_at", 0)
+            if self.current_timestamp() - saved_at > self.max_age_ms:
+                self.logger.debug(f"Server configuration snapshot {self.path} expired")
+                return None
+
+            return ServerConfigurationSnapshot(ServerConfiguration.from_dict(snapshot["server_configuration"]),
+                                               int(snapshot["send_interval"]),
+                                               dict(snapshot.get("server_ids", {})),
+                                               saved_at)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Ignoring the malformed server configuration snapshot {self.path}: {e!r}")
+            return None
+
+    def save(self, server_configuration: ServerConfiguration, send_interval: int, server_ids: Dict[str, int]):
+        content = {
+            "version": SNAPSHOT_VERSION,
+            "application_id": self.application_id,
+            "server_configuration": server_configuration.as_dict(),
+            "send_interval": send_interval,
+            "server_ids": server_ids,
+        }
+        now = self.current_timestamp()
+        # Every new session request returns the configuration, only changes and refreshes of aging snapshots are written
+        if content == self._last_saved and now - self._last_saved_at < self.max_age_ms / 2:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            descriptor, temporary_path = tempfile.mkstemp(prefix=".openkit-", dir=directory)
+            try:
+                with os.fdopen(descriptor, "w", encoding="UTF-8") as file:
+                    json.dump({**content, "saved_at": now}, file)
+                os.replace(temporary_path, self.path)
+            except BaseException:
+                os.unlink(temporary_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"Could not write the server configuration snapshot {self.path}: {e}")
+            return
+
+        self._last_saved = content
+        self._last_saved_at = now
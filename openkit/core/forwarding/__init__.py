@@ -0,0 +1,2 @@
+from .aggregator import BeaconAggregator
+from .forwarder import ForwardingBeaconCache, ForwardingBeaconSender
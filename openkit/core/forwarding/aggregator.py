@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingUnixStreamServer
+from threading import Lock, Thread
+from typing import Dict, List, Optional, TYPE_CHECKING, Tuple
+
+from .forwarder import (FORWARDER_ID_HEADER, ForwardingBeaconSender, OP_ACTION, OP_CLEAR, OP_END, OP_EVENT, OP_OPEN,
+                        RECORDS_PATH, STATUS_PATH)
+from ..caching.beacon_cache import BeaconCache
+from ..caching.beacon_key import BeaconKey
+from ..configuration.beacon_configuration import BeaconConfiguration
+from ..objects.session import SessionState
+from ...protocol.beacon import Beacon
+
+if TYPE_CHECKING:
+    from ..beacon_sender import BeaconSender
+    from ..objects.session_creator import SessionCreatorContext
+
+ForwardedKey = Tuple[str, int, int]
+
+
+class ForwardedBeacon(Beacon):
+    """
+    Sends the data a worker process captured for one of its beacons.
+
+    The worker already encoded everything that identifies the beacon, so only the state Beacon.send() needs is
+    initialized, the same way Beacon.__init__() does it.
+    """
+
+    def __init__(self,
+                 logger: logging.Logger,
+                 context: "SessionCreatorContext",
+                 beacon_key: BeaconKey,
+                 session_number: int):
+        self._initialize_state(logger,
+                               context.beacon_cache,
+                               beacon_key,
+                               BeaconConfiguration(context.openkit_config,
+                                                   context.privacy_config,
+                                                   context.server_id,
+                                                   context.http_client_config),
+                               context.capture_state)
+        # Worker beacons already flushed their event groups into the forwarded records
+        self.event_aggregator = None
+        self.session_number = session_number
+        # The worker applied traffic control before creating the session
+        self.traffic_control_value = 0
+        self.session_start_time = datetime.now()
+        self.ip_address = ""
+        self.immutable_beacon_data = ""
+
+    def open(self, session_start_time_ms: int, ip_address: str, immutable_beacon_data: str):
+        self.session_start_time = datetime.fromtimestamp(session_start_time_ms / 1000)
+        self.ip_address = ip_address
+        self.immutable_beacon_data = immutable_beacon_data
+
+
+class ForwardedSession:
+    """The aggregator side of a worker session, handed to the BeaconSender like a local SessionImpl."""
+
+    def __init__(self, beacon: ForwardedBeacon):
+        self.beacon = beacon
+        self.state = SessionState(self)
+
+    @property
+    def data_sending_allowed(self) -> bool:
+        return self.state.is_configured and self.beacon.data_capturing_enabled
+
+    def send_beacon(self, http_client, context):
+        return self.beacon.send(http_client, context)
+
+    def clear_captured_data(self):
+        self.beacon.clear_data()
+
+    def update_server_config(self, updated_config):
+        self.beacon.update_server_config(updated_config)
+        self.state.notify_configured()
+
+    def enable_capture(self):
+        self.beacon.enable_capture()
+        self.state.notify_configured()
+
+    def end(self, send_end_event: bool = True):
+        if self.state.mark_as_finishing():
+            self.state.mark_as_finished()
+
+    def __repr__(self):
+        return f"ForwardedSession({self.beacon.beacon_key})"
+
+
+class BeaconAggregator:
+    """
+    Receives the records of worker processes on a Unix domain socket.
+
+    The aggregator runs inside a regular OpenKit instance and feeds its cache and beacon sender, so the cache budget and
+    the collector connections are shared by every process on the host. Workers are started with the forwarder_socket
+    option pointing to the same socket path.
+
+    Workers ask for the status at least every STATUS_REFRESH_INTERVAL. The sessions of a worker that was not heard of
+    for forwarder_timeout seconds are ended, it died without ending them, e.g. after being killed or recycled.
+    """
+    FORWARDER_TIMEOUT = 3 * ForwardingBeaconSender.STATUS_REFRESH_INTERVAL  # seconds
+
+    def __init__(self,
+                 logger: logging.Logger,
+                 socket_path: str,
+                 beacon_cache: BeaconCache,
+                 beacon_sender: "BeaconSender",
+                 session_creator_context: "SessionCreatorContext",
+                 forwarder_timeout: float = FORWARDER_TIMEOUT):
+        self.logger = logger
+        self.socket_path = socket_path
+        self.beacon_cache = beacon_cache
+        self.beacon_sender = beacon_sender
+        self.session_creator_context = session_creator_context
+        self.forwarder_timeout = forwarder_timeout
+
+        self._beacons: Dict[ForwardedKey, ForwardedBeacon] = {}
+        self._sessions: Dict[ForwardedKey, ForwardedSession] = {}
+        # forwarder id -> time.monotonic() of its last request
+        self._last_seen: Dict[str, float] = {}
+        self._lock = Lock()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._server = _AggregatorServer(socket_path, _AggregatorRequestHandler)
+        self._server.daemon_threads = True
+        self._server.aggregator = self
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        self._thread = Thread(target=self._server.serve_forever, name="BeaconAggregatorThread", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def detach(self):
+        # In a forked child: release the inherited listening socket but leave the socket file to the parent
+        self._thread = None
+        self._server.server_close()
+
+    def status(self, forwarder_id: str) -> dict:
+        self._seen(forwarder_id)
+        return self.beacon_sender.last_server_configuration.as_dict()
+
+    def _seen(self, forwarder_id: str):
+        self._last_seen[forwarder_id] = time.monotonic()
+
+    def end_dead_forwarders(self, now: Optional[float] = None):
+        if now is None:
+            now = time.monotonic()
+        dead = [forwarder_id for forwarder_id, last_seen in list(self._last_seen.items())
+                if now - last_seen > self.forwarder_timeout]
+        for forwarder_id in dead:
+            with self._lock:
+                self._last_seen.pop(forwarder_id, None)
+                keys: List[ForwardedKey] = [key for key in self._beacons if key[0] == forwarder_id]
+            if keys:
+                self.logger.warning(f"Forwarder {forwarder_id} went away, ending its {len(keys)} sessions")
+            for key in keys:
+                self._end(key)
+
+    def apply(self, forwarder_id: str, lines):
+        self._seen(forwarder_id)
+        capture_enabled = self.beacon_sender.capture_state.enabled
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                self._apply_operation(forwarder_id, json.loads(line), capture_enabled)
+            except Exception as e:
+                # Skipped instead of failing the batch, the worker would forward the valid records again
+                self.logger.error(f"Could not apply a record forwarded by {forwarder_id}: {e}")
+
+    def _apply_operation(self, forwarder_id: str, operation: dict, capture_enabled: bool):
+        key = (forwarder_id, operation["sn"], operation["ss"])
+        op = operation["op"]
+
+        if op == OP_ACTION or op == OP_EVENT:
+            if not capture_enabled:
+                return
+            beacon = self._get_or_create_beacon(key)
+            timestamp = datetime.fromtimestamp(operation["ts"] / 1000)
+            if op == OP_ACTION:
+                self.beacon_cache.add_action(beacon.beacon_key, timestamp, operation["d"])
+            else:
+                self.beacon_cache.add_event(beacon.beacon_key, timestamp, operation["d"])
+        elif op == OP_OPEN:
+            self._open(key, operation)
+        elif op == OP_END:
+            self._end(key)
+        elif op == OP_CLEAR:
+            beacon = self._beacons.get(key)
+            if beacon is not None:
+                beacon.clear_data()
+
+    def _get_or_create_beacon(self, key: ForwardedKey) -> ForwardedBeacon:
+        beacon = self._beacons.get(key)
+        if beacon is None:
+            with self._lock:
+                beacon = self._beacons.get(key)
+                if beacon is None:
+                    # Workers pick their session numbers independently, cache keys come from the local sequence
+                    beacon_id = self.session_creator_context.session_id_provider.next_session_id
+                    beacon = ForwardedBeacon(self.logger,
+                                             self.session_creator_context,
+                                             BeaconKey(beacon_id, 0),
+                                             key[1])
+                    self._beacons[key] = beacon
+        return beacon
+
+    def _open(self, key: ForwardedKey, operation: dict):
+        beacon = self._get_or_create_beacon(key)
+        beacon.open(operation["start"], operation["ip"], operation["prefix"])
+        session = ForwardedSession(beacon)
+        with self._lock:
+            self._sessions[key] = session
+        self.beacon_sender.add_session(session)
+
+    def _end(self, key: ForwardedKey):
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            beacon = self._beacons.pop(key, None)
+        if session is not None:
+            session.end()
+        elif beacon is not None:
+            # Never opened, e.g. the worker lost the open while the aggregator restarted
+            beacon.clear_data()
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+
+class _AggregatorServer(ThreadingUnixStreamServer):
+
+    def service_actions(self):
+        # Called by serve_forever() between polls
+        self.aggregator.end_dead_forwarders()
+
+
+class _AggregatorRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path != STATUS_PATH:
+            self._respond(404)
+            return
+        status = self.server.aggregator.status(self.headers.get(FORWARDER_ID_HEADER, ""))
+        self._respond(200, json.dumps(status).encode("UTF-8"))
+
+    def do_POST(self):
+        if self.path != RECORDS_PATH:
+            self._respond(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("UTF-8")
+        self.server.aggregator.apply(self.headers.get(FORWARDER_ID_HEADER, ""), body.split("\n"))
+        self._respond(204)
+
+    def _respond(self, status: int, body: bytes = b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.server.aggregator.logger.debug(f"Aggregator request: {format % args}")
@@ -0,0 +1,291 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from threading import Lock, Thread
+from typing import List, Optional, TYPE_CHECKING
+
+from ..caching.beacon_key import BeaconKey
+from ..capture_state import CaptureState
+from ..communication.countdown_latch import CountDownLatch
+from ..configuration.server_configuration import ServerConfiguration, SharedServerConfiguration
+from ..session_registry import SessionRegistry
+from ..waiter import Waiter
+from ...vendor.mureq import mureq as requests
+
+if TYPE_CHECKING:
+    from ..objects.session import SessionImpl
+
+FORWARDER_ID_HEADER = "X-OpenKit-Forwarder"
+STATUS_PATH = "/status"
+RECORDS_PATH = "/records"
+
+OP_OPEN = "open"
+OP_END = "end"
+OP_CLEAR = "clear"
+OP_ACTION = "a"
+OP_EVENT = "e"
+
+
+class ForwardingBeaconCache:
+    """
+    Stands in for the BeaconCache of a worker process.
+
+    Records are only buffered as small tuples; the ForwardingBeaconSender serializes them in batches and pushes them to
+    the aggregator, which owns the real cache. Once max_pending_bytes are buffered, e.g. while the aggregator is down,
+    new records are dropped.
+    """
+
+    def __init__(self, logger: logging.Logger, max_pending_bytes: int, batch_size: int = 1000,
+                 waiter: Optional[Waiter] = None):
+        self.logger = logger
+        self.max_pending_bytes = max_pending_bytes
+        self.batch_size = batch_size
+        self.waiter = waiter
+        self._pending: List[tuple] = []
+        self._pending_bytes = 0
+        self._records_dropped = 0
+        self._lock = Lock()
+
+    def add_action(self, beacon_key: BeaconKey, timestamp: datetime, data: str):
+        self._add_record(OP_ACTION, beacon_key, timestamp, data)
+
+    def add_event(self, beacon_key: BeaconKey, timestamp: datetime, data: str):
+        self._add_record(OP_EVENT, beacon_key, timestamp, data)
+
+    def _add_record(self, op: str, beacon_key: BeaconKey, timestamp: datetime, data: str):
+        with self._lock:
+            if self._pending_bytes + len(data) > self.max_pending_bytes:
+                self.logger.debug(f"Forwarding buffer full, dropping record of {beacon_key}")
+                self._records_dropped += 1
+                return
+            self._pending.append((op, beacon_key.beacon_id, beacon_key.beacon_seq_number,
+                                  int(timestamp.timestamp() * 1000), data))
+            self._pending_bytes += len(data)
+            wake_up = len(self._pending) == self.batch_size
+
+        if wake_up and self.waiter is not None:
+            self.waiter.notify_all()
+
+    def add_operation(self, op: str, beacon_key: BeaconKey, **values):
+        with self._lock:
+            self._pending.append((op, beacon_key.beacon_id, beacon_key.beacon_seq_number, values))
+
+    def delete_cache_entry(self, beacon_key: BeaconKey):
+        self.add_operation(OP_CLEAR, beacon_key)
+
+    def records_evicted(self, beacon_key: BeaconKey) -> int:
+        # Drops are not tracked per beacon, any drop may have hit the given one
+        return self._records_dropped
+
+    def reset_after_fork(self):
+        # The parent still forwards what it buffered
+        self._lock = Lock()
+        self._pending = []
+        self._pending_bytes = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def take_pending(self) -> List[tuple]:
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._pending_bytes = 0
+        return pending
+
+    def restore_pending(self, pending: List[tuple]):
+        # A failed batch goes back in front of whatever was buffered meanwhile, the order per beacon must hold
+        with self._lock:
+            self._pending = pending + self._pending
+            self._pending_bytes = sum(len(operation[4]) for operation in self._pending if len(operation) == 5)
+
+    @staticmethod
+    def encode(pending: List[tuple]) -> bytes:
+        lines = []
+        for operation in pending:
+            if len(operation) == 5:
+                op, session_number, sequence_number, timestamp_ms, data = operation
+                line = {"op": op, "sn": session_number, "ss": sequence_number, "ts": timestamp_ms, "d": data}
+            else:
+                op, session_number, sequence_number, values = operation
+                line = {"op": op, "sn": session_number, "ss": sequence_number, **values}
+            lines.append(json.dumps(line, separators=(",", ":")))
+        return "\n".join(lines).encode("UTF-8")
+
+
+class ForwardingBeaconSenderThread(Thread):
+    def __init__(self, sender: "ForwardingBeaconSender"):
+        Thread.__init__(self, name="ForwardingBeaconSenderThread", daemon=True)
+        self.sender = sender
+
+    def run(self):
+        sender = self.sender
+        sender.logger.debug("ForwardingBeaconSenderThread - Running")
+
+        sender.initialize_from_aggregator()
+        while not sender.shutdown_requested:
+            sender.waiter.wait(sender.flush_interval,
+                               lambda: sender.shutdown_requested or
+                               sender.beacon_cache.pending_count >= sender.beacon_cache.batch_size)
+            sender.forward()
+            sender.refresh_status_if_due()
+
+        sender.flush_succeeded = sender.forward()
+        sender.logger.debug("ForwardingBeaconSenderThread - Exiting")
+
+
+class ForwardingBeaconSender:
+    """
+    Replaces the BeaconSender of a worker process that forwards to a local aggregator.
+
+    The server configuration is taken from the aggregator instead of the collector and sessions are never sent from
+    here, the worker only tells the aggregator when a session starts and ends.
+    """
+    STATUS_REFRESH_INTERVAL = 60.0  # seconds
+    RETRY_INTERVAL = 1.0  # seconds
+
+    def __init__(self,
+                 logger: logging.Logger,
+                 socket_path: str,
+                 beacon_cache: ForwardingBeaconCache,
+                 waiter: Optional[Waiter] = None,
+                 flush_interval: float = 1.0,
+                 timeout: float = 5.0):
+        self.logger = logger
+        self.socket_path = socket_path
+        self.beacon_cache = beacon_cache
+        self.waiter = waiter if waiter is not None else Waiter()
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.forwarder_id = str(os.getpid())
+
+        self.capture_state = CaptureState()
+        self.shared_server_configuration = SharedServerConfiguration()
+        self.sessions = SessionRegistry()
+
+        self.thread: Optional[ForwardingBeaconSenderThread] = None
+        self.countdown_latch = CountDownLatch()
+        self.init_succeeded = False
+        self.flush_succeeded = False
+        self._shutdown_requested = False
+        self._deadline: Optional[float] = None
+        self._next_status_refresh = 0.0
+        self._lock = Lock()
+
+    @property
+    def last_server_configuration(self) -> ServerConfiguration:
+        return self.shared_server_configuration.current
+
+    @last_server_configuration.setter
+    def last_server_configuration(self, server_configuration: ServerConfiguration):
+        self.shared_server_configuration.publish(server_configuration)
+        self.capture_state.enabled = server_configuration.capture_enabled
+
+    @property
+    def shutdown_requested(self) -> bool:
+        return self._shutdown_requested
+
+    def initialize(self):
+        self.ensure_running()
+
+    def ensure_running(self):
+        with self._lock:
+            if self.thread is None and not self._shutdown_requested:
+                self.thread = ForwardingBeaconSenderThread(self)
+                self.thread.start()
+
+    def initialize_from_aggregator(self):
+        while not self._shutdown_requested:
+            if self.refresh_status():
+                self.init_succeeded = True
+                break
+            self.waiter.wait(self.RETRY_INTERVAL, lambda: self._shutdown_requested)
+        self.countdown_latch.count_down()
+
+    def wait_for_init_completion(self, timeout_ms) -> bool:
+        return self.countdown_latch.wait(timeout_ms) and self.init_succeeded
+
+    def initialized(self):
+        return self.init_succeeded
+
+    def add_session(self, session: "SessionImpl"):
+        self.logger.debug(f"Adding session {session}")
+        beacon = session.beacon
+        self.beacon_cache.add_operation(OP_OPEN,
+                                        beacon.beacon_key,
+                                        start=int(beacon.session_start_time.timestamp() * 1000),
+                                        ip=beacon.ip_address,
+                                        prefix=beacon.immutable_beacon_data)
+        # Forwarded sessions are configured by the aggregator, locally they only need to be tracked until they end
+        session.update_server_config(self.shared_server_configuration)
+        self.sessions.add(session)
+
+    def forward(self) -> bool:
+        # Sessions are never sent from here, so this is where the event groups of open sessions get flushed
+        for session in self.sessions.open_and_configured_sessions():
+            session.beacon.flush_event_groups(expired_only=True)
+        for session in self.sessions.finished_and_configured_sessions():
+            self.sessions.remove(session)
+            self.beacon_cache.add_operation(OP_END, session.beacon.beacon_key)
+
+        pending = self.beacon_cache.take_pending()
+        if not pending:
+            return True
+
+        try:
+            response = self._request("POST", RECORDS_PATH, self.beacon_cache.encode(pending))
+            if response.ok:
+                return True
+            self.logger.warning(f"Aggregator rejected {len(pending)} forwarded records: {response.status_code}")
+        except Exception as e:
+            self.logger.warning(f"Could not forward {len(pending)} records to {self.socket_path}: {e}")
+
+        self.beacon_cache.restore_pending(pending)
+        return False
+
+    def refresh_status(self) -> bool:
+        try:
+            response = self._request("GET", STATUS_PATH)
+            if not response.ok:
+                return False
+            self.last_server_configuration = ServerConfiguration.from_dict(response.json())
+        except Exception as e:
+            self.logger.debug(f"Could not read the status from the aggregator at {self.socket_path}: {e}")
+            return False
+
+        self._next_status_refresh = time.monotonic() + self.STATUS_REFRESH_INTERVAL
+        self.logger.debug(f"Received server configuration from the aggregator: {self.last_server_configuration}")
+        return True
+
+    def refresh_status_if_due(self):
+        if time.monotonic() >= self._next_status_refresh:
+            self.refresh_status()
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> requests.Response:
+        timeout = self.timeout
+        if self._deadline is not None:
+            timeout = max(0.001, min(timeout, self._deadline - time.monotonic()))
+        return requests.request(method, f"http://localhost{path}", unix_socket=self.socket_path, body=body,
+                                headers={FORWARDER_ID_HEADER: self.forwarder_id}, timeout=timeout)
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        if timeout is not None:
+            self._deadline = time.monotonic() + timeout
+
+        self._shutdown_requested = True
+        self.waiter.notify_all()
+        if self.thread is None:
+            return self.flushed
+
+        if timeout is not None:
+            self.thread.join(max(0.0, self._deadline - time.monotonic()))
+        return self.flushed
+
+    @property
+    def flushed(self) -> bool:
+        if self.thread is not None and self.thread.is_alive():
+            return False
+        return self.flush_succeeded or (not self.sessions and not self.beacon_cache.pending_count)
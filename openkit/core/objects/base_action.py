@@ -3,6 +3,7 @@ from datetime import datetime
 from threading import RLock
 from typing import Optional, Union
 
+from .metrics_aggregator import MetricsAggregator
 from .null_web_request_tracer import NullWebRequestTracer
 from .web_request_tracer import WebRequestTracer, WebRequestTracerImpl
 from ...api.action import Action
@@ -12,6 +13,8 @@ from ...protocol.beacon import Beacon
 
 
 class BaseAction(OpenKitComposite, CancelableOpenKitObject, Action):
+    __slots__ = ("logger", "parent", "parent_action_id", "end_sequence_number", "name", "start_time", "end_time",
+                 "start_sequence_number", "was_left", "beacon", "lock", "metrics")
 
     def __init__(self, logger: logging.Logger, parent: OpenKitComposite, name: str, beacon: Beacon,
                  timestamp: Optional[datetime] = None):
@@ -34,6 +37,7 @@ class BaseAction(OpenKitComposite, CancelableOpenKitObject, Action):
 
         self.beacon = beacon
         self.lock = RLock()
+        self.metrics: Optional[MetricsAggregator] = None
 
     def _on_child_closed(self, child: OpenKitObject):
         with self.lock:
@@ -46,6 +50,8 @@ class BaseAction(OpenKitComposite, CancelableOpenKitObject, Action):
         self.leave_action()
 
     def report_event(self, event_name: str, timestamp: Optional[datetime] = None) -> "Action":
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.event_reporting_allowed:
+            return self
         if not event_name:
             self.logger.warning(f"event_name must not be empty")
             return self
@@ -54,25 +60,37 @@ class BaseAction(OpenKitComposite, CancelableOpenKitObject, Action):
         with self.lock:
             if not self.was_left:
                 self.beacon.report_event(self.id, event_name, timestamp)
+        return self
 
     def report_value(self,
                      value_name: str,
                      value: Union[str, int, float],
                      timestamp: Optional[datetime] = None) -> "Action":
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.value_reporting_allowed:
+            return self
         if not value_name:
             self.logger.warning(f"value_name must not be empty")
             return self
 
         self.logger.debug(f"report_value({value_name}, {value})")
         with self.lock:
-            if not self.was_left:
+            if self.was_left:
+                return self
+            if self.beacon.value_histogram_buckets is not None and type(value) in (int, float):
+                if self.metrics is None:
+                    self.metrics = MetricsAggregator(self.beacon.value_histogram_buckets)
+                self.metrics.add(value_name, value, timestamp if timestamp is not None else datetime.now())
+            else:
                 self.beacon.report_value(self.id, value_name, value, timestamp)
+        return self
 
     def report_error(self,
                      error_name: str,
                      error_code: int,
                      reason: str,
                      timestamp: Optional[datetime] = None) -> "Action":
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.error_reporting_allowed:
+            return self
         if not error_name:
             self.logger.warning(f"error_name must not be empty")
             return self
@@ -81,8 +99,11 @@ class BaseAction(OpenKitComposite, CancelableOpenKitObject, Action):
         with self.lock:
             if not self.was_left:
                 self.beacon.report_error(self.id, error_name, error_code, reason, timestamp)
+        return self
 
     def trace_web_request(self, url: str, timestamp: Optional[datetime] = None) -> WebRequestTracer:
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.web_request_tracing_allowed:
+            return NullWebRequestTracer()
         if not url:
             self.logger.warning(f"url must not be empty")
             return NullWebRequestTracer()
@@ -130,6 +151,13 @@ class BaseAction(OpenKitComposite, CancelableOpenKitObject, Action):
         if timestamp is None:
             timestamp = datetime.now()
 
+        with self.lock:
+            metrics = self.metrics
+            self.metrics = None
+        if metrics is not None and not discard:
+            for value_name, value, value_timestamp in metrics.summarize():
+                self.beacon.report_value(self.id, value_name, value, value_timestamp)
+
         self.end_time = timestamp
         self.end_sequence_number = self.beacon.next_sequence_number
 
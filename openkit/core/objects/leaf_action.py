@@ -5,6 +5,7 @@ from .base_action import BaseAction
 
 
 class LeafAction(BaseAction):
+    __slots__ = ()
 
     def __init__(self, logger, parent, name, beacon, timestamp: Optional[datetime] = None):
         super().__init__(logger, parent, name, beacon, timestamp)
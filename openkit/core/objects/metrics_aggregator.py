@@ -0,0 +1,75 @@
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple, Union
+
+Number = Union[int, float]
+
+
+class MetricSummary:
+    __slots__ = ("count", "sum", "min", "max", "bucket_counts", "last_timestamp")
+
+    def __init__(self, value: Number, bucket_count: int):
+        self.count = 0
+        self.sum = 0
+        self.min = value
+        self.max = value
+        self.bucket_counts = [0] * bucket_count
+        self.last_timestamp = None
+
+    def add(self, value: Number, bucket: int, timestamp: datetime):
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.bucket_counts[bucket] += 1
+        self.last_timestamp = timestamp
+
+
+class MetricsAggregator:
+    """
+    Accumulates the numeric values an action reports per name, until the action is left.
+
+    Each name is then reported as <name>.count, .sum, .min and .max, plus <name>.le_<bound> with the number of values
+    up to that bucket bound (and above the previous one) for every non-empty bucket, the last bucket is le_inf.
+    A name that was reported only once keeps its single value, so rarely reported values look the same as before.
+    All values of a name carry the timestamp of its last report.
+    """
+
+    def __init__(self, bucket_bounds: Sequence[Number]):
+        self.bucket_bounds = self.check_bucket_bounds(bucket_bounds)
+        self._metrics: Dict[str, MetricSummary] = {}
+
+    @staticmethod
+    def check_bucket_bounds(bucket_bounds: Sequence[Number]) -> Tuple[Number, ...]:
+        bucket_bounds = tuple(bucket_bounds)
+        # bisect only finds the right bucket in strictly increasing bounds
+        if any(lower >= upper for lower, upper in zip(bucket_bounds, bucket_bounds[1:])):
+            raise ValueError(f"Histogram bucket bounds must be strictly increasing: {bucket_bounds}")
+        return bucket_bounds
+
+    def add(self, name: str, value: Number, timestamp: datetime):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = MetricSummary(value, len(self.bucket_bounds) + 1)
+            self._metrics[name] = metric
+        metric.add(value, bisect_left(self.bucket_bounds, value), timestamp)
+
+    def summarize(self) -> List[Tuple[str, Number, datetime]]:
+        values = []
+        for name, metric in self._metrics.items():
+            timestamp = metric.last_timestamp
+            if metric.count == 1:
+                values.append((name, metric.sum, timestamp))
+                continue
+
+            values.append((f"{name}.count", metric.count, timestamp))
+            values.append((f"{name}.sum", metric.sum, timestamp))
+            values.append((f"{name}.min", metric.min, timestamp))
+            values.append((f"{name}.max", metric.max, timestamp))
+            for bucket, count in enumerate(metric.bucket_counts):
+                if count:
+                    bound = self.bucket_bounds[bucket] if bucket < len(self.bucket_bounds) else "inf"
+                    values.append((f"{name}.le_{bound}", count, timestamp))
+        return values
@@ -12,6 +12,7 @@ from ...protocol.beacon import Beacon
 
 
 class RootActionImpl(BaseAction, RootAction):
+    __slots__ = ()
 
     def __init__(self,
                  logger: logging.Logger,
@@ -22,6 +23,8 @@ class RootActionImpl(BaseAction, RootAction):
         super().__init__(logger, parent, name, beacon, timestamp)
 
     def enter_action(self, name: str, timestamp: Optional[datetime] = None) -> Action:
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.action_reporting_allowed:
+            return NullAction(self)
         if not name:
             self.logger.warning("action name must not be empty")
             return NullAction(self)
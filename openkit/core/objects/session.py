@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
-from threading import RLock
-from typing import Optional
+from threading import Lock
+from typing import Optional, TYPE_CHECKING
 
 from .null_root_action import NullRootAction
 from .null_web_request_tracer import NullWebRequestTracer
@@ -14,6 +14,9 @@ from ...api.session import Session
 from ...api.web_request_tracer import WebRequestTracer
 from ...protocol.beacon import Beacon
 
+if TYPE_CHECKING:
+    from ..session_registry import SessionRegistry
+
 
 class SessionImpl(Session, OpenKitComposite):
 
@@ -28,6 +31,8 @@ class SessionImpl(Session, OpenKitComposite):
         self.beacon.start_session()
 
     def enter_action(self, name: str, timestamp: Optional[datetime] = None) -> RootAction:
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.action_reporting_allowed:
+            return NullRootAction()
         if not name:
             self.logger.warning("action name must not be empty")
             return NullRootAction()
@@ -42,22 +47,26 @@ class SessionImpl(Session, OpenKitComposite):
         return NullRootAction()
 
     def identify_user(self, name: str, timestamp: Optional[datetime] = None) -> None:
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.user_identification_allowed:
+            return
         self.logger.debug(f"identify_user({name}, {timestamp})")
         if not self.state.is_finishing_or_finished:
             self.beacon.identify_user(name, timestamp)
 
     def report_crash(self, error_name, reason: str, stacktrace: str, timestamp: Optional[datetime] = None) -> None:
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.crash_reporting_allowed:
+            return
         if not error_name:
             self.logger.warning("error name must not be empty")
             return
 
-        self.logger.debug(f"report_crash({error_name}, {reason}, {stacktrace})")
+        self.logger.debug(f"report_crash({error_name}, {reason})")
         if not self.state.is_finishing_or_finished:
-            # .beacon.report_crash(error_name, reason, stacktrace, timestamp)
-            # TODO - beacon.report_crash
-            raise NotImplementedError
+            self.beacon.report_crash(error_name, reason, stacktrace, timestamp)
 
     def trace_web_request(self, url: str, timestamp: Optional[datetime] = None) -> WebRequestTracer:
+        if not self.beacon.capture_state.enabled or not self.beacon.privacy_config.web_request_tracing_allowed:
+            return NullWebRequestTracer()
         if not url:
             self.logger.warning("url must not be empty")
             return NullWebRequestTracer()
@@ -79,6 +88,8 @@ class SessionImpl(Session, OpenKitComposite):
         children = self._copy_children()
         for child in children:
             child._close()
+        # Closing the children may have added the last events of a group
+        self.beacon.flush_event_groups()
 
         if send_end_event:
             self.beacon.end_session()
@@ -112,16 +123,15 @@ class SessionImpl(Session, OpenKitComposite):
 
     def initialize_server_config(self, initial_config):
         self.beacon.initialize_server_config(initial_config)
+        self.state.notify_configured()
 
     def update_server_config(self, updated_config):
         self.beacon.update_server_config(updated_config)
+        self.state.notify_configured()
 
     def clear_captured_data(self):
         self.beacon.clear_data()
 
-    def update_server_configuration(self, new_server_config):
-        self.beacon.update_server_configuration(new_server_config)
-
     @property
     def data_sending_allowed(self) -> bool:
         return self.state.is_configured and self.beacon.data_capturing_enabled
@@ -131,6 +141,7 @@ class SessionImpl(Session, OpenKitComposite):
 
     def enable_capture(self):
         self.beacon.enable_capture()
+        self.state.notify_configured()
 
     @property
     def split_by_events_grace_period_end_time(self) -> datetime:
@@ -138,24 +149,27 @@ class SessionImpl(Session, OpenKitComposite):
 
 
 class SessionState:
+    __slots__ = ("session", "_is_finishing", "_is_finished", "_was_tried_for_ending", "registry", "_lock")
 
     def __init__(self, session: SessionImpl):
         self.session = session
         self._is_finishing: bool = False
         self._is_finished: bool = False
         self._was_tried_for_ending: bool = False
+        # Set by the SessionRegistry the session is tracked in
+        self.registry: Optional["SessionRegistry"] = None
 
-        self._lock = RLock()
+        self._lock = Lock()
+
+    # Reads are plain attribute loads, only the transitions take the lock
 
     @property
     def was_tried_for_ending(self) -> bool:
-        with self._lock:
-            return self._was_tried_for_ending
+        return self._was_tried_for_ending
 
     @property
     def is_configured(self) -> bool:
-        with self._lock:
-            return self.session.beacon.server_configuration_set
+        return self.session.beacon.server_configuration_set
 
     @property
     def is_configured_and_finished(self) -> bool:
@@ -167,24 +181,32 @@ class SessionState:
 
     @property
     def is_finished(self) -> bool:
-        with self._lock:
-            return self._is_finished
+        return self._is_finished
 
     @property
     def is_finishing_or_finished(self) -> bool:
-        with self._lock:
-            return self._is_finishing or self._is_finished
+        return self._is_finishing or self._is_finished
 
     def mark_as_finishing(self) -> bool:
         if self.is_finishing_or_finished:
             return False
         with self._lock:
+            if self._is_finishing or self._is_finished:
+                return False
             self._is_finishing = True
             return True
 
     def mark_as_finished(self):
         with self._lock:
             self._is_finished = True
+        registry = self.registry
+        if registry is not None:
+            registry.on_finished(self.session)
+
+    def notify_configured(self):
+        registry = self.registry
+        if registry is not None and self.is_configured:
+            registry.on_configured(self.session)
 
     def mark_was_tried_for_ending(self):
         with self._lock:
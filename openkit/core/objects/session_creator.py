@@ -4,40 +4,82 @@ from typing import Optional
 
 from .session import SessionImpl
 from ..caching.beacon_cache import BeaconCache
+from ..capture_state import CaptureState
 from ..configuration import OpenkitConfiguration
 from ..configuration.beacon_configuration import BeaconConfiguration
+from ..configuration.http_client_configuration import HttpClientConfiguration
 from ..configuration.privacy_configuration import PrivacyConfiguration
 from ...api.composite import OpenKitComposite
 from ...protocol.beacon import Beacon
 from ...providers.session_id import SessionIDProvider
 
 
-class SessionCreator:
+class SessionCreatorContext:
+    """Everything session creation needs that is the same for all sessions of an OpenKit instance."""
 
     def __init__(self,
                  logger: logging.Logger,
                  openkit_config: OpenkitConfiguration,
                  privacy_config: PrivacyConfiguration,
                  beacon_cache: BeaconCache,
-                 ip_address: str,
                  server_id: int,
-                 session_id_provider: SessionIDProvider):
+                 session_id_provider: SessionIDProvider,
+                 capture_state: Optional[CaptureState] = None):
         self.logger = logger
         self.openkit_config = openkit_config
         self.privacy_config = privacy_config
         self.beacon_cache = beacon_cache
-        self.ip_address = ip_address
         self.server_id = server_id
         self.session_id_provider = session_id_provider
+        self.capture_state = capture_state if capture_state is not None else CaptureState()
+        self.http_client_config = HttpClientConfiguration(openkit_config.endpoint_url,
+                                                          openkit_config.default_server_id,
+                                                          openkit_config.application_id)
+        self.static_beacon_data = Beacon.create_static_beacon_data(openkit_config, privacy_config)
+
+
+class SessionCreator:
+
+    def __init__(self, context: SessionCreatorContext, ip_address: Optional[str]):
+        self.context = context
+        self.ip_address = ip_address
         self.session_sequence_number = 0
 
+    @property
+    def logger(self) -> logging.Logger:
+        return self.context.logger
+
+    @property
+    def beacon_cache(self) -> BeaconCache:
+        return self.context.beacon_cache
+
+    @property
+    def session_id_provider(self) -> SessionIDProvider:
+        return self.context.session_id_provider
+
+    @property
+    def capture_state(self) -> CaptureState:
+        return self.context.capture_state
+
+    @property
+    def privacy_config(self) -> PrivacyConfiguration:
+        return self.context.privacy_config
+
+    @property
+    def static_beacon_data(self):
+        return self.context.static_beacon_data
+
     def create_session(self,
                        parent: OpenKitComposite,
                        device_id: Optional[int] = None,
                        timestamp: Optional[datetime] = None) -> SessionImpl:
-        beacon_config = BeaconConfiguration.create_from(self.openkit_config, self.privacy_config, self.server_id)
+        context = self.context
+        beacon_config = BeaconConfiguration(context.openkit_config,
+                                            context.privacy_config,
+                                            context.server_id,
+                                            context.http_client_config)
         beacon = Beacon(self, beacon_config, device_id, timestamp)
-        session = SessionImpl(self.logger, parent, beacon)
+        session = SessionImpl(context.logger, parent, beacon)
 
         self.session_sequence_number += 1
 
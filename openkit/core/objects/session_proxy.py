@@ -9,7 +9,7 @@ from .session import SessionImpl
 from .session_creator import SessionCreator
 from ..beacon_sender import BeaconSender
 from ..configuration import ServerConfiguration
-from ..configuration.server_configuration import ServerConfigurationUpdateCallback
+from ..configuration.server_configuration import ServerConfigurationUpdateCallback, SharedServerConfiguration
 from ...api.composite import OpenKitComposite
 from ...api.openkit_object import OpenKitObject
 from ...api.root_action import RootAction
@@ -48,13 +48,38 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
         self.last_user_tag = None
         self.lock = RLock()
 
-        self.server_config: Optional[ServerConfiguration] = None
-        current_server_config = beacon_sender.last_server_configuration
-        self.create_and_assign_current_session(current_server_config, None)
+        # Set once the first session got configured, from then on the configuration is read through the current session
+        self._server_configured = False
+        self._fixed_server_config: Optional[ServerConfiguration] = None
+        # Timeouts derived from server_config, recomputed only when the configuration object changes
+        self._timeouts_config: Optional[ServerConfiguration] = None
+        self._idle_timeout = timedelta(0)
+        self._max_session_duration = timedelta(0)
+        self._close_grace_period = timedelta(0)
+        self.create_and_assign_current_session(beacon_sender.shared_server_configuration, None)
+
+    @property
+    def server_config(self) -> Optional[ServerConfiguration]:
+        if self._fixed_server_config is not None:
+            return self._fixed_server_config
+        if not self._server_configured:
+            return None
+        return self.current_session.beacon.configuration.server_configuration
+
+    @server_config.setter
+    def server_config(self, server_config: Optional[ServerConfiguration]):
+        # Pins a configuration that no longer follows the updates of the beacon sender
+        self._fixed_server_config = server_config
+
+    @property
+    def shared_server_config(self) -> Optional[SharedServerConfiguration]:
+        if not self._server_configured:
+            return None
+        return self.beacon_sender.shared_server_configuration
 
     def create_and_assign_current_session(self,
-                                          initial_config: Optional[ServerConfiguration],
-                                          updated_config: Optional[ServerConfiguration]):
+                                          initial_config: Optional[SharedServerConfiguration],
+                                          updated_config: Optional[SharedServerConfiguration]):
         session = self.session_creator.create_session(self, self.device_id, self.timestamp)
         beacon = session.beacon
         beacon.set_server_config_update_callback(self)
@@ -75,35 +100,69 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
         self.beacon_sender.add_session(session)
 
     def on_server_configuration_update(self, server_configuration: ServerConfiguration):
-        # TODO - Implement Merge
-        pass
+        with self.lock:
+            if self._server_configured:
+                # Later updates are read through the shared configuration, nothing to merge
+                return
+            self._server_configured = True
+            if self.finished:
+                return
+
+        if server_configuration.session_split_by_session_duration_enabled or \
+                server_configuration.session_split_by_idle_timeout_enabled:
+            self.session_watchdog.add_to_split_by_timeout(self)
 
     def enter_action(self, name: str, timestamp: Optional[datetime] = None) -> RootAction:
+        if not self.session_creator.capture_state.enabled or \
+                not self.session_creator.privacy_config.action_reporting_allowed:
+            return NullRootAction()
         if not name:
             self.logger.warning("action name must not be empty")
             return NullRootAction()
 
         self.logger.debug(f"enter_action({name}, {timestamp})")
         with self.lock:
-            if not self.finished:
-                session = self.get_or_split_current_session_by_events()
-                return session.enter_action(name, timestamp)
+            if self.finished:
+                return NullRootAction()
+            session = self.get_or_split_current_session_by_events()
 
-        return NullRootAction()
+        # The beacon work happens outside the lock, SessionImpl handles a concurrent end on its own
+        return session.enter_action(name, timestamp)
 
     def identify_user(self, name: str, timestamp: Optional[datetime] = None) -> None:
+        if not self.session_creator.capture_state.enabled or \
+                not self.session_creator.privacy_config.user_identification_allowed:
+            return
         self.logger.debug(f"identify_user({name}, {timestamp})")
         with self.lock:
-            if not self.finished:
-                session = self.get_or_split_current_session_by_events()
-                self.record_top_level_event_interaction()
-                session.identify_user(name, timestamp)
-                self.last_user_tag = name
+            if self.finished:
+                return
+            session = self.get_or_split_current_session_by_events()
+            self.record_top_level_event_interaction()
+            self.last_user_tag = name
+
+        session.identify_user(name, timestamp)
 
     def report_crash(self, error_name, reason: str, stacktrace: str, timestamp: Optional[datetime] = None) -> None:
-        raise NotImplementedError
+        if not self.session_creator.capture_state.enabled or \
+                not self.session_creator.privacy_config.crash_reporting_allowed:
+            return
+        if not error_name:
+            self.logger.warning("error name must not be empty")
+            return
+        self.logger.debug(f"report_crash({error_name}, {reason}, {timestamp})")
+        with self.lock:
+            if self.finished:
+                return
+            session = self.get_or_split_current_session_by_events()
+            self.record_top_level_event_interaction()
+
+        session.report_crash(error_name, reason, stacktrace, timestamp)
 
     def trace_web_request(self, url: str, timestamp: Optional[datetime] = None) -> WebRequestTracer:
+        if not self.session_creator.capture_state.enabled or \
+                not self.session_creator.privacy_config.web_request_tracing_allowed:
+            return NullWebRequestTracer()
         if not url:
             self.logger.warning("url must not be empty")
             return NullWebRequestTracer()
@@ -111,18 +170,19 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
         self.logger.debug(f"trace_web_request({url}, {timestamp})")
 
         with self.lock:
-            if not self.finished:
-                session = self.get_or_split_current_session_by_events()
-                self.record_top_level_event_interaction()
-                return session.trace_web_request(url, timestamp)
+            if self.finished:
+                return NullWebRequestTracer()
+            session = self.get_or_split_current_session_by_events()
+            self.record_top_level_event_interaction()
 
-        return NullWebRequestTracer()
+        return session.trace_web_request(url, timestamp)
 
     def end(self, send_end_event: bool = True, timestamp: Optional[datetime] = None):
         self.logger.debug("end()")
         with self.lock:
             if self.finished:
                 return
+            self.finished = True
 
         self.close_child_objects(timestamp)
         self.parent._on_child_closed(self)
@@ -131,6 +191,14 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
     def _close(self):
         self.end()
 
+    def _discard_after_fork(self):
+        # In a forked child nothing sends this session anymore, it stops capturing without writing anything.
+        # The lock may have been held by a thread of the parent.
+        self.lock = RLock()
+        self.finished = True
+        for session in self._copy_children():
+            session.beacon.disable_capture()
+
     def _on_child_closed(self, child: OpenKitObject):
         with self.lock:
             self._remove_child_from_list(child)
@@ -163,16 +231,24 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
         return self.server_config.max_events_per_session <= self.top_level_action_count
 
     def close_or_enqueue_current_session_for_closing(self):
-        close_grace_period = 0
-        if self.server_config.session_timeout_in_milliseconds > 0:
-            close_grace_period = self.server_config.session_timeout_in_milliseconds / 2
-        else:
-            close_grace_period = self.server_config.send_interval_in_milliseconds
+        self._update_timeouts()
+        self.session_watchdog.close_or_enqueue_for_closing(self.current_session, self._close_grace_period)
+
+    def _update_timeouts(self):
+        server_config = self.server_config
+        if server_config is self._timeouts_config:
+            return
 
-        self.session_watchdog.close_or_enqueue_for_closing(self.current_session, close_grace_period)
+        self._idle_timeout = timedelta(milliseconds=server_config.session_timeout_in_milliseconds)
+        self._max_session_duration = timedelta(milliseconds=server_config.max_session_duration_in_milliseconds)
+        if server_config.session_timeout_in_milliseconds > 0:
+            self._close_grace_period = self._idle_timeout / 2
+        else:
+            self._close_grace_period = timedelta(milliseconds=server_config.send_interval_in_milliseconds)
+        self._timeouts_config = server_config
 
     def create_split_session_and_make_current(self):
-        self.create_and_assign_current_session(None, self.server_config)
+        self.create_and_assign_current_session(None, self.shared_server_config)
 
     def close_child_objects(self, timestamp: Optional[datetime] = None):
         children = self._copy_children()
@@ -183,13 +259,14 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
             else:
                 child._close()
 
-    def split_session_by_time(self) -> datetime:
+    def split_session_by_time(self, now: Optional[datetime] = None) -> datetime:
         with self.lock:
             if self.finished:
                 return datetime(1970, 1, 1)
 
         next_split_time = self.calculate_next_split_time()
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         if next_split_time > now:
             return next_split_time
 
@@ -200,13 +277,12 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
         if self.server_config is None:
             return datetime(1970, 1, 1)
 
+        self._update_timeouts()
         split_by_idle_timeout = self.server_config.session_split_by_idle_timeout_enabled
         split_by_session_duration = self.server_config.session_split_by_session_duration_enabled
 
-        idle_timeout = self.last_interaction_time + timedelta(milliseconds=self.server_config.session_timeout_in_milliseconds)
-        session_max_time = self.current_session.beacon.session_start_time + timedelta(milliseconds=self.server_config.max_session_duration_in_milliseconds)
-
-        self.logger.debug(f"calculate_next_split_time: idle_timeout={idle_timeout}, session_max_time={session_max_time}")
+        idle_timeout = self.last_interaction_time + self._idle_timeout
+        session_max_time = self.current_session.beacon.session_start_time + self._max_session_duration
 
         if split_by_idle_timeout and split_by_session_duration:
             return min(idle_timeout, session_max_time)
@@ -221,7 +297,7 @@ class SessionProxy(ServerConfigurationUpdateCallback, Session):
         self.close_or_enqueue_current_session_for_closing()
 
         self.session_creator.reset()
-        self.create_initial_session_and_make_current(self.server_config)
+        self.create_initial_session_and_make_current(self.shared_server_config)
         self.retag_current_session()
 
     def create_initial_session_and_make_current(self, server_config):
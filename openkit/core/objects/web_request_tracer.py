@@ -10,6 +10,8 @@ from ...protocol.beacon import Beacon
 
 
 class WebRequestTracerImpl(WebRequestTracer, CancelableOpenKitObject):
+    __slots__ = ("logger", "parent", "url", "beacon", "parent_action_id", "start_seq_no", "tag", "start_time",
+                 "end_time", "bytes_sent", "bytes_received", "response_code", "end_seq_no", "lock")
 
     def __init__(self,
                  logger: logging.Logger,
@@ -24,7 +26,8 @@ class WebRequestTracerImpl(WebRequestTracer, CancelableOpenKitObject):
         self.parent_action_id = parent.id
         self.start_seq_no = self.beacon.next_sequence_number
         self.tag = self.beacon.create_tag(self.parent_action_id, self.start_seq_no)
-        self.start_time = timestamp
+        # start() may move it, a tracer that is only stopped measures from its creation
+        self.start_time: datetime = timestamp if timestamp is not None else datetime.now()
         self.end_time: Optional[datetime] = None
 
         self.bytes_sent = 0
@@ -54,10 +57,12 @@ class WebRequestTracerImpl(WebRequestTracer, CancelableOpenKitObject):
 
         with self.lock:
             if not self.is_stopped:
-                if timestamp is None and not self.start_time:
+                if timestamp is None:
                     timestamp = datetime.now()
                 self.start_time = timestamp
-        self.logger.debug(f"WebRequestTracer.start {self}")
+        # __repr__ is comparatively expensive, only build it when it is logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"WebRequestTracer.start {self}")
         return self
 
     def stop(self,
@@ -72,7 +77,8 @@ class WebRequestTracerImpl(WebRequestTracer, CancelableOpenKitObject):
         if timestamp is None:
             timestamp = datetime.now()
         self.end_time = timestamp
-        self.logger.debug(f"WebRequestTracer.stop {response_code} {timestamp} {self}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"WebRequestTracer.stop {response_code} {timestamp} {self}")
 
         self.response_code = response_code
         self.end_seq_no = self.beacon.next_sequence_number
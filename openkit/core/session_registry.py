@@ -0,0 +1,75 @@
+from threading import Lock
+from typing import Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .objects.session import SessionImpl
+
+
+class SessionRegistry:
+    """
+    Sessions known to the beacon sender, bucketed by their state.
+
+    Sessions push their transitions (configured, finished) into the registry, so the sender reads the bucket it needs
+    instead of scanning and locking every session. Dicts keyed by id() keep the insertion order of the sessions.
+    """
+
+    def __init__(self):
+        self._not_configured: Dict[int, "SessionImpl"] = {}
+        self._open: Dict[int, "SessionImpl"] = {}
+        self._finished: Dict[int, "SessionImpl"] = {}
+        self._lock = Lock()
+
+    def add(self, session: "SessionImpl"):
+        # Listen before reading the state, a transition racing with add() is then either seen here or pushed later
+        session.state.registry = self
+        with self._lock:
+            key = id(session)
+            if not session.state.is_configured:
+                self._not_configured[key] = session
+            elif session.state.is_finished:
+                self._finished[key] = session
+            else:
+                self._open[key] = session
+
+    def remove(self, session: "SessionImpl"):
+        key = id(session)
+        with self._lock:
+            if self._not_configured.pop(key, None) is None and self._open.pop(key, None) is None:
+                self._finished.pop(key, None)
+        session.state.registry = None
+
+    def on_configured(self, session: "SessionImpl"):
+        key = id(session)
+        with self._lock:
+            if self._not_configured.pop(key, None) is None:
+                return
+            if session.state.is_finished:
+                self._finished[key] = session
+            else:
+                self._open[key] = session
+
+    def on_finished(self, session: "SessionImpl"):
+        key = id(session)
+        with self._lock:
+            if self._open.pop(key, None) is not None:
+                self._finished[key] = session
+
+    def not_configured_sessions(self) -> List["SessionImpl"]:
+        with self._lock:
+            return list(self._not_configured.values())
+
+    def open_and_configured_sessions(self) -> List["SessionImpl"]:
+        with self._lock:
+            return list(self._open.values())
+
+    def finished_and_configured_sessions(self) -> List["SessionImpl"]:
+        with self._lock:
+            return list(self._finished.values())
+
+    def all_sessions(self) -> List["SessionImpl"]:
+        with self._lock:
+            return [*self._not_configured.values(), *self._open.values(), *self._finished.values()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._not_configured) + len(self._open) + len(self._finished)
@@ -1,77 +1,128 @@
+import heapq
+import itertools
 import logging
 import time
 from datetime import datetime, timedelta
 from threading import Event, RLock, Thread
-from typing import List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .waiter import Waiter
 
 if TYPE_CHECKING:
     from .objects.session_proxy import SessionProxy, SessionImpl
 
 
 class SessionWatchdogContext:
-    DEFAULT_SLEEP_TIME = timedelta(seconds=5)
+    """
+    Keeps the sessions waiting to be closed or split in a heap ordered by their deadline.
 
-    def __init__(self):
-        self._shutdown = False
-        self.sessions_to_close: List["SessionImpl"] = []
-        self.sessions_to_split_by_timeout: List["SessionProxy"] = []
+    Entries are never removed from the heap, dequeuing a session just forgets its generation so the entry gets dropped
+    once it comes up. Each wakeup therefore only touches the sessions which are actually due.
+    """
+
+    CLOSE = 0
+    SPLIT = 1
 
+    def __init__(self, waiter: Optional[Waiter] = None):
+        self._shutdown = False
+        self._sessions_changed = False
+        self._heap: List[Tuple[float, int, int, Any]] = []
+        self._sequence = itertools.count()
+        # id(session) -> sequence number of its live heap entry
+        self.sessions_to_close: Dict[int, int] = {}
+        self.sessions_to_split_by_timeout: Dict[int, int] = {}
+
+        self.waiter = waiter if waiter is not None else Waiter()
         self.lock = RLock()
 
     def execute(self):
-        duration_to_next_close = self.close_expired_sessions()
-        duration_to_next_split = self.split_timed_out_sessions()
+        self.close_expired_sessions()
+        self.split_timed_out_sessions()
 
         try:
-            sleep_time = min(duration_to_next_close, duration_to_next_split)
-            time.sleep(sleep_time.total_seconds())
+            self.waiter.wait(self.time_to_next_deadline(), self.wake_up_requested)
+            self._sessions_changed = False
         except KeyboardInterrupt:
             self.request_shutdown()
 
-    def split_timed_out_sessions(self) -> timedelta:
-        sleep_time: timedelta = self.DEFAULT_SLEEP_TIME
-        sessions_to_split = self.sessions_to_split_by_timeout.copy()
+    def wake_up_requested(self) -> bool:
+        return self._shutdown or self._sessions_changed
 
-        for session_proxy in sessions_to_split:
-            next_session_split_time = session_proxy.split_session_by_time()
-            if next_session_split_time == datetime(1970, 1, 1):
-                self.sessions_to_split_by_timeout.remove(session_proxy)
-                continue
-
-            now = datetime.now()
-            duration_to_next_split = next_session_split_time - now
-            if duration_to_next_split < timedelta(seconds=0):
-                continue
+    def notify_sessions_changed(self):
+        self._sessions_changed = True
+        self.waiter.notify_all()
 
-            sleep_time = min(sleep_time, duration_to_next_split)
+    def time_to_next_deadline(self, now: Optional[float] = None) -> Optional[float]:
+        with self.lock:
+            self._drop_stale_entries()
+            if not self._heap:
+                return None
+            deadline = self._heap[0][0]
 
-        return sleep_time
+        if now is None:
+            now = time.time()
+        return max(0.0, deadline - now)
 
-    def close_expired_sessions(self) -> timedelta:
-        sleep_time: timedelta = self.DEFAULT_SLEEP_TIME
-        sessions_to_end: List["SessionImpl"] = []
+    def split_timed_out_sessions(self, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
 
-        sessions_to_close = self.sessions_to_close.copy()
-        for session in sessions_to_close:
-            now = datetime.now()
-            grace_period_end = session.split_by_events_grace_period_end_time
-            grace_period_expired = now >= grace_period_end
-            if grace_period_expired:
-                sessions_to_end.append(session)
-                self.sessions_to_close.remove(session)
+        for session_proxy in self._pop_due(self.SPLIT, now):
+            next_session_split_time = session_proxy.split_session_by_time(datetime.fromtimestamp(now))
+            if next_session_split_time == datetime(1970, 1, 1):
                 continue
+            self._push(self.SPLIT, session_proxy, next_session_split_time.timestamp(), self.sessions_to_split_by_timeout)
 
-            sleep_time_to_grace_period_end = grace_period_end - now
-            sleep_time = min(sleep_time, sleep_time_to_grace_period_end)
+    def close_expired_sessions(self, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
 
-        for session in sessions_to_end:
+        for session in self._pop_due(self.CLOSE, now):
             session.end(send_end_event=False)
 
-        return sleep_time
+    def _pop_due(self, kind: int, now: float) -> List[Any]:
+        due = []
+        postponed = []
+        with self.lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if entry[2] != kind:
+                    postponed.append(entry)
+                    continue
+                live_entries = self._live_entries(kind)
+                if live_entries.get(id(entry[3])) == entry[1]:
+                    del live_entries[id(entry[3])]
+                    due.append(entry[3])
+            for entry in postponed:
+                heapq.heappush(self._heap, entry)
+        return due
+
+    def _push(self, kind: int, session: Any, deadline: float, live_entries: Dict[int, int]):
+        with self.lock:
+            sequence = next(self._sequence)
+            live_entries[id(session)] = sequence
+            heapq.heappush(self._heap, (deadline, sequence, kind, session))
+            if len(self._heap) > 2 * (len(self.sessions_to_close) + len(self.sessions_to_split_by_timeout)) + 64:
+                self._compact()
+
+    def _live_entries(self, kind: int) -> Dict[int, int]:
+        return self.sessions_to_close if kind == self.CLOSE else self.sessions_to_split_by_timeout
+
+    def _is_live(self, entry: Tuple[float, int, int, Any]) -> bool:
+        return self._live_entries(entry[2]).get(id(entry[3])) == entry[1]
+
+    def _drop_stale_entries(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
 
     def request_shutdown(self):
         with self.lock:
             self._shutdown = True
+        self.waiter.notify_all()
 
     def shutdown_requested(self):
         with self.lock:
@@ -83,24 +134,23 @@ class SessionWatchdogContext:
 
         close_time = datetime.now() + close_period
         session._split_by_events_grace_period_end_time = close_time
-        with self.lock:
-            self.sessions_to_close.append(session)
+        self._push(self.CLOSE, session, close_time.timestamp(), self.sessions_to_close)
+        self.notify_sessions_changed()
 
     def dequeue_from_closing(self, session: "SessionImpl"):
         with self.lock:
-            if session in self.sessions_to_close:
-                self.sessions_to_close.remove(session)
+            self.sessions_to_close.pop(id(session), None)
 
     def add_to_split_by_timeout(self, session: "SessionProxy"):
         if session.finished:
             return
-        with self.lock:
-            self.sessions_to_split_by_timeout.append(session)
+        # Due right away, the first check computes the real split time
+        self._push(self.SPLIT, session, 0.0, self.sessions_to_split_by_timeout)
+        self.notify_sessions_changed()
 
     def remove_from_split_by_timeout(self, session: "SessionProxy"):
         with self.lock:
-            if session in self.sessions_to_split_by_timeout:
-                self.sessions_to_split_by_timeout.remove(session)
+            self.sessions_to_split_by_timeout.pop(id(session), None)
 
 
 class SessionWatchdogThread(Thread):
@@ -0,0 +1,22 @@
+from threading import Condition
+from typing import Callable, Optional
+
+
+class Waiter:
+    """
+    Condition shared by the background threads of an OpenKit instance.
+
+    Every wait is bound to a predicate. notify_all() wakes every waiting thread, each one goes back to sleep unless its
+    own predicate became true, so shutdown and newly queued work are picked up immediately instead of after a timeout.
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+
+    def wait(self, timeout: Optional[float], predicate: Callable[[], bool]) -> bool:
+        with self._condition:
+            return self._condition.wait_for(predicate, timeout)
+
+    def notify_all(self):
+        with self._condition:
+            self._condition.notify_all()
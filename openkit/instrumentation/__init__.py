@@ -0,0 +1,2 @@
+from .context import current_parent, traced_by
+from .http_client import instrument_http_client, uninstrument_http_client
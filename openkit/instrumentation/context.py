@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Union
+
+from ..api.action import Action
+from ..api.session import Session
+
+# Action or session instrumented requests are traced on, per thread and asyncio task
+_current_parent: ContextVar[Optional[Union[Action, Session]]] = ContextVar("openkit_current_parent", default=None)
+
+
+def current_parent() -> Optional[Union[Action, Session]]:
+    return _current_parent.get()
+
+
+@contextmanager
+def traced_by(parent: Union[Action, Session]) -> Iterator[Union[Action, Session]]:
+    token = _current_parent.set(parent)
+    try:
+        yield parent
+    finally:
+        _current_parent.reset(token)
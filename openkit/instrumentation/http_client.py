@@ -0,0 +1,105 @@
+import http.client
+from typing import Callable, Dict
+
+from .context import _current_parent
+from ..api.constants import WEBREQUEST_TAG_HEADER
+
+_originals: Dict[str, Callable] = {}
+
+
+def _putrequest(self, method, url, *args, **kwargs):
+    _originals["putrequest"](self, method, url, *args, **kwargs)
+    self._openkit_tracer = None
+    parent = _current_parent.get()
+    if parent is None:
+        return
+
+    # The query is left out, it often holds identifiers that would make every request unique
+    tracer = parent.trace_web_request(_traced_url(self, url.split("?", 1)[0]))
+    tag = tracer.get_tag()
+    if not tag:
+        return
+
+    self.putheader(WEBREQUEST_TAG_HEADER, tag)
+    self._openkit_tracer = tracer.start()
+    self._openkit_bytes_sent = 0
+
+
+def _traced_url(connection: http.client.HTTPConnection, path: str) -> str:
+    if path[:8].lower().startswith(("http://", "https://")):
+        # Requests through an HTTP proxy name the absolute URL
+        return path
+    # Through an HTTPS proxy the connection goes to the proxy and tunnels to the actual host
+    host = getattr(connection, "_tunnel_host", None) or connection.host
+    port = getattr(connection, "_tunnel_port", None) or connection.port
+    scheme = "https" if isinstance(connection, http.client.HTTPSConnection) else "http"
+    return f"{scheme}://{host}:{port}{path}"
+
+
+def _stop_on_failure(self):
+    # Without a response getresponse never stops the tracer, it would stay open until its parent is left
+    tracer = getattr(self, "_openkit_tracer", None)
+    if tracer is None:
+        return
+    self._openkit_tracer = None
+    tracer.set_bytes_sent(self._openkit_bytes_sent)
+    tracer.stop(-1)
+
+
+def _endheaders(self, *args, **kwargs):
+    try:
+        _originals["endheaders"](self, *args, **kwargs)
+    except BaseException:
+        _stop_on_failure(self)
+        raise
+
+
+def _send(self, data):
+    if getattr(self, "_openkit_tracer", None) is not None and hasattr(data, "__len__"):
+        self._openkit_bytes_sent += len(data)
+    try:
+        _originals["send"](self, data)
+    except BaseException:
+        _stop_on_failure(self)
+        raise
+
+
+def _getresponse(self):
+    tracer = getattr(self, "_openkit_tracer", None)
+    if tracer is None:
+        return _originals["getresponse"](self)
+
+    self._openkit_tracer = None
+    tracer.set_bytes_sent(self._openkit_bytes_sent)
+    try:
+        response = _originals["getresponse"](self)
+    except BaseException:
+        tracer.stop(-1)
+        raise
+
+    if response.length is not None:
+        tracer.set_bytes_received(response.length)
+    tracer.stop(response.status)
+    return response
+
+
+def instrument_http_client():
+    """
+    Traces the requests of http.client, and therefore urllib.request, as web requests of the current parent.
+
+    Requests are only traced inside traced_by(), they get the x-dynatrace tag header and report the response code,
+    the bytes sent including headers and the bytes received according to Content-Length. Requests that fail before
+    a response arrives are reported with response code -1.
+    """
+    if _originals:
+        return
+    for name, replacement in (("putrequest", _putrequest), ("endheaders", _endheaders), ("send", _send),
+                              ("getresponse", _getresponse)):
+        _originals[name] = getattr(http.client.HTTPConnection, name)
+        setattr(http.client.HTTPConnection, name, replacement)
+
+
+def uninstrument_http_client():
+    for name, original in _originals.items():
+        setattr(http.client.HTTPConnection, name, original)
+    _originals.clear()
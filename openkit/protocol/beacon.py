@@ -1,27 +1,40 @@
+import itertools
 import random
 from datetime import datetime
-from threading import RLock, get_ident
-from typing import Optional, TYPE_CHECKING, Union
+from hashlib import blake2b
+from threading import get_ident
+from typing import Dict, List, Optional, TYPE_CHECKING, Tuple, Union
 from urllib.parse import quote
 from urllib.parse import quote_plus
 
 from ..core.caching.beacon_key import BeaconKey
-from ..core.configuration.server_configuration import ServerConfigurationUpdateCallback
+from ..core.caching.event_aggregator import EventAggregator, EventGroup
+from ..core.configuration.server_configuration import (ServerConfiguration,
+                                                      ServerConfigurationUpdateCallback,
+                                                      SharedServerConfiguration)
 from ..protocol.event_type import EventType
 from ..protocol.http_client import (ERROR_TECHNOLOGY_TYPE,
                                     OPENKIT_VERSION,
                                     PLATFORM_TYPE_OPENKIT,
                                     PROTOCOL_VERSION)
 from ..protocol.status_response import StatusResponse
+from ..providers.traffic_control import traffic_control_value
 
 if TYPE_CHECKING:
     from ..core.configuration.beacon_configuration import BeaconConfiguration
+    from ..core.configuration.openkit_configuration import OpenkitConfiguration
+    from ..core.configuration.privacy_configuration import PrivacyConfiguration
     from ..core.objects.base_action import BaseAction
     from ..core.caching.beacon_cache import BeaconCache
     from ..protocol.http_client import HttpClient
     from ..core.objects.session_creator import SessionCreator
 
 MAX_NAME_LEN = 250
+MAX_REASON_LEN = 1000
+MAX_STACKTRACE_LEN = 128 * 1000
+# Stack traces at least this long are sent in full once per session, repetitions only carry their fingerprint
+CRASH_FINGERPRINT_MIN_LEN = 2 * 1024
+MAX_CRASH_FINGERPRINTS = 64
 
 class Beacon:
     # basic data constants
@@ -67,12 +80,19 @@ class Beacon:
     BEACON_KEY_ERROR_REASON = "rs"
     BEACON_KEY_ERROR_STACKTRACE = "st"
     BEACON_KEY_ERROR_TECHNOLOGY_TYPE = "tt"
+    BEACON_KEY_ERROR_STACKTRACE_FINGERPRINT = "sf"
+    BEACON_KEY_ERROR_STACKTRACE_OCCURRENCE = "so"
 
     # web request constants
     BEACON_KEY_WEBREQUEST_RESPONSECODE = "rc"
     BEACON_KEY_WEBREQUEST_BYTES_SENT = "bs"
     BEACON_KEY_WEBREQUEST_BYTES_RECEIVED = "br"
 
+    # aggregated event constants
+    BEACON_KEY_OCCURRENCES = "oc"
+    BEACON_KEY_DURATION_MIN = "dn"
+    BEACON_KEY_DURATION_MAX = "dx"
+
     CHARSET = "UTF-8"
 
     TAG_PREFIX = "MT"
@@ -85,13 +105,13 @@ class Beacon:
             device_id = None,
             session_start_time = None,
     ):
-        self.logger = beacon_initializer.logger
         self.session_number = beacon_initializer.session_id_provider.next_session_id
         self.session_sequence_number = beacon_initializer.session_sequence_number
-        self.beacon_cache: BeaconCache = beacon_initializer.beacon_cache
-        self.session_sequence_number = beacon_initializer.session_sequence_number
-        self.beacon_key = BeaconKey(self.session_number, self.session_sequence_number)
-        self.configuration = beacon_configuration
+        self._initialize_state(beacon_initializer.logger,
+                               beacon_initializer.beacon_cache,
+                               BeaconKey(self.session_number, self.session_sequence_number),
+                               beacon_configuration,
+                               beacon_initializer.capture_state)
 
         if session_start_time is None:
             session_start_time: datetime = datetime.now()
@@ -100,65 +120,106 @@ class Beacon:
         # This allows user to set a DeviceID per session
         if device_id is None:
             device_id = self.configuration.openkit_config.deviceID
+        self.traffic_control_value = traffic_control_value(device_id)
+        if not self.privacy_config.device_id_sending_allowed:
+            device_id = random.randint(0, 2 ** 63 - 1)
         self.device_id = device_id
 
+        # The cache and the endpoints keep using the real session number, only the reported one is hidden
+        self.reported_session_number = self.session_number
+        if not self.privacy_config.session_number_reporting_allowed:
+            self.reported_session_number = 1
+
         ip_address = beacon_initializer.ip_address
         if ip_address is None:
             ip_address = ""
         self.ip_address = ip_address
 
-        self._next_id = 0
-        self._next_sequence_number = 0
-        self.traffic_control_value = random.randint(0, 100)
-
-        self._lock = RLock()
-
-        self.immutable_beacon_data = self.create_immutable_beacon_data()
+        self.immutable_beacon_data = self.create_immutable_beacon_data(beacon_initializer.static_beacon_data)
+
+    def _initialize_state(self,
+                          logger,
+                          beacon_cache: "BeaconCache",
+                          beacon_key: BeaconKey,
+                          beacon_configuration: "BeaconConfiguration",
+                          capture_state):
+        # Everything but the identity of the session, shared with the beacons an aggregator sends for its workers
+        self.logger = logger
+        self.beacon_cache = beacon_cache
+        self.beacon_key = beacon_key
+        self.configuration = beacon_configuration
+        self.capture_state = capture_state
+        self.privacy_config = beacon_configuration.privacy_config
+
+        # next() on itertools.count is atomic, no lock needed
+        self._id_counter = itertools.count(1)
+        self._sequence_number_counter = itertools.count(1)
+        # Fingerprint of a large stack trace -> counter of its next occurrence
+        self._crash_fingerprints: Dict[str, itertools.count] = {}
+        # Records of this beacon the cache evicted when the fingerprints were last checked, see deduplicate_stacktrace()
+        self._crash_fingerprints_evictions = 0
+
+        self.event_aggregator: Optional[EventAggregator] = None
+        aggregation_window = self.configuration.openkit_config.event_aggregation_window
+        if aggregation_window:
+            self.event_aggregator = EventAggregator(aggregation_window)
+        # Everything of a tag that only changes with the server configuration, see create_tag()
+        self._tag_prefix: Optional[Tuple[ServerConfiguration, str]] = None
+        # None unless numeric action values are summarized, see BaseAction.report_value()
+        self.value_histogram_buckets = self.configuration.openkit_config.value_histogram_buckets
 
     @property
     def next_id(self):
-        with self._lock:
-            self._next_id += 1
-            return self._next_id
+        return next(self._id_counter)
 
     @property
     def next_sequence_number(self):
-        with self._lock:
-            self._next_sequence_number += 1
-            return self._next_sequence_number
+        return next(self._sequence_number_counter)
 
-    def create_immutable_beacon_data(self) -> str:
-        openkit_config = self.configuration.openkit_config
-
-        string_parts = [
+    @staticmethod
+    def create_static_beacon_data(openkit_config: "OpenkitConfiguration",
+                                  privacy_config: "PrivacyConfiguration") -> Tuple[str, str]:
+        # Encoded once per OpenKit instance, the parts before and after the per session fields
+        head = [
             # version and application information
-            self.add_key_value_pair(self.BEACON_KEY_PROTOCOL_VERSION, PROTOCOL_VERSION),
-            self.add_key_value_pair(self.BEACON_KEY_OPENKIT_VERSION, OPENKIT_VERSION),
-            self.add_key_value_pair(self.BEACON_KEY_APPLICATION_ID, openkit_config.application_id),
-            self.add_key_value_pair(self.BEACON_KEY_APPLICATION_NAME, openkit_config.application_name),
-            self.add_key_value_pair(self.BEACON_KEY_APPLICATION_VERSION, openkit_config.application_version),
-            self.add_key_value_pair(self.BEACON_KEY_PLATFORM_TYPE, PLATFORM_TYPE_OPENKIT),
-            self.add_key_value_pair(self.BEACON_KEY_AGENT_TECHNOLOGY_TYPE, self.configuration.openkit_config.technology_type),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_PROTOCOL_VERSION, PROTOCOL_VERSION),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_OPENKIT_VERSION, OPENKIT_VERSION),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_APPLICATION_ID, openkit_config.application_id),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_APPLICATION_NAME, openkit_config.application_name),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_APPLICATION_VERSION, openkit_config.application_version),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_PLATFORM_TYPE, PLATFORM_TYPE_OPENKIT),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_AGENT_TECHNOLOGY_TYPE, openkit_config.technology_type),
+        ]
+        tail = [
+            # platform information
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_DEVICE_OS, openkit_config.operating_system),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_DEVICE_MANUFACTURER, openkit_config.manufacturer),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_DEVICE_MODEL, openkit_config.model_id),
+
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_DATA_COLLECTION_LEVEL,
+                                      privacy_config.data_collection_level.value),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_CRASH_REPORTING_LEVEL,
+                                      privacy_config.crash_reporting_level.value),
+        ]
+        return "".join(head), "".join(tail)
+
+    def create_immutable_beacon_data(self, static_beacon_data: Tuple[str, str]) -> str:
+        head, tail = static_beacon_data
 
+        string_parts = [
+            head,
             # device/visitor ID, session number and IP address
             self.add_key_value_pair(self.BEACON_KEY_VISITOR_ID, self.device_id),
-            self.add_key_value_pair(self.BEACON_KEY_SESSION_NUMBER, self.session_number),
+            self.add_key_value_pair(self.BEACON_KEY_SESSION_NUMBER, self.reported_session_number),
             self.add_key_value_pair(self.BEACON_KEY_CLIENT_IP_ADDRESS, self.ip_address),
-
-            # platform information
-            self.add_key_value_pair(self.BEACON_KEY_DEVICE_OS, openkit_config.operating_system),
-            self.add_key_value_pair(self.BEACON_KEY_DEVICE_MANUFACTURER, openkit_config.manufacturer),
-            self.add_key_value_pair(self.BEACON_KEY_DEVICE_MODEL, openkit_config.model_id),
-
-            self.add_key_value_pair(self.BEACON_KEY_DATA_COLLECTION_LEVEL,
-                                    self.configuration.privacy_config.data_collection_level.value),
-            self.add_key_value_pair(self.BEACON_KEY_CRASH_REPORTING_LEVEL,
-                                    self.configuration.privacy_config.crash_reporting_level.value),
+            tail,
         ]
 
         return "".join(string_parts)
 
     def start_session(self):
+        if not self.privacy_config.session_reporting_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
@@ -172,26 +233,33 @@ class Beacon:
         self.add_event_data(self.session_start_time, "".join(string_parts))
 
     def create_tag(self, parent_action_id: int, tracer_seq_no: int):
+        if not self.privacy_config.web_request_tracing_allowed:
+            return ""
+
+        server_configuration = self.configuration.server_configuration
+        tag_prefix = self._tag_prefix
+        if tag_prefix is None or tag_prefix[0] is not server_configuration:
+            tag_prefix = (server_configuration, self.create_tag_prefix(server_configuration))
+            self._tag_prefix = tag_prefix
 
-        server_id = self.configuration.server_configuration.server_id
+        return f"{tag_prefix[1]}_{parent_action_id}_{get_ident() & 0xfffffff}_{tracer_seq_no}"  # thread id: 32 bits
 
+    def create_tag_prefix(self, server_configuration: ServerConfiguration) -> str:
         string_parts = [
             Beacon.TAG_PREFIX,
             f"_{PROTOCOL_VERSION}",
-            f"_{server_id}",
+            f"_{server_configuration.server_id}",
             f"_{self.device_id}",
-            f"_{self.session_number}",
-            f"-{self.session_sequence_number}" if self.configuration.server_configuration.visit_store_version > 1 else "",
+            f"_{self.reported_session_number}",
+            f"-{self.session_sequence_number}" if server_configuration.visit_store_version > 1 else "",
             f"_{quote(self.configuration.openkit_config.application_id)}",
-            f"_{parent_action_id}",
-            f"_{get_ident() & 0xfffffff}",  # 32 bits
-            f"_{tracer_seq_no}",
         ]
 
         return "".join(string_parts)
 
     def add_action(self, action: "BaseAction"):
-
+        if not self.privacy_config.action_reporting_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
@@ -209,6 +277,8 @@ class Beacon:
         self.add_action_data(action.start_time, "".join(string_data))
 
     def end_session(self, end_time: Optional[datetime] = None):
+        if not self.privacy_config.session_reporting_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
@@ -229,6 +299,8 @@ class Beacon:
                      value_name: str,
                      value: Union[str, int, float],
                      timestamp: Optional[datetime] = None):
+        if not self.privacy_config.value_reporting_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
@@ -248,6 +320,8 @@ class Beacon:
         self.add_event_data(event_time, "".join(string_parts))
 
     def report_event(self, parent_action_id: int, event_name: str, timestamp: Optional[datetime] = None):
+        if not self.privacy_config.event_reporting_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
@@ -264,6 +338,8 @@ class Beacon:
         self.add_event_data(timestamp, "".join(string_parts))
 
     def identify_user(self, user_tag: str, timestamp: Optional[datetime] = None):
+        if not self.privacy_config.user_identification_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
@@ -284,24 +360,84 @@ class Beacon:
                      error_code: int,
                      reason: str,
                      timestamp: Optional[datetime] = None):
+        if not self.privacy_config.error_reporting_allowed:
+            return
         if not self.configuration.server_configuration.capture_enabled:
             return
 
         if timestamp is None:
             timestamp = datetime.now()
 
+        def encode():
+            string_parts = [
+                self.build_basic_event_data(EventType.ERROR, error_name),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_PARENT_ACTION_ID, parent_action_id),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_START_SEQUENCE_NUMBER, self.next_sequence_number),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_TIME_0, self.time_since_session_started(timestamp)),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_CODE, error_code),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_REASON, reason),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_TECHNOLOGY_TYPE, ERROR_TECHNOLOGY_TYPE),
+            ]
+            return "".join(string_parts)
+
+        if self.event_aggregator is not None:
+            key = (EventType.ERROR, parent_action_id, error_name, error_code, reason)
+            self.add_event_groups(self.event_aggregator.add(key, timestamp, encode))
+            return
+
+        self.add_event_data(timestamp, encode())
+
+    def report_crash(self, error_name: str, reason: str, stacktrace: str, timestamp: Optional[datetime] = None):
+        if not self.privacy_config.crash_reporting_allowed:
+            return
+        server_configuration = self.configuration.server_configuration
+        if not server_configuration.capture_enabled or not server_configuration.crash_reporting_enabled:
+            return
+
+        if timestamp is None:
+            timestamp = datetime.now()
+
+        stacktrace, fingerprint, occurrence = self.deduplicate_stacktrace(stacktrace)
         string_parts = [
-            self.build_basic_event_data(EventType.ERROR, error_name),
-            Beacon.add_key_value_pair(Beacon.BEACON_KEY_PARENT_ACTION_ID, parent_action_id),
+            self.build_basic_event_data(EventType.CRASH, error_name),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_PARENT_ACTION_ID, 0),
             Beacon.add_key_value_pair(Beacon.BEACON_KEY_START_SEQUENCE_NUMBER, self.next_sequence_number),
             Beacon.add_key_value_pair(Beacon.BEACON_KEY_TIME_0, self.time_since_session_started(timestamp)),
-            Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_CODE, error_code),
-            Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_REASON, reason),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_REASON, reason[:MAX_REASON_LEN] if reason else reason),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_STACKTRACE, stacktrace),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_STACKTRACE_FINGERPRINT, fingerprint),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_STACKTRACE_OCCURRENCE, occurrence),
             Beacon.add_key_value_pair(Beacon.BEACON_KEY_ERROR_TECHNOLOGY_TYPE, ERROR_TECHNOLOGY_TYPE),
         ]
 
         self.add_event_data(timestamp, "".join(string_parts))
 
+    def deduplicate_stacktrace(self, stacktrace: str) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        # Large stack traces are sent unchanged the first time, together with their fingerprint. Repetitions leave the
+        # stack trace out and only carry the fingerprint and the number of the occurrence.
+        if not stacktrace:
+            return stacktrace, None, None
+        stacktrace = stacktrace[:MAX_STACKTRACE_LEN]
+        if len(stacktrace) < CRASH_FINGERPRINT_MIN_LEN:
+            return stacktrace, None, None
+
+        # Evicted records may have carried full stack traces, those have to be sent again. Failed sends put their
+        # records back into the cache and clear_data() resets the fingerprints, so eviction is the only loss to check.
+        evictions = self.beacon_cache.records_evicted(self.beacon_key)
+        if evictions != self._crash_fingerprints_evictions:
+            self._crash_fingerprints.clear()
+            self._crash_fingerprints_evictions = evictions
+
+        fingerprint = blake2b(stacktrace.encode(Beacon.CHARSET), digest_size=8).hexdigest()
+        occurrences = self._crash_fingerprints.get(fingerprint)
+        if occurrences is not None:
+            return None, fingerprint, next(occurrences)
+
+        # Once the cache is full, new stack traces are always sent in full
+        if len(self._crash_fingerprints) < MAX_CRASH_FINGERPRINTS:
+            self._crash_fingerprints.setdefault(fingerprint, itertools.count(2))
+        return stacktrace, fingerprint, None
+
     def build_event(self,
                     event_type: EventType,
                     name: str,
@@ -328,8 +464,14 @@ class Beacon:
             self.beacon_cache.add_action(self.beacon_key, timestamp, string)
 
     def add_web_request(self, parent_action_id: int, web_request_tracer):
+        if not self.privacy_config.web_request_tracing_allowed:
+            return
 
         duration = int((web_request_tracer.end_time - web_request_tracer.start_time).total_seconds() * 1000)
+        if self.event_aggregator is not None:
+            self.add_aggregated_web_request(parent_action_id, web_request_tracer, duration)
+            return
+
         string_parts = [
             Beacon.build_basic_event_data(EventType.WEB_REQUEST, web_request_tracer.url),
             Beacon.add_key_value_pair(Beacon.BEACON_KEY_PARENT_ACTION_ID, parent_action_id),
@@ -351,6 +493,55 @@ class Beacon:
 
         self.add_event_data(web_request_tracer.start_time, "".join(string_parts))
 
+    def add_aggregated_web_request(self, parent_action_id: int, web_request_tracer, duration: int):
+        def encode():
+            string_parts = [
+                Beacon.build_basic_event_data(EventType.WEB_REQUEST, web_request_tracer.url),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_PARENT_ACTION_ID, parent_action_id),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_START_SEQUENCE_NUMBER, web_request_tracer.start_seq_no),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_TIME_0,
+                                          self.time_since_session_started(web_request_tracer.start_time)),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_END_SEQUENCE_NUMBER, web_request_tracer.end_seq_no),
+                Beacon.add_key_value_pair(Beacon.BEACON_KEY_WEBREQUEST_RESPONSECODE, web_request_tracer.response_code),
+            ]
+            return "".join(string_parts)
+
+        key = (EventType.WEB_REQUEST, parent_action_id, web_request_tracer.url, web_request_tracer.response_code)
+        self.add_event_groups(self.event_aggregator.add(key,
+                                                        web_request_tracer.start_time,
+                                                        encode,
+                                                        duration,
+                                                        web_request_tracer.bytes_sent,
+                                                        web_request_tracer.bytes_received))
+
+    def add_event_groups(self, groups: List[EventGroup]):
+        for group in groups:
+            self.add_event_data(group.timestamp, Beacon.encode_event_group(group))
+
+    def flush_event_groups(self, expired_only: bool = False):
+        if self.event_aggregator is None:
+            return
+        if expired_only:
+            self.add_event_groups(self.event_aggregator.take_expired())
+        else:
+            self.add_event_groups(self.event_aggregator.take_all())
+
+    @staticmethod
+    def encode_event_group(group: EventGroup) -> str:
+        # A group of a single event is encoded like the event itself
+        string_parts = [group.data]
+        if group.duration_sum is not None:
+            string_parts.append(Beacon.add_key_value_pair(Beacon.BEACON_KEY_TIME_1, group.duration_sum))
+            string_parts.append(Beacon.add_key_value_pair(Beacon.BEACON_KEY_WEBREQUEST_BYTES_RECEIVED,
+                                                          group.bytes_received))
+            string_parts.append(Beacon.add_key_value_pair(Beacon.BEACON_KEY_WEBREQUEST_BYTES_SENT, group.bytes_sent))
+        if group.count > 1:
+            string_parts.append(Beacon.add_key_value_pair(Beacon.BEACON_KEY_OCCURRENCES, group.count))
+            if group.duration_sum is not None:
+                string_parts.append(Beacon.add_key_value_pair(Beacon.BEACON_KEY_DURATION_MIN, group.duration_min))
+                string_parts.append(Beacon.add_key_value_pair(Beacon.BEACON_KEY_DURATION_MAX, group.duration_max))
+        return "".join(string_parts)
+
     @property
     def current_timestamp(self) -> int:
         return int(datetime.now().timestamp() * 1000)
@@ -359,15 +550,11 @@ class Beacon:
         difference = int((timestamp - self.session_start_time).total_seconds() * 1000)
         return difference
 
-    def update_server_configuration(self, server_configuration):
-        self.logger.debug(f"Received new server configuration: {server_configuration}")
-        self.configuration.server_configuration = server_configuration
-        self.configuration.server_configured = True
-
     def send(self, http_client: "HttpClient", additional_params) -> StatusResponse:
 
         response: Optional[StatusResponse] = None
 
+        self.flush_event_groups()
         self.beacon_cache.prepare_data_for_sending(self.beacon_key)
         while self.beacon_cache.has_data_for_sending(self.beacon_key):
 
@@ -399,7 +586,10 @@ class Beacon:
                 self.beacon_cache.reset_chunked_data(self.beacon_key)
                 return response
 
-            response = http_client.send_beacon_request(self.ip_address, encoded_chunk, additional_params)
+            response = http_client.send_beacon_request(self.ip_address,
+                                                       encoded_chunk,
+                                                       additional_params,
+                                                       self.session_number)
             if response is None or response.is_error_response():
                 self.beacon_cache.reset_chunked_data(self.beacon_key)
                 break
@@ -439,9 +629,9 @@ class Beacon:
         name = truncate(name)
 
         string_parts = [
-            Beacon.add_key_value_pair(Beacon.BEACON_KEY_EVENT_TYPE, str(event_type.value)),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_EVENT_TYPE, event_type.value),
             Beacon.add_key_value_pair(Beacon.BEACON_KEY_NAME, name),
-            Beacon.add_key_value_pair(Beacon.BEACON_KEY_THREAD_ID, str(get_ident() & 0xFFFFFFF)),
+            Beacon.add_key_value_pair(Beacon.BEACON_KEY_THREAD_ID, get_ident() & 0xFFFFFFF),
         ]
 
         return "".join(string_parts)
@@ -450,6 +640,9 @@ class Beacon:
     def add_key_value_pair(key: str, value: Union[str, int, float]):
         if value != 0 and not value:
             return ""
+        if type(value) is int:
+            # Digits and "-" never need quoting
+            return f"&{key}={value}"
         encoded_value = quote(f"{value}")
         string_parts = [Beacon.append_key(key), encoded_value]
         return "".join(string_parts)
@@ -465,14 +658,22 @@ class Beacon:
     def set_server_config_update_callback(self, callback: ServerConfigurationUpdateCallback):
         self.configuration.server_config_update_callback = callback
 
-    def initialize_server_config(self, initial_config):
-        pass
+    def initialize_server_config(self, initial_config: SharedServerConfiguration):
+        # Used until the session is configured, e.g. for the visit store version of the first chunk
+        self.configuration.initialize_server_configuration(initial_config)
 
-    def update_server_config(self, updated_config):
-        pass
+    def update_server_config(self, updated_config: SharedServerConfiguration):
+        self.logger.debug(f"Using server configuration version {updated_config.version}")
+        self.configuration.update_server_configuration(updated_config)
+        self.configuration.notify_server_configuration_update()
 
     def clear_data(self):
         self.beacon_cache.delete_cache_entry(self.beacon_key)
+        # The full stack traces are gone, repetitions have to send them again
+        self._crash_fingerprints.clear()
+        self._crash_fingerprints_evictions = 0
+        if self.event_aggregator is not None:
+            self.event_aggregator.take_all()
 
     @property
     def server_configuration_set(self):
@@ -487,6 +688,9 @@ class Beacon:
     def enable_capture(self):
         self.configuration.enable_capture()
 
+    def disable_capture(self):
+        self.configuration.disable_capture()
+
 
 def truncate(name: str):
     if name:
@@ -0,0 +1,105 @@
+import time
+import zlib
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, List, Optional
+
+
+class BeaconEndpoint:
+
+    def __init__(self, base_url: str, server_id: int):
+        self.base_url = base_url
+        self.server_id = server_id
+        self.consecutive_failures = 0
+        self.last_failure_time = 0.0
+
+    def __repr__(self):
+        return f"BeaconEndpoint [url={self.base_url}, server_id={self.server_id}, failures={self.consecutive_failures}]"
+
+
+class EndpointRing:
+    """
+    Consistent hash ring over the beacon endpoints.
+
+    Sessions are mapped to endpoints by their session number. An endpoint that failed FAILURE_THRESHOLD times in a row
+    is skipped, its sessions move to the next endpoint on the ring until a probe request after RETRY_INTERVAL succeeds.
+    """
+
+    VIRTUAL_NODES = 64
+    FAILURE_THRESHOLD = 3
+    RETRY_INTERVAL = 60  # seconds
+
+    def __init__(self, base_urls: List[str], server_id: int, clock: Callable[[], float] = time.monotonic):
+        if not base_urls:
+            raise ValueError("At least one beacon endpoint is required")
+
+        self.endpoints = [BeaconEndpoint(base_url, server_id) for base_url in base_urls]
+        self._clock = clock
+        self._lock = Lock()
+
+        ring = []
+        for index, endpoint in enumerate(self.endpoints):
+            for node in range(self.VIRTUAL_NODES):
+                ring.append((self.hash(f"{endpoint.base_url}#{node}"), index))
+        ring.sort()
+        self._ring_hashes = [point for point, _ in ring]
+        self._ring_endpoints = [index for _, index in ring]
+
+    @property
+    def primary(self) -> BeaconEndpoint:
+        return self.endpoints[0]
+
+    @staticmethod
+    def hash(key: str) -> int:
+        return zlib.crc32(key.encode("UTF-8"))
+
+    def endpoints_for(self, session_number: Optional[int] = None) -> List[BeaconEndpoint]:
+        if len(self.endpoints) == 1:
+            return self.endpoints
+
+        if session_number is None:
+            ordered = self.endpoints
+        else:
+            ordered = self._ring_order(session_number)
+
+        now = self._clock()
+        available = []
+        unavailable = []
+        for endpoint in ordered:
+            if self._is_available(endpoint, now):
+                available.append(endpoint)
+            else:
+                unavailable.append(endpoint)
+
+        # Unavailable endpoints are still tried last, sending to a degraded node beats dropping the data
+        return available + unavailable
+
+    def on_success(self, endpoint: BeaconEndpoint):
+        if endpoint.consecutive_failures:
+            with self._lock:
+                endpoint.consecutive_failures = 0
+
+    def on_failure(self, endpoint: BeaconEndpoint):
+        with self._lock:
+            endpoint.consecutive_failures += 1
+            endpoint.last_failure_time = self._clock()
+
+    def _is_available(self, endpoint: BeaconEndpoint, now: float) -> bool:
+        if endpoint.consecutive_failures < self.FAILURE_THRESHOLD:
+            return True
+        return now - endpoint.last_failure_time >= self.RETRY_INTERVAL
+
+    def _ring_order(self, session_number: int) -> List[BeaconEndpoint]:
+        position = bisect_left(self._ring_hashes, self.hash(str(session_number)))
+        ring_size = len(self._ring_endpoints)
+
+        seen = set()
+        ordered = []
+        for offset in range(ring_size):
+            index = self._ring_endpoints[(position + offset) % ring_size]
+            if index not in seen:
+                seen.add(index)
+                ordered.append(self.endpoints[index])
+                if len(ordered) == len(self.endpoints):
+                    break
+        return ordered
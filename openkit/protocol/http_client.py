@@ -1,10 +1,15 @@
 import logging
+import time
 from enum import Enum
-from typing import Optional
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING, Tuple, Type, Union
 from urllib.parse import quote
 
-from .status_response import StatusResponse
-from ..vendor.mureq import mureq as requests
+from .endpoints import BeaconEndpoint, EndpointRing
+from .rate_limiter import AdaptiveRateLimiter
+from .status_response import StatusResponse, parse_retry_after
+
+if TYPE_CHECKING:
+    from .transport import Transport
 
 REQUEST_TYPE_MOBILE = "type=m"
 
@@ -35,32 +40,129 @@ class RequestType(Enum):
 class HttpClient:
     def __init__(self,
                  logger: logging.Logger,
-                 base_url: str,
+                 base_url: Union[str, List[str]],
                  server_id: int,
                  application_id: str,
-                 verify_certificates: bool):
+                 verify_certificates: bool,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 transport: Optional["Transport"] = None,
+                 wait: Optional[Callable[[float], bool]] = None):
         self.logger = logger
-        self.server_id = server_id
-        self.monitor_url = self.build_monitor_url(base_url, application_id, server_id)
-        self.new_session_url = self.build_session_url()
+        if isinstance(base_url, str):
+            base_url = [base_url]
+        self.endpoints = EndpointRing(base_url, server_id)
+        self.application_id = application_id
         self.verify_certificates = verify_certificates
+        # The transports are only imported by a client, importing openkit does not pay for them
+        from .transport import DEFAULT_TIMEOUT, MureqTransport
+        self.transport = transport if transport is not None else MureqTransport(verify_certificates)
+        self.default_timeout = DEFAULT_TIMEOUT
+        # Resolved on the first request together with http.client
+        self._request_errors: Optional[Tuple[Type[BaseException], ...]] = None
+        # wait(seconds) replaces the sleep for the rate limiter and returns True when shutdown interrupted it
+        self.wait = wait
+        self.deadline: Optional[float] = None
+        self._monitor_urls: Dict[Tuple[str, int], str] = {}
+
+        if rate_limiter is None:
+            rate_limiter = AdaptiveRateLimiter()
+        self.rate_limiter = rate_limiter
+
+    @property
+    def server_id(self) -> int:
+        return self.endpoints.primary.server_id
 
     def send_request(self,
                      request_type: RequestType,
-                     url: str,
                      client_ip_address: Optional[str],
-                     data: Optional[str],
-                     method: str) -> StatusResponse:
-        self.logger.debug(f"Sending request type {request_type} ({url})")
+                     data: Optional[bytes],
+                     method: str,
+                     additional_params,
+                     session_number: Optional[int] = None) -> StatusResponse:
 
         headers = {}
         if client_ip_address is not None:
             headers = {"X-Client-IP": client_ip_address}
-        r = requests.request(method, url, body=data, headers=headers, verify=self.verify_certificates)
-        if data:
-            self.logger.debug(f"Beacon data: {data}")
-        self.logger.debug(f"Response for {request_type} ({url}): {r.status_code}: {r.content}")
-        return StatusResponse(r)
+
+        if self._request_errors is None:
+            # Imported on first use like in transport.py
+            from http.client import HTTPException
+            self._request_errors = (HTTPException, OSError)
+
+        response = StatusResponse(None)
+        for endpoint in self.endpoints.endpoints_for(session_number):
+            url = self.build_request_url(endpoint, request_type, additional_params)
+            self.logger.debug(f"Sending request type {request_type} ({url})")
+
+            if not self.rate_limiter.acquire(len(data) if data else 0, self.deadline, self.wait_for_rate_limit):
+                self.logger.warning(f"Request type {request_type} skipped, it is rate limited past shutdown")
+                return response
+            timeout = self.request_timeout
+            if timeout <= 0:
+                self.logger.warning(f"Request type {request_type} skipped, the shutdown deadline passed")
+                return response
+            try:
+                r = self.transport.request(method, url, headers, data, timeout)
+            except self._request_errors as e:
+                self.logger.warning(f"Request type {request_type} to {endpoint.base_url} failed: {e}")
+                self.endpoints.on_failure(endpoint)
+                self.rate_limiter.decrease()
+                continue
+
+            self.rate_limiter.on_response(r.status_code, parse_retry_after(r))
+            if data:
+                self.logger.debug(f"Beacon data: {data}")
+            self.logger.debug(f"Response for {request_type} ({url}): {r.status_code}: {r.content}")
+
+            response = StatusResponse(r)
+            if r.status_code >= 500:
+                # Server side errors move the request over to the next endpoint
+                self.endpoints.on_failure(endpoint)
+                continue
+
+            self.endpoints.on_success(endpoint)
+            if response.is_ok_response() and "server_id" in response.present_attributes:
+                endpoint.server_id = response.server_id
+            return response
+
+        return response
+
+    def close(self):
+        self.transport.close()
+
+    def wait_for_rate_limit(self, seconds: float) -> bool:
+        # Shutdown interrupts the wait, the request is then only sent if its turn still comes before the deadline
+        if self.wait is None:
+            time.sleep(seconds)
+            return False
+        ready_at = time.monotonic() + seconds
+        if not self.wait(seconds):
+            return False
+        deadline = self.deadline
+        if deadline is None or ready_at > deadline:
+            return True
+        time.sleep(max(0.0, ready_at - time.monotonic()))
+        return False
+
+    @property
+    def request_timeout(self) -> float:
+        if self.deadline is None:
+            return self.default_timeout
+        # Never let a single request outlive the shutdown deadline, nothing is sent once it passed
+        return min(self.default_timeout, self.deadline - time.monotonic())
+
+    def build_request_url(self, endpoint: BeaconEndpoint, request_type: RequestType, additional_params) -> str:
+        key = (endpoint.base_url, endpoint.server_id)
+        monitor_url = self._monitor_urls.get(key)
+        if monitor_url is None:
+            monitor_url = self.build_monitor_url(endpoint.base_url, self.application_id, endpoint.server_id)
+            self._monitor_urls[key] = monitor_url
+
+        url_parts = [monitor_url]
+        if request_type == RequestType.NEW_SESSION:
+            url_parts.append(self.append_parameter(QUERY_KEY_NEW_SESSION, "1"))
+        url_parts.append(self.append_additional_query_parameters(additional_params))
+        return "".join(url_parts)
 
     def build_monitor_url(self, base_url, application_id, server_id) -> str:
         url_parts = [
@@ -75,31 +177,24 @@ class HttpClient:
 
         return "".join(url_parts)
 
-    def build_session_url(self) -> str:
-
-        url_parts = [self.monitor_url, self.append_parameter(QUERY_KEY_NEW_SESSION, "1")]
-        return "".join(url_parts)
-
     def send_status_request(self, additional_params):
-        url = self.append_additional_query_parameters(self.monitor_url, additional_params)
-        return self.send_request(RequestType.STATUS, url, None, None, "GET")
+        return self.send_request(RequestType.STATUS, None, None, "GET", additional_params)
 
-    def send_new_session_request(self, additional_params):
-        url = self.append_additional_query_parameters(self.new_session_url, additional_params)
-        return self.send_request(RequestType.NEW_SESSION, url, None, None, "GET")
+    def send_new_session_request(self, additional_params, session_number: Optional[int] = None):
+        return self.send_request(RequestType.NEW_SESSION, None, None, "GET", additional_params, session_number)
 
-    def send_beacon_request(self, client_ip: str, data: str, additional_params) -> StatusResponse:
-        url = self.append_additional_query_parameters(self.monitor_url, additional_params)
-        return self.send_request(RequestType.BEACON, url, client_ip, data, "POST")
+    def send_beacon_request(self,
+                            client_ip: str,
+                            data: bytes,
+                            additional_params,
+                            session_number: Optional[int] = None) -> StatusResponse:
+        return self.send_request(RequestType.BEACON, client_ip, data, "POST", additional_params, session_number)
 
-    def append_additional_query_parameters(self, base_url: str, params):
+    def append_additional_query_parameters(self, params):
         if params is None:
             return ""
 
-        url_parts = [base_url,
-                     self.append_parameter(QUERY_KEY_CONFIG_TIMESTAMP, str(params.get_configuration_timestamp()))]
-
-        return "".join(url_parts)
+        return self.append_parameter(QUERY_KEY_CONFIG_TIMESTAMP, str(params.get_configuration_timestamp()))
 
     @staticmethod
     def append_parameter(key, value) -> str:
@@ -0,0 +1,148 @@
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+
+class TokenBucket:
+
+    def __init__(self, max_rate: float, now: float):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.tokens = max_rate
+        self.last_refill = now
+
+    def set_rate_fraction(self, fraction: float):
+        self.rate = self.max_rate * fraction
+
+    def reserve(self, cost: float, now: float) -> float:
+        # A bucket holds at most one second worth of tokens at the current rate.
+        # Reservations are allowed to go into debt, the caller has to wait until the debt is paid back
+        self.tokens = min(self.rate, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD rate limiter for the requests sent to the collector.
+
+    Requests per second and bytes per second are capped by token buckets. The allowed rate is halved every time the
+    collector answers with 429 or 5xx and grows again by a small fixed step for every successful response.
+
+    Without max_requests_per_second the first 429 or 5xx caps requests at the observed request rate, which the
+    collector just refused. Once the allowed rate is back at that cap, every successful response raises the cap by the
+    same step, so it keeps following what the collector accepts.
+    """
+
+    MIN_RATE_FRACTION = 1 / 64
+    DECREASE_FACTOR = 0.5
+    INCREASE_STEP = 0.05
+    # Requests are counted over windows of this many seconds to derive the cap
+    OBSERVATION_WINDOW = 10.0
+    MIN_DERIVED_REQUESTS_PER_SECOND = 1.0
+
+    def __init__(self,
+                 max_requests_per_second: Optional[float] = None,
+                 max_bytes_per_second: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+
+        now = clock()
+        self._request_bucket = TokenBucket(max_requests_per_second, now) if max_requests_per_second else None
+        self._byte_bucket = TokenBucket(max_bytes_per_second, now) if max_bytes_per_second else None
+        self._rate_fraction = 1.0
+        self._blocked_until = 0.0
+        # Additive increase of a derived request cap, 0 while the cap is configured or not derived yet
+        self._derived_rate_step = 0.0
+        self._window_start = now
+        self._window_requests = 0
+        self._last_window_rate = 0.0
+
+    @property
+    def rate_fraction(self) -> float:
+        return self._rate_fraction
+
+    @property
+    def max_requests_per_second(self) -> Optional[float]:
+        return self._request_bucket.max_rate if self._request_bucket is not None else None
+
+    def reserve(self, num_bytes: int = 0) -> float:
+        with self._lock:
+            now = self._clock()
+            self._observe_request(now)
+            delay = max(0.0, self._blocked_until - now)
+            if self._request_bucket is not None:
+                delay = max(delay, self._request_bucket.reserve(1, now))
+            if self._byte_bucket is not None:
+                delay = max(delay, self._byte_bucket.reserve(num_bytes, now))
+            return delay
+
+    def acquire(self,
+                num_bytes: int = 0,
+                deadline: Optional[float] = None,
+                wait: Optional[Callable[[float], bool]] = None) -> bool:
+        """
+        Blocks until the request may be sent, returns False when it has to be skipped instead.
+
+        Without waiting, a request is skipped if its turn comes after the deadline. wait(seconds) replaces the sleep
+        and returns True when it was interrupted, e.g. by shutdown, which skips the request as well.
+        """
+        delay = self.reserve(num_bytes)
+        if delay <= 0:
+            return True
+        if deadline is not None and self._clock() + delay > deadline:
+            return False
+        if wait is None:
+            self._sleep(delay)
+            return True
+        return not wait(delay)
+
+    def on_response(self, status_code: int, retry_after_seconds: Optional[float] = None):
+        if status_code == 429 or status_code >= 500:
+            self.decrease(retry_after_seconds)
+        elif status_code < 400:
+            self.increase()
+
+    def decrease(self, retry_after_seconds: Optional[float] = None):
+        with self._lock:
+            if self._request_bucket is None:
+                self._derive_request_bucket()
+            self._set_rate_fraction(max(self.MIN_RATE_FRACTION, self._rate_fraction * self.DECREASE_FACTOR))
+            if retry_after_seconds is not None:
+                self._blocked_until = max(self._blocked_until, self._clock() + retry_after_seconds)
+
+    def increase(self):
+        with self._lock:
+            if self._rate_fraction < 1.0:
+                self._set_rate_fraction(min(1.0, self._rate_fraction + self.INCREASE_STEP))
+            elif self._derived_rate_step:
+                self._request_bucket.max_rate += self._derived_rate_step
+                self._request_bucket.set_rate_fraction(1.0)
+
+    def _observe_request(self, now: float):
+        elapsed = now - self._window_start
+        if elapsed >= self.OBSERVATION_WINDOW:
+            self._last_window_rate = self._window_requests / elapsed
+            self._window_start = now
+            self._window_requests = 0
+        self._window_requests += 1
+
+    def _derive_request_bucket(self):
+        now = self._clock()
+        # The current window counts as at least one second, a single early request is no rate
+        current_rate = self._window_requests / max(1.0, now - self._window_start)
+        max_rate = max(self.MIN_DERIVED_REQUESTS_PER_SECOND, self._last_window_rate, current_rate)
+        self._request_bucket = TokenBucket(max_rate, now)
+        self._derived_rate_step = max_rate * self.INCREASE_STEP
+
+    def _set_rate_fraction(self, fraction: float):
+        self._rate_fraction = fraction
+        for bucket in (self._request_bucket, self._byte_bucket):
+            if bucket is not None:
+                bucket.set_rate_fraction(fraction)
@@ -1,4 +1,5 @@
-from typing import Optional, TYPE_CHECKING
+import copy
+from typing import FrozenSet, Optional, TYPE_CHECKING
 
 RESPONSE_KEY_AGENT_CONFIG = "mobileAgentConfig"
 RESPONSE_KEY_MAX_BEACON_SIZE_IN_KB = "maxBeaconSizeKb"
@@ -12,6 +13,7 @@ RESPONSE_KEY_APP_CONFIG = "appConfig"
 RESPONSE_KEY_CAPTURE = "capture"
 RESPONSE_KEY_REPORT_CRASHES = "reportCrashes"
 RESPONSE_KEY_REPORT_ERRORS = "reportErrors"
+RESPONSE_KEY_TRAFFIC_CONTROL_PERCENTAGE = "trafficControlPercentage"
 
 RESPONSE_KEY_DYNAMIC_CONFIG = "dynamicConfig"
 RESPONSE_KEY_MULTIPLICITY = "multiplicity"
@@ -19,11 +21,19 @@ RESPONSE_KEY_SERVER_ID = "serverId"
 
 RESPONSE_KEY_TIMESTAMP_IN_MILLIS = "timestamp"
 
+RESPONSE_HEADER_RETRY_AFTER = "retry-after"
+DEFAULT_RETRY_AFTER_IN_MILLISECONDS = 10 * 60 * 1000  # 10 minutes
+
 if TYPE_CHECKING:
     from ..vendor.mureq.mureq import Response
 
 
 class StatusResponse:
+    __slots__ = ("http_response", "max_beacon_size", "max_session_duration", "max_events_per_session",
+                 "session_timeout", "send_interval", "visit_store_version", "capture", "capture_crashes",
+                 "capture_errors", "traffic_control_percentage", "multiplicity", "server_id", "timestamp",
+                 "present_attributes")
+
     def __init__(self, response: Optional["Response"]):
         self.http_response = response
         self.max_beacon_size = 150 * 1024
@@ -35,12 +45,16 @@ class StatusResponse:
         self.capture = True
         self.capture_crashes = True
         self.capture_errors = True
+        self.traffic_control_percentage = 100
         self.multiplicity = 1
         self.server_id = 1
         self.timestamp = 0
+        # Names of the attributes the response actually contained, see merged_into()
+        self.present_attributes: FrozenSet[str] = frozenset()
 
         if response is not None and response.status_code < 400:
             json_response: dict = response.json()
+            present = []
 
             # AGENT Configuration
             agent_config: dict = json_response.get(RESPONSE_KEY_AGENT_CONFIG)
@@ -49,37 +63,76 @@ class StatusResponse:
                 max_beacon_size = agent_config.get(RESPONSE_KEY_MAX_BEACON_SIZE_IN_KB)
                 if max_beacon_size is not None:
                     self.max_beacon_size = int(max_beacon_size) * 1024  # We need bytes, server responds in KB
+                    present.append("max_beacon_size")
 
                 max_session_duration = agent_config.get(RESPONSE_KEY_MAX_SESSION_DURATION_IN_MIN)
                 if max_session_duration is not None:
                     self.max_session_duration = int(max_session_duration) * 60 * 1000  # We need ms, server responds in m
+                    present.append("max_session_duration")
 
-                self.max_events_per_session = agent_config.get(RESPONSE_KEY_MAX_EVENTS_PER_SESSION, self.max_events_per_session)
+                max_events_per_session = agent_config.get(RESPONSE_KEY_MAX_EVENTS_PER_SESSION)
+                if max_events_per_session is not None:
+                    self.max_events_per_session = max_events_per_session
+                    present.append("max_events_per_session")
 
                 session_timeout = agent_config.get(RESPONSE_KEY_SESSION_TIMEOUT_IN_SEC)
                 if session_timeout is not None:
                     self.session_timeout = int(session_timeout) * 1000  # We need ms, server responds in s
+                    present.append("session_timeout")
 
                 send_interval = agent_config.get(RESPONSE_KEY_SEND_INTERVAL_IN_SEC)
                 if send_interval is not None:
                     self.send_interval = int(send_interval) * 1000  # We need ms, server responds in s
+                    present.append("send_interval")
 
-                self.visit_store_version = agent_config.get(RESPONSE_KEY_VISIT_STORE_VERSION, self.visit_store_version)
+                visit_store_version = agent_config.get(RESPONSE_KEY_VISIT_STORE_VERSION)
+                if visit_store_version is not None:
+                    self.visit_store_version = visit_store_version
+                    present.append("visit_store_version")
 
             # APPLICATION Configuration
             app_config = json_response.get(RESPONSE_KEY_APP_CONFIG)
             if app_config is not None:
-                self.capture = bool(app_config.get(RESPONSE_KEY_CAPTURE, self.capture))
-                self.capture_crashes = bool(app_config.get(RESPONSE_KEY_REPORT_CRASHES, self.capture_crashes))
-                self.capture_errors = bool(app_config.get(RESPONSE_KEY_REPORT_ERRORS, self.capture_errors))
+                if RESPONSE_KEY_CAPTURE in app_config:
+                    self.capture = bool(app_config[RESPONSE_KEY_CAPTURE])
+                    present.append("capture")
+                if RESPONSE_KEY_REPORT_CRASHES in app_config:
+                    self.capture_crashes = bool(app_config[RESPONSE_KEY_REPORT_CRASHES])
+                    present.append("capture_crashes")
+                if RESPONSE_KEY_REPORT_ERRORS in app_config:
+                    self.capture_errors = bool(app_config[RESPONSE_KEY_REPORT_ERRORS])
+                    present.append("capture_errors")
+                if RESPONSE_KEY_TRAFFIC_CONTROL_PERCENTAGE in app_config:
+                    self.traffic_control_percentage = int(app_config[RESPONSE_KEY_TRAFFIC_CONTROL_PERCENTAGE])
+                    present.append("traffic_control_percentage")
 
             # DYNAMIC Configuration
             dynamic_config = json_response.get(RESPONSE_KEY_DYNAMIC_CONFIG)
             if dynamic_config is not None:
-                self.multiplicity = json_response.get(RESPONSE_KEY_MULTIPLICITY, self.multiplicity)
-                self.server_id = json_response.get(RESPONSE_KEY_SERVER_ID, self.server_id)
-
-            self.timestamp = int(json_response.get(RESPONSE_KEY_TIMESTAMP_IN_MILLIS, self.timestamp))
+                if RESPONSE_KEY_MULTIPLICITY in dynamic_config:
+                    self.multiplicity = dynamic_config[RESPONSE_KEY_MULTIPLICITY]
+                    present.append("multiplicity")
+                if RESPONSE_KEY_SERVER_ID in dynamic_config:
+                    self.server_id = dynamic_config[RESPONSE_KEY_SERVER_ID]
+                    present.append("server_id")
+
+            if RESPONSE_KEY_TIMESTAMP_IN_MILLIS in json_response:
+                self.timestamp = int(json_response[RESPONSE_KEY_TIMESTAMP_IN_MILLIS])
+                present.append("timestamp")
+
+            self.present_attributes = frozenset(present)
+
+    def merged_into(self, previous: "StatusResponse") -> "StatusResponse":
+        """
+        The attributes of previous overwritten by the ones this response contained. The collector leaves out what did
+        not change since the configuration timestamp sent as cts, so missing attributes must keep their last value.
+        """
+        merged = copy.copy(previous)
+        merged.http_response = self.http_response
+        for name in self.present_attributes:
+            setattr(merged, name, getattr(self, name))
+        merged.present_attributes = previous.present_attributes | self.present_attributes
+        return merged
 
     def is_error_response(self) -> bool:
         return self.http_response is None or self.http_response.status_code >= 400
@@ -89,3 +142,24 @@ class StatusResponse:
 
     def is_too_many_requests(self) -> bool:
         return self.http_response is not None and self.http_response.status_code == 429
+
+    def get_retry_after_in_milliseconds(self) -> int:
+        retry_after = parse_retry_after(self.http_response)
+        if retry_after is None:
+            return DEFAULT_RETRY_AFTER_IN_MILLISECONDS
+        return int(retry_after * 1000)
+
+
+def parse_retry_after(response: Optional["Response"]) -> Optional[float]:
+    if response is None or response.headers is None:
+        return None
+
+    retry_after = response.headers.get(RESPONSE_HEADER_RETRY_AFTER)
+    if retry_after is None:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        # HTTP dates are not supported
+        return None
@@ -0,0 +1,249 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Dict, List, Optional, TYPE_CHECKING, Tuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from http.client import HTTPConnection
+    from ..vendor.mureq.mureq import Response
+
+# http.client, ssl and mureq are imported on the first request, importing openkit stays cheap for processes which
+# never send anything. Same value as mureq.DEFAULT_TIMEOUT.
+DEFAULT_TIMEOUT = 15.0
+
+DEFAULT_SINK_STATUS_RESPONSE = {
+    "appConfig": {"capture": 1, "reportCrashes": 1, "reportErrors": 1},
+}
+
+
+class Transport(ABC):
+
+    @abstractmethod
+    def request(self,
+                method: str,
+                url: str,
+                headers: Dict[str, str],
+                body: Optional[bytes],
+                timeout: float) -> "Response":
+        # Network failures are raised as HTTPException or OSError
+        pass
+
+    def close(self):
+        pass
+
+    def reset_after_fork(self):
+        # Called in the child process, which must neither reuse nor close what it inherited from the parent
+        pass
+
+
+class MureqTransport(Transport):
+
+    def __init__(self, verify_certificates: bool = True):
+        self.verify_certificates = verify_certificates
+
+    def request(self, method, url, headers, body, timeout) -> "Response":
+        from ..vendor.mureq import mureq as requests
+        return requests.request(method, url, body=body, headers=headers, verify=self.verify_certificates,
+                                timeout=timeout)
+
+
+class PooledHttpTransport(Transport):
+    """Keeps connections alive between requests, one pool per scheme, host and port."""
+
+    def __init__(self, verify_certificates: bool = True, max_idle_connections_per_host: int = 4):
+        import ssl
+        self.max_idle_connections_per_host = max_idle_connections_per_host
+        self._ssl_context = ssl.create_default_context()
+        if not verify_certificates:
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+
+        self._pools: Dict[Tuple[str, str, int], List["HTTPConnection"]] = {}
+        self._lock = Lock()
+
+    def request(self, method, url, headers, body, timeout) -> "Response":
+        from http.client import HTTPException
+        from ..vendor.mureq import mureq as requests
+
+        parsed_url = urlparse(url)
+        scheme = parsed_url.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported scheme {scheme}")
+        key = (scheme, parsed_url.hostname, parsed_url.port or (443 if scheme == "https" else 80))
+
+        path = parsed_url.path or "/"
+        if parsed_url.query:
+            path = f"{path}?{parsed_url.query}"
+
+        outgoing_headers = {"User-Agent": requests.DEFAULT_UA}
+        outgoing_headers.update(headers)
+
+        connection, reused = self._acquire(key, timeout)
+        try:
+            response = self._send(connection, method, path, outgoing_headers, body)
+        except (HTTPException, OSError):
+            connection.close()
+            if not reused:
+                raise
+            # The server may have closed an idle keep alive connection, retry once on a fresh one
+            connection = self._create(key, timeout)
+            try:
+                response = self._send(connection, method, path, outgoing_headers, body)
+            except (HTTPException, OSError):
+                connection.close()
+                raise
+
+        status_code, response_headers, response_body, will_close = response
+        if will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+
+        return requests.Response(url, status_code, response_headers, response_body)
+
+    @staticmethod
+    def _send(connection: "HTTPConnection", method, path, headers, body):
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.headers, response.read(), response.will_close
+
+    def _acquire(self, key, timeout) -> Tuple["HTTPConnection", bool]:
+        with self._lock:
+            pool = self._pools.get(key)
+            connection = pool.pop() if pool else None
+
+        if connection is None:
+            return self._create(key, timeout), False
+
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def _create(self, key, timeout) -> "HTTPConnection":
+        from http.client import HTTPConnection, HTTPSConnection
+        scheme, host, port = key
+        if scheme == "https":
+            return HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return HTTPConnection(host, port, timeout=timeout)
+
+    def _release(self, key, connection: "HTTPConnection"):
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            if len(pool) < self.max_idle_connections_per_host:
+                pool.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            pools = self._pools
+            self._pools = {}
+
+        for pool in pools.values():
+            for connection in pool:
+                connection.close()
+
+    def reset_after_fork(self):
+        # The pooled sockets are shared with the parent, a request from the child would interleave with its requests
+        self._lock = Lock()
+        self._pools = {}
+
+
+class LocalSinkTransport(Transport):
+    """
+    Writes every request as one JSON line to rotating files instead of sending it, and answers with a synthetic status
+    response. The files can be sent to a collector later with replay_ndjson().
+
+    A forked child process writes to its own files, the process id is added to the file name, e.g. beacons.1234.ndjson.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 file_name: str = "beacons.ndjson",
+                 max_file_size_in_bytes: int = 64 * 1024 * 1024,
+                 max_files: int = 10,
+                 status_response: Optional[dict] = None):
+        os.makedirs(directory, exist_ok=True)
+        self._base_path = os.path.join(directory, file_name)
+        self.path = self._base_path
+        self.max_file_size_in_bytes = max_file_size_in_bytes
+        self.max_files = max_files
+
+        if status_response is None:
+            status_response = DEFAULT_SINK_STATUS_RESPONSE
+        self._status_body = json.dumps(status_response).encode("UTF-8")
+
+        self._lock = Lock()
+        self._file = open(self.path, "a", encoding="UTF-8")
+
+    def request(self, method, url, headers, body, timeout) -> "Response":
+        from http.client import HTTPMessage
+        from ..vendor.mureq import mureq as requests
+
+        line = json.dumps({
+            "timestamp": int(time.time() * 1000),
+            "method": method,
+            "url": url,
+            "headers": dict(headers),
+            "body": body.decode("UTF-8") if body else None,
+        })
+
+        with self._lock:
+            if self._file.tell() + len(line) > self.max_file_size_in_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.write("\n")
+            self._file.flush()
+
+        return requests.Response(url, 200, HTTPMessage(), self._status_body)
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.max_files - 1, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+        self._file = open(self.path, "w", encoding="UTF-8")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def reset_after_fork(self):
+        # Appending to and rotating the parent's files from two processes would rename them under each other
+        self._lock = Lock()
+        root, extension = os.path.splitext(self._base_path)
+        self.path = f"{root}.{os.getpid()}{extension}"
+        self._file = open(self.path, "a", encoding="UTF-8")
+
+
+def replay_ndjson(path: str,
+                  transport: Transport,
+                  base_url: Optional[str] = None,
+                  timeout: float = DEFAULT_TIMEOUT) -> int:
+    """Sends the beacon requests captured by LocalSinkTransport, returns how many were accepted."""
+    accepted = 0
+    with open(path, encoding="UTF-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            if record["method"] != "POST":
+                # Status and new session requests only matter for the process that captured them
+                continue
+
+            url = record["url"]
+            if base_url is not None:
+                url = f"{base_url}?{url.split('?', 1)[1]}" if "?" in url else base_url
+
+            body = record["body"].encode("UTF-8") if record["body"] is not None else None
+            response = transport.request(record["method"], url, record["headers"], body, timeout)
+            if response.status_code < 400:
+                accepted += 1
+
+    return accepted
@@ -0,0 +1,8 @@
+import zlib
+
+MAX_PERCENTAGE = 100
+
+
+def traffic_control_value(device_id: int) -> int:
+    # Derived from the device id, so every session of a device is sampled the same way
+    return zlib.crc32(str(device_id).encode("UTF-8")) % MAX_PERCENTAGE
@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from typing import List, Optional
+
+from openkit import OpenKit
+from openkit.protocol.transport import LocalSinkTransport
+
+
+class LocalSinkTestCase(unittest.TestCase):
+    """Runs OpenKit end to end, the requests are written by a LocalSinkTransport into a temporary directory."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.logger = logging.getLogger("test")
+
+    def create_openkit(self,
+                       transport=None,
+                       status_response: Optional[dict] = None,
+                       device_id: int = 1,
+                       wait_for_init: bool = True,
+                       **options) -> OpenKit:
+        if transport is None and "forwarder_socket" not in options:
+            transport = LocalSinkTransport(self.directory, status_response=status_response)
+        openkit = OpenKit("http://localhost/mbeacon", "app", device_id, logger=self.logger, transport=transport,
+                          **options)
+        self.addCleanup(openkit.shutdown, 5)
+        if wait_for_init:
+            self.assertTrue(openkit.wait_for_init_completion(5000))
+        return openkit
+
+    def sent_requests(self, file_name: str = "beacons.ndjson") -> List[dict]:
+        with open(os.path.join(self.directory, file_name), encoding="UTF-8") as file:
+            return [json.loads(line) for line in file]
+
+    def sent_bodies(self) -> List[str]:
+        return [request["body"] or "" for request in self.sent_requests()]
+
+    def sent_events(self, event_type: Optional[int] = None) -> List[str]:
+        # Events start with their type, the part of a body before the first event holds the beacon data
+        events = [event for body in self.sent_bodies() for event in body.split("&et=")[1:]]
+        if event_type is None:
+            return events
+        return [event for event in events if event.startswith(f"{event_type}&")]
+
+    @staticmethod
+    def event_values(event: str) -> dict:
+        return dict(pair.split("=", 1) for pair in event.split("&")[1:])
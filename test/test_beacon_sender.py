@@ -0,0 +1,41 @@
+import logging
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from openkit.core.beacon_sender import BeaconSendingContext
+
+
+class TestBeaconSendingContext(unittest.TestCase):
+
+    def setUp(self):
+        self.context = BeaconSendingContext(logging.getLogger("test"), MagicMock())
+
+    def sleep_in_background(self, wake_on_work: bool) -> threading.Thread:
+        thread = threading.Thread(target=self.context.sleep, args=(60_000, wake_on_work), daemon=True)
+        thread.start()
+        time.sleep(0.05)
+        return thread
+
+    def test_new_sessions_wake_the_sender(self):
+        thread = self.sleep_in_background(wake_on_work=True)
+        self.context.add_session(MagicMock())
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+
+    def test_published_configurations_wake_the_sender(self):
+        thread = self.sleep_in_background(wake_on_work=True)
+        self.context.disable_capture()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+
+    def test_retry_waits_only_end_on_shutdown(self):
+        thread = self.sleep_in_background(wake_on_work=False)
+        self.context.add_session(MagicMock())
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+
+        self.context.shutdown_requested = True
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
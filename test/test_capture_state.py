@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from openkit.core.objects.null_root_action import NullRootAction
+from openkit.core.objects.null_session import NullSession
+from openkit.core.objects.null_web_request_tracer import NullWebRequestTracer
+from test.local_sink import LocalSinkTestCase
+
+
+class TestCaptureState(LocalSinkTestCase):
+
+    def create_capturing_openkit(self, capture):
+        return self.create_openkit(status_response={"appConfig": {"capture": capture}})
+
+    def test_capture_off_returns_null_session(self):
+        openkit = self.create_capturing_openkit(0)
+        self.assertIsInstance(openkit.create_session("1.2.3.4"), NullSession)
+
+    def test_capture_switched_off_for_open_sessions(self):
+        openkit = self.create_capturing_openkit(1)
+        session = openkit.create_session("1.2.3.4")
+        action = session.enter_action("action")
+        self.assertNotIsInstance(action, NullRootAction)
+        self.assertIs(action.report_event("event"), action)
+
+        openkit._beacon_sender.context.disable_capture()
+
+        self.assertIsInstance(session.enter_action("action"), NullRootAction)
+        self.assertIsInstance(session.trace_web_request("https://example.com"), NullWebRequestTracer)
+        self.assertIsInstance(action.trace_web_request("https://example.com"), NullWebRequestTracer)
+        self.assertIs(action.report_value("value", 1), action)
+
+    def test_session_identifies_users_only_while_capturing(self):
+        openkit = self.create_capturing_openkit(1)
+        session = openkit.create_session("1.2.3.4").current_session
+
+        with patch.object(session.beacon, "identify_user") as identify_user:
+            openkit._beacon_sender.context.disable_capture()
+            session.identify_user("user")
+        identify_user.assert_not_called()
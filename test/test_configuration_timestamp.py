@@ -0,0 +1,66 @@
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+from openkit.core.beacon_sender import BeaconSendingContext
+from openkit.protocol.http_client import HttpClient
+from openkit.protocol.status_response import StatusResponse
+
+
+def create_response(body: dict) -> StatusResponse:
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = body
+    return StatusResponse(response)
+
+
+class TestConfigurationTimestamp(unittest.TestCase):
+
+    def setUp(self):
+        self.http_client = HttpClient(logging.getLogger("test"), "http://localhost/mbeacon", 1, "app", True)
+        self.context = BeaconSendingContext(logging.getLogger("test"), self.http_client)
+
+    def test_missing_attributes_keep_their_previous_value(self):
+        full = create_response({"mobileAgentConfig": {"maxBeaconSizeKb": 30, "sendIntervalSec": 60},
+                                "dynamicConfig": {"multiplicity": 2, "serverId": 7},
+                                "timestamp": 1000})
+        partial = create_response({"dynamicConfig": {"multiplicity": 3}, "timestamp": 2000})
+
+        merged = partial.merged_into(full)
+        self.assertEqual(merged.multiplicity, 3)
+        self.assertEqual(merged.timestamp, 2000)
+        self.assertEqual(merged.max_beacon_size, 30 * 1024)
+        self.assertEqual(merged.send_interval, 60 * 1000)
+        self.assertEqual(merged.server_id, 7)
+
+    def test_timestamp_is_sent_as_cts(self):
+        self.assertEqual(self.context.get_configuration_timestamp(), 0)
+        self.context.update_from(create_response({"appConfig": {"capture": 1}, "timestamp": 1234}))
+        self.assertEqual(self.context.get_configuration_timestamp(), 1234)
+
+        url = self.http_client.build_request_url(self.http_client.endpoints.primary, MagicMock(), self.context)
+        self.assertIn("cts=1234", url)
+
+    def test_unchanged_configuration_is_not_rebuilt(self):
+        self.context.update_from(create_response({"dynamicConfig": {"multiplicity": 2}, "timestamp": 1234}))
+        server_configuration = self.context.server_configuration
+
+        self.context.update_from(create_response({"timestamp": 1234}))
+        self.assertIs(self.context.server_configuration, server_configuration)
+        self.assertEqual(server_configuration.multiplicity, 2)
+
+        self.context.disable_capture()
+        self.context.update_from(create_response({"timestamp": 1234}))
+        self.assertTrue(self.context.server_configuration.capture_enabled)
+        self.assertEqual(self.context.server_configuration.multiplicity, 2)
+
+    def test_server_id_is_only_taken_when_sent(self):
+        endpoint = self.http_client.endpoints.primary
+        endpoint.server_id = 7
+        self.http_client.transport = MagicMock()
+        self.http_client.transport.request.return_value.status_code = 200
+        self.http_client.transport.request.return_value.headers = None
+        self.http_client.transport.request.return_value.json.return_value = {"timestamp": 1234}
+
+        self.http_client.send_status_request(self.context)
+        self.assertEqual(endpoint.server_id, 7)
@@ -0,0 +1,35 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from openkit.core.communication.countdown_latch import CountDownLatch
+from test.local_sink import LocalSinkTestCase
+
+
+class TestCountDownLatch(unittest.TestCase):
+
+    def test_wait_returns_whether_the_latch_opened(self):
+        latch = CountDownLatch()
+        self.assertFalse(latch.wait(10))
+
+        latch.count_down()
+        start = time.monotonic()
+        self.assertTrue(latch.wait(5000))
+        self.assertLess(time.monotonic() - start, 1)
+
+
+class TestWaitForInitCompletion(LocalSinkTestCase):
+
+    def test_returns_true_without_waiting_once_initialized(self):
+        openkit = self.create_openkit()
+
+        start = time.monotonic()
+        self.assertTrue(openkit.wait_for_init_completion(5000))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_returns_false_when_init_does_not_complete(self):
+        transport = MagicMock()
+        transport.request.side_effect = OSError("collector unreachable")
+        openkit = self.create_openkit(transport, wait_for_init=False)
+
+        self.assertFalse(openkit.wait_for_init_completion(200))
@@ -0,0 +1,65 @@
+from urllib.parse import unquote
+
+from openkit.core.configuration.privacy_configuration import (CrashReportingLevel, DataCollectionLevel,
+                                                              PrivacyConfiguration)
+from openkit.protocol.beacon import CRASH_FINGERPRINT_MIN_LEN
+from test.local_sink import LocalSinkTestCase
+
+
+class TestCrashReporting(LocalSinkTestCase):
+
+    def report_crashes(self, crashes, status=None, **options):
+        openkit = self.create_openkit(status_response=status, **options)
+        session = openkit.create_session("1.2.3.4")
+        for error_name, reason, stacktrace in crashes:
+            session.report_crash(error_name, reason, stacktrace)
+        session.end()
+        self.assertTrue(openkit.shutdown(5))
+
+        return [{name: unquote(value) for name, value in self.event_values(crash).items()}
+                for crash in self.sent_events(50)]
+
+    def test_crash_is_reported(self):
+        crashes = self.report_crashes([("ValueError", "bad value", "Traceback\n  line 1")])
+
+        self.assertEqual(len(crashes), 1)
+        self.assertEqual(crashes[0]["na"], "ValueError")
+        self.assertEqual(crashes[0]["rs"], "bad value")
+        self.assertEqual(crashes[0]["st"], "Traceback\n  line 1")
+        self.assertNotIn("sf", crashes[0])
+
+    def test_large_stack_traces_are_sent_once(self):
+        stacktrace = "Traceback\n" + "  frame\n" * CRASH_FINGERPRINT_MIN_LEN
+        crashes = self.report_crashes([("RecursionError", "loop", stacktrace)] * 3)
+
+        self.assertEqual(len(crashes), 3)
+        self.assertEqual(crashes[0]["st"], stacktrace)
+        self.assertNotIn("so", crashes[0])
+        fingerprint = crashes[0]["sf"]
+        for occurrence, crash in enumerate(crashes[1:], 2):
+            self.assertNotIn("st", crash)
+            self.assertEqual(crash["sf"], fingerprint)
+            self.assertEqual(crash["so"], str(occurrence))
+
+    def test_evicted_stack_traces_are_sent_again(self):
+        openkit = self.create_openkit()
+        session = openkit.create_session("1.2.3.4")
+        stacktrace = "Traceback\n" + "  frame\n" * CRASH_FINGERPRINT_MIN_LEN
+        session.report_crash("RecursionError", "loop", stacktrace)
+
+        # The evictor drops the record with the full stack trace before it was sent
+        openkit._beacon_cache_evictor.beacon_cache_lower_memory = 0
+        openkit._beacon_cache_evictor.space_eviction()
+        session.report_crash("RecursionError", "loop", stacktrace)
+        session.end()
+        self.assertTrue(openkit.shutdown(5))
+
+        crashes = [self.event_values(crash) for crash in self.sent_events(50)]
+        self.assertEqual(len(crashes), 1)
+        self.assertEqual(unquote(crashes[0]["st"]), stacktrace)
+
+    def test_crashes_respect_privacy_and_server_settings(self):
+        crash = [("ValueError", "bad value", "Traceback")]
+        privacy_config = PrivacyConfiguration(DataCollectionLevel.USER_BEHAVIOR, CrashReportingLevel.OPT_OUT_CRASHES)
+        self.assertEqual(self.report_crashes(crash, privacy_config=privacy_config), [])
+        self.assertEqual(self.report_crashes(crash, status={"appConfig": {"reportCrashes": 0}}), [])
@@ -0,0 +1,60 @@
+import unittest
+from collections import Counter
+
+from openkit.protocol.endpoints import EndpointRing
+
+URLS = ["https://ag-1/mbeacon", "https://ag-2/mbeacon", "https://ag-3/mbeacon"]
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEndpointRing(unittest.TestCase):
+
+    def test_sessions_are_spread_across_endpoints(self):
+        ring = EndpointRing(URLS, 1)
+
+        counts = Counter(ring.endpoints_for(session_number)[0].base_url for session_number in range(3000))
+        assert set(counts) == set(URLS)
+        for count in counts.values():
+            assert count > 500
+
+        # The mapping is stable
+        assert ring.endpoints_for(42)[0] is ring.endpoints_for(42)[0]
+
+    def test_status_requests_use_the_primary_endpoint(self):
+        ring = EndpointRing(URLS, 1)
+        assert ring.endpoints_for(None)[0] is ring.primary
+        assert ring.primary.base_url == URLS[0]
+
+    def test_failover(self):
+        clock = FakeClock()
+        ring = EndpointRing(URLS, 1, clock)
+
+        sessions = [n for n in range(100) if ring.endpoints_for(n)[0].base_url == URLS[1]]
+        other_sessions = [n for n in range(100) if ring.endpoints_for(n)[0].base_url != URLS[1]]
+        failed = ring.endpoints_for(sessions[0])[0]
+
+        for _ in range(EndpointRing.FAILURE_THRESHOLD):
+            ring.on_failure(failed)
+
+        # Sessions of the failed endpoint move elsewhere, everything else stays where it was
+        for session_number in sessions:
+            candidates = ring.endpoints_for(session_number)
+            assert candidates[0] is not failed
+            assert candidates[-1] is failed
+        for session_number in other_sessions:
+            assert ring.endpoints_for(session_number)[0].base_url != URLS[1]
+
+        # After the retry interval the endpoint gets probed again and a success brings it back
+        clock.now += EndpointRing.RETRY_INTERVAL
+        assert ring.endpoints_for(sessions[0])[0] is failed
+        ring.on_success(failed)
+        clock.now += 1
+        assert ring.endpoints_for(sessions[0])[0] is failed
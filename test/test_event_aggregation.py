@@ -0,0 +1,60 @@
+import time
+from datetime import datetime, timedelta
+
+from openkit.core.caching.event_aggregator import EventAggregator
+from test.local_sink import LocalSinkTestCase
+
+
+class TestEventAggregation(LocalSinkTestCase):
+
+    def send_events(self, **options):
+        openkit = self.create_openkit(**options)
+        session = openkit.create_session("1.2.3.4")
+        action = session.enter_action("action")
+        for _ in range(100):
+            action.report_error("timeout", 504, "upstream")
+        action.report_error("timeout", 503, "upstream")
+
+        start = datetime.now()
+        for duration in (10, 30, 20):
+            tracer = action.trace_web_request("https://example.com/health")
+            tracer.start(start)
+            tracer.set_bytes_received(100)
+            tracer.stop(200, start + timedelta(milliseconds=duration))
+        action.leave_action()
+        session.end()
+        self.assertTrue(openkit.shutdown(5))
+
+        return self.sent_events(40), self.sent_events(30)
+
+    def test_identical_events_are_collapsed(self):
+        errors, web_requests = self.send_events(event_aggregation_window=60)
+
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(self.event_values(errors[0])["oc"], "100")
+        self.assertEqual(self.event_values(errors[0])["ev"], "504")
+        self.assertNotIn("oc", self.event_values(errors[1]))
+
+        self.assertEqual(len(web_requests), 1)
+        web_request = self.event_values(web_requests[0])
+        self.assertEqual(web_request["oc"], "3")
+        self.assertEqual(web_request["t1"], "60")
+        self.assertEqual(web_request["dn"], "10")
+        self.assertEqual(web_request["dx"], "30")
+        self.assertEqual(web_request["br"], "300")
+
+    def test_aggregation_is_opt_in(self):
+        errors, web_requests = self.send_events()
+        self.assertEqual(len(errors), 101)
+        self.assertEqual(len(web_requests), 3)
+
+    def test_groups_expire_after_the_window(self):
+        aggregator = EventAggregator(0.05)
+        aggregator.add("a", datetime.now(), lambda: "a")
+        aggregator.add("a", datetime.now(), lambda: self.fail("encoded twice"))
+        self.assertEqual(aggregator.take_expired(), [])
+
+        time.sleep(0.06)
+        expired = aggregator.add("b", datetime.now(), lambda: "b")
+        self.assertEqual([(group.data, group.count) for group in expired], [("a", 2)])
+        self.assertEqual(len(aggregator), 1)
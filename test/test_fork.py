@@ -0,0 +1,52 @@
+import os
+import unittest
+
+from openkit.core.objects.null_root_action import NullRootAction
+from openkit.core.objects.session_proxy import SessionProxy
+from test.local_sink import LocalSinkTestCase
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+class TestFork(LocalSinkTestCase):
+
+    def test_child_restarts_with_fresh_state(self):
+        openkit = self.create_openkit()
+        session = openkit.create_session("1.2.3.4")
+        session.enter_action("before fork").leave_action()
+        parent_sender = openkit._beacon_sender
+
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                checks = [
+                    openkit._beacon_sender is not parent_sender,
+                    openkit._beacon_sender.thread.is_alive(),
+                    isinstance(session.enter_action("in child"), NullRootAction),
+                    openkit._child_count == 0,
+                    not openkit._beacon_cache.get_beacons(),
+                    openkit.wait_for_init_completion(5000),
+                    isinstance(openkit.create_session("1.2.3.4"), SessionProxy),
+                    openkit._session_watchdog.thread.is_alive(),
+                    openkit._beacon_cache_evictor.is_alive(),
+                    openkit.shutdown(5),
+                    openkit._transport.path == os.path.join(self.directory, f"beacons.{os.getpid()}.ndjson"),
+                ]
+                exit_code = 0 if all(checks) else 2
+            finally:
+                os._exit(exit_code)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+        self.assertIs(openkit._beacon_sender, parent_sender)
+        self.assertEqual(openkit._child_count, 1)
+        session.end()
+        self.assertTrue(openkit.shutdown(5))
+
+        child_requests = self.sent_requests(f"beacons.{pid}.ndjson")
+        parent_bodies = self.sent_bodies()
+        self.assertTrue(child_requests)
+        bodies = parent_bodies + [request["body"] or "" for request in child_requests]
+        self.assertFalse(any("in%20child" in body for body in bodies))
+        self.assertTrue(any("before%20fork" in body for body in parent_bodies))
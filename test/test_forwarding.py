@@ -0,0 +1,91 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from openkit.core.caching.beacon_key import BeaconKey
+from openkit.core.configuration.server_configuration import ServerConfiguration
+from openkit.core.forwarding import ForwardingBeaconCache
+from openkit.core.objects.null_session import NullSession
+from test.local_sink import LocalSinkTestCase
+
+
+class TestForwarding(LocalSinkTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.socket_path = os.path.join(self.directory, "openkit.sock")
+
+    def create_aggregator(self, status_response=None):
+        aggregator = self.create_openkit(status_response=status_response)
+        aggregator.start_aggregator(self.socket_path)
+        return aggregator
+
+    def create_worker(self, device_id):
+        return self.create_openkit(device_id=device_id, forwarder_socket=self.socket_path)
+
+    def sent_beacons(self):
+        return [request["body"] for request in self.sent_requests() if request["method"] == "POST"]
+
+    def test_workers_are_sent_by_the_aggregator(self):
+        aggregator = self.create_aggregator()
+        workers = [self.create_worker(device_id) for device_id in (101, 102)]
+
+        for worker in workers:
+            session = worker.create_session("10.0.0.1")
+            session.enter_action("forwarded").leave_action()
+            session.end()
+            self.assertTrue(worker.shutdown(5))
+
+        self.assertTrue(aggregator.shutdown(5))
+
+        beacons = self.sent_beacons()
+        self.assertEqual(len(beacons), 2)
+        for device_id, beacon in zip((101, 102), beacons):
+            self.assertIn(f"vi={device_id}", beacon)
+            self.assertIn("ip=10.0.0.1", beacon)
+            self.assertIn("na=forwarded", beacon)
+
+    def test_worker_follows_the_aggregator_configuration(self):
+        aggregator = self.create_aggregator({"appConfig": {"capture": 0}})
+        worker = self.create_worker(101)
+
+        self.assertFalse(worker._beacon_sender.last_server_configuration.capture_enabled)
+        self.assertIsInstance(worker.create_session("10.0.0.1"), NullSession)
+
+        worker.shutdown(5)
+        aggregator.shutdown(5)
+
+    def test_server_configuration_round_trip(self):
+        server_configuration = ServerConfiguration(capture_enabled=False, multiplicity=3,
+                                                   traffic_control_percentage=40)
+        values = json.loads(json.dumps(server_configuration.as_dict()))
+        values["unknown"] = 1
+
+        restored = ServerConfiguration.from_dict(values)
+        self.assertEqual(restored.as_dict(), server_configuration.as_dict())
+
+    def test_sessions_of_dead_workers_are_ended(self):
+        aggregator = self.create_aggregator()
+        worker = self.create_worker(101)
+
+        session = worker.create_session("10.0.0.1")
+        session.enter_action("orphaned").leave_action()
+        deadline = time.monotonic() + 5
+        while aggregator._aggregator.session_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(aggregator._aggregator.session_count, 1)
+
+        # The worker never ends its session, as if it was killed
+        aggregator._aggregator.end_dead_forwarders(time.monotonic() + aggregator._aggregator.forwarder_timeout + 1)
+        self.assertEqual(aggregator._aggregator.session_count, 0)
+        self.assertEqual(aggregator._aggregator._beacons, {})
+
+        self.assertTrue(aggregator.shutdown(5))
+        self.assertTrue(any("na=orphaned" in beacon for beacon in self.sent_beacons()))
+
+    def test_forwarding_buffer_never_exceeds_its_limit(self):
+        cache = ForwardingBeaconCache(self.logger, max_pending_bytes=10)
+        cache.add_event(BeaconKey(1, 0), datetime.now(), "123456")
+        cache.add_event(BeaconKey(1, 0), datetime.now(), "123456")
+        self.assertEqual(cache.pending_count, 1)
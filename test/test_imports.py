@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestImports(unittest.TestCase):
+
+    def loaded_modules(self, statement, modules):
+        script = f"import sys\n{statement}\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+
+    def test_import_openkit_is_lazy(self):
+        modules = ["openkit.api.openkit", "openkit.core.beacon_sender", "logging", "ssl", "http.client"]
+        self.assertEqual(self.loaded_modules("import openkit", modules), "")
+
+    def test_network_stack_is_loaded_on_first_request(self):
+        modules = ["ssl", "http.client", "http.server", "socketserver", "tempfile", "openkit.vendor.mureq.mureq"]
+        self.assertEqual(self.loaded_modules("from openkit import OpenKit", modules), "")
+
+    def test_sending_states_and_transports_are_loaded_by_openkit_instances(self):
+        modules = ["openkit.core.communication.beacon_init", "openkit.core.communication.beacon_flush",
+                   "openkit.protocol.transport", "openkit.core.forwarding", "openkit.instrumentation", "json"]
+        self.assertEqual(self.loaded_modules("from openkit import OpenKit", modules), "")
@@ -0,0 +1,113 @@
+import socket
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from openkit.instrumentation import instrument_http_client, traced_by, uninstrument_http_client
+from test.local_sink import LocalSinkTestCase
+
+
+class TagEchoHandler(BaseHTTPRequestHandler):
+    tags = []
+
+    def do_GET(self):
+        TagEchoHandler.tags.append(self.headers.get("x-dynatrace"))
+        body = b"hello"
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestInstrumentation(LocalSinkTestCase):
+
+    def setUp(self):
+        super().setUp()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TagEchoHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f"http://127.0.0.1:{server.server_port}/health"
+        TagEchoHandler.tags = []
+
+        self.openkit = self.create_openkit()
+
+        instrument_http_client()
+        self.addCleanup(uninstrument_http_client)
+
+    def sent_bodies(self):
+        self.assertTrue(self.openkit.shutdown(5))
+        return super().sent_bodies()
+
+    def test_requests_are_traced_on_the_current_action(self):
+        session = self.openkit.create_session("1.2.3.4")
+        action = session.enter_action("checkout")
+        with traced_by(action):
+            with urllib.request.urlopen(f"{self.url}?user=42") as response:
+                self.assertEqual(response.read(), b"hello")
+        action.leave_action()
+        session.end()
+
+        self.assertEqual(len(TagEchoHandler.tags), 1)
+        tag_parts = TagEchoHandler.tags[0].split("_")
+        self.assertEqual(tag_parts[:4], ["MT", "3", "1", "1"])
+        self.assertEqual(tag_parts[6:8], [str(action.id), str(threading.get_ident() & 0xfffffff)])
+
+        web_requests = self.sent_events(30)
+        self.assertEqual(len(web_requests), 1)
+        values = self.event_values(web_requests[0])
+        self.assertEqual(unquote(values["na"]), self.url)
+        self.assertEqual(values["rc"], "200")
+        self.assertEqual(values["br"], "5")
+        self.assertGreater(int(values["bs"]), 0)
+
+    def test_requests_outside_a_parent_are_untouched(self):
+        with urllib.request.urlopen(self.url) as response:
+            self.assertEqual(response.read(), b"hello")
+
+        self.assertEqual(TagEchoHandler.tags, [None])
+        self.assertEqual(self.sent_events(30), [])
+
+    def test_tracer_without_start_measures_from_its_creation(self):
+        session = self.openkit.create_session("1.2.3.4")
+        session.trace_web_request("https://example.com").stop(200)
+        session.end()
+
+        self.assertTrue(any("&et=30&na=https%3A//example.com" in body for body in self.sent_bodies()))
+
+    def test_failed_requests_stop_their_tracer(self):
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            port = unused.getsockname()[1]
+
+        session = self.openkit.create_session("1.2.3.4")
+        action = session.enter_action("checkout")
+        with traced_by(action):
+            with self.assertRaises(OSError):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/health")
+        self.assertEqual(action._child_count, 0)
+        action.leave_action()
+        session.end()
+
+        web_requests = self.sent_events(30)
+        self.assertEqual(len(web_requests), 1)
+        self.assertEqual(self.event_values(web_requests[0])["rc"], "-1")
+
+    def test_requests_through_a_proxy_trace_the_requested_url(self):
+        proxy = self.url.rsplit("/", 1)[0]
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": proxy}))
+        session = self.openkit.create_session("1.2.3.4")
+        action = session.enter_action("checkout")
+        with traced_by(action):
+            with opener.open("http://example.com/health") as response:
+                self.assertEqual(response.read(), b"hello")
+        action.leave_action()
+        session.end()
+
+        web_requests = self.sent_events(30)
+        self.assertEqual(len(web_requests), 1)
+        self.assertEqual(unquote(self.event_values(web_requests[0])["na"]), "http://example.com/health")
@@ -0,0 +1,71 @@
+import json
+import time
+from unittest.mock import patch
+
+from openkit.core.communication import BeaconSendingCaptureOffState
+from openkit.core.objects.null_session import NullSession
+from openkit.core.objects.session_proxy import SessionProxy
+from openkit.protocol.transport import LocalSinkTransport
+from test.local_sink import LocalSinkTestCase
+
+
+class TestLazyStart(LocalSinkTestCase):
+
+    def create_openkit(self, transport=None, **options):
+        return super().create_openkit(transport, wait_for_init=False, **options)
+
+    def wait_until(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("condition not met in time")
+            time.sleep(0.01)
+
+    def test_nothing_starts_before_the_first_session(self):
+        openkit = self.create_openkit(prefetch_status=False)
+        self.assertIsNone(openkit._beacon_sender.thread)
+        self.assertIsNone(openkit._session_watchdog.thread)
+        self.assertFalse(openkit._beacon_cache_evictor.is_alive())
+
+        openkit.create_session("1.2.3.4")
+        self.assertTrue(openkit._beacon_sender.thread.is_alive())
+        self.assertTrue(openkit._session_watchdog.thread.is_alive())
+        self.assertTrue(openkit._beacon_cache_evictor.is_alive())
+
+    def test_prefetch_only_starts_the_sender(self):
+        openkit = self.create_openkit()
+        self.assertTrue(openkit.wait_for_init_completion(5000))
+        self.assertIsNone(openkit._session_watchdog.thread)
+        self.assertFalse(openkit._beacon_cache_evictor.is_alive())
+
+    def test_idle_sender_parks_and_restarts(self):
+        openkit = self.create_openkit(idle_timeout=0.1)
+        self.assertTrue(openkit.wait_for_init_completion(5000))
+        sender = openkit._beacon_sender
+
+        self.wait_until(lambda: not sender.thread.is_alive())
+        self.assertTrue(sender.context.parked)
+
+        session = openkit.create_session("1.2.3.4")
+        self.assertTrue(sender.thread.is_alive())
+        session.enter_action("after parking").leave_action()
+        session.end()
+
+        self.wait_until(lambda: any("na=after%20parking" in body for body in self.sent_bodies()))
+
+    @patch.object(BeaconSendingCaptureOffState, "STATUS_CHECK_INTERVAL", 200)
+    def test_sender_does_not_park_while_capture_is_off(self):
+        transport = LocalSinkTransport(self.directory, status_response={"appConfig": {"capture": 0}})
+        openkit = self.create_openkit(transport, idle_timeout=0.05)
+        sender = openkit._beacon_sender
+        self.wait_until(lambda: sender.context.init_succeeded)
+        self.assertIsInstance(openkit.create_session("1.2.3.4"), NullSession)
+
+        time.sleep(0.3)
+        self.assertTrue(sender.thread.is_alive())
+        self.assertFalse(sender.context.parked)
+
+        # The collector turns capture back on, the next status check picks it up
+        transport._status_body = json.dumps({"appConfig": {"capture": 1}}).encode("UTF-8")
+        self.wait_until(lambda: sender.capture_state.enabled)
+        self.assertIsInstance(openkit.create_session("1.2.3.4"), SessionProxy)
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from urllib.parse import unquote
+
+from openkit import OpenKit
+from openkit.core.objects.metrics_aggregator import MetricsAggregator
+from test.local_sink import LocalSinkTestCase
+
+
+class TestMetricsAggregator(LocalSinkTestCase):
+
+    def test_summary(self):
+        aggregator = MetricsAggregator((10, 100))
+        start = datetime(2024, 1, 1)
+        for i, value in enumerate((5, 10, 50, 500)):
+            aggregator.add("latency", value, start + timedelta(seconds=i))
+        aggregator.add("ratio", 0.5, start)
+
+        last = start + timedelta(seconds=3)
+        self.assertEqual(aggregator.summarize(), [
+            ("latency.count", 4, last),
+            ("latency.sum", 565, last),
+            ("latency.min", 5, last),
+            ("latency.max", 500, last),
+            ("latency.le_10", 2, last),
+            ("latency.le_100", 1, last),
+            ("latency.le_inf", 1, last),
+            ("ratio", 0.5, start),
+        ])
+
+    def test_bucket_bounds_must_increase(self):
+        for bucket_bounds in ((100, 10), (10, 10)):
+            with self.assertRaises(ValueError):
+                MetricsAggregator(bucket_bounds)
+            with self.assertRaises(ValueError):
+                OpenKit("http://localhost/mbeacon", "app", 1, logger=self.logger, aggregate_values=True,
+                        value_histogram_buckets=bucket_bounds)
+
+    def test_values_keep_the_timestamp_of_their_last_report(self):
+        openkit = self.create_openkit(aggregate_values=True)
+        action = openkit.create_session("1.2.3.4").enter_action("batch")
+        reported_at = datetime.now() - timedelta(minutes=1)
+        action.report_value("latency", 1, reported_at - timedelta(seconds=1))
+        action.report_value("latency", 2, reported_at)
+
+        with patch.object(action.beacon, "report_value") as report_value:
+            action.leave_action()
+        self.assertTrue(report_value.call_args_list)
+        for call in report_value.call_args_list:
+            self.assertEqual(call.args[3], reported_at)
+
+    def test_values_are_reported_when_the_action_is_left(self):
+        openkit = self.create_openkit(aggregate_values=True, value_histogram_buckets=(100,))
+        session = openkit.create_session("1.2.3.4")
+        action = session.enter_action("batch")
+        for i in range(1000):
+            action.report_value("item latency", i * 0.5)
+        action.report_value("status", "done")
+        action.leave_action()
+        session.end()
+        self.assertTrue(openkit.shutdown(5))
+
+        values = {}
+        for event_type in ("11", "12", "13"):
+            for event in self.sent_events(event_type):
+                pairs = self.event_values(event)
+                values[unquote(pairs["na"])] = (event_type, unquote(pairs["vl"]))
+
+        self.assertEqual(values, {
+            "item latency.count": ("12", "1000"),
+            "item latency.sum": ("13", "249750.0"),
+            "item latency.min": ("13", "0.0"),
+            "item latency.max": ("13", "499.5"),
+            "item latency.le_100": ("12", "201"),
+            "item latency.le_inf": ("12", "799"),
+            "status": ("11", "done"),
+        })
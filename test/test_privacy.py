@@ -0,0 +1,61 @@
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+from openkit.api.constants import CrashReportingLevel as ApiCrashReportingLevel
+from openkit.api.constants import DataCollectionLevel as ApiDataCollectionLevel
+from openkit.core.configuration.privacy_configuration import (CrashReportingLevel, DataCollectionLevel,
+                                                              PrivacyConfiguration)
+from openkit.core.objects.null_action import NullAction
+from openkit.core.objects.null_web_request_tracer import NullWebRequestTracer
+from openkit.core.objects.root_action import RootActionImpl
+
+
+def create_action(level: DataCollectionLevel):
+    beacon = MagicMock()
+    beacon.capture_state.enabled = True
+    beacon.privacy_config = PrivacyConfiguration(level, CrashReportingLevel.OPT_IN_CRASHES)
+    beacon.value_histogram_buckets = None
+    parent = MagicMock()
+    parent.id = 0
+    return RootActionImpl(logging.getLogger("test"), parent, "action", beacon), beacon
+
+
+class TestPrivacy(unittest.TestCase):
+
+    def test_enums_are_shared(self):
+        self.assertIs(ApiDataCollectionLevel, DataCollectionLevel)
+        self.assertIs(ApiCrashReportingLevel, CrashReportingLevel)
+
+        config = PrivacyConfiguration(ApiDataCollectionLevel.USER_BEHAVIOR, ApiCrashReportingLevel.OPT_IN_CRASHES)
+        self.assertTrue(config.crash_reporting_allowed)
+        self.assertTrue(config.user_identification_allowed)
+
+    def test_user_behavior_reports_everything(self):
+        action, beacon = create_action(DataCollectionLevel.USER_BEHAVIOR)
+        action.report_event("event")
+        action.report_value("value", 1)
+        action.report_error("error", 1, "reason")
+
+        self.assertTrue(beacon.report_event.called)
+        self.assertTrue(beacon.report_value.called)
+        self.assertTrue(beacon.report_error.called)
+
+    def test_performance_drops_events_and_values(self):
+        action, beacon = create_action(DataCollectionLevel.PERFORMANCE)
+        action.report_event("event")
+        action.report_value("value", 1)
+        action.report_error("error", 1, "reason")
+
+        self.assertFalse(beacon.report_event.called)
+        self.assertFalse(beacon.report_value.called)
+        self.assertTrue(beacon.report_error.called)
+        self.assertNotIsInstance(action.trace_web_request("https://example.com"), NullWebRequestTracer)
+
+    def test_off_drops_everything(self):
+        action, beacon = create_action(DataCollectionLevel.OFF)
+        action.report_error("error", 1, "reason")
+
+        self.assertFalse(beacon.report_error.called)
+        self.assertIsInstance(action.enter_action("child"), NullAction)
+        self.assertIsInstance(action.trace_web_request("https://example.com"), NullWebRequestTracer)
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+import unittest
+from http.client import HTTPMessage
+from unittest.mock import MagicMock
+
+from openkit.core.communication import BeaconSendingCaptureOnState
+from openkit.core.waiter import Waiter
+from openkit.protocol.http_client import HttpClient
+from openkit.protocol.rate_limiter import AdaptiveRateLimiter
+from openkit.protocol.transport import LocalSinkTransport
+from openkit.vendor.mureq import mureq
+from test.local_sink import LocalSinkTestCase
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+
+    def test_unlimited_by_default(self):
+        limiter = AdaptiveRateLimiter()
+        for _ in range(1000):
+            assert limiter.reserve(1024 * 1024) == 0
+
+    def test_requests_per_second(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_requests_per_second=10, clock=clock, sleep=clock.sleep)
+
+        # The first second worth of requests is a burst, after that requests are spaced out
+        for _ in range(10):
+            limiter.acquire()
+        assert clock.now == 0
+
+        for _ in range(10):
+            limiter.acquire()
+        self.assertAlmostEqual(clock.now, 1.0)
+
+    def test_bytes_per_second(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_bytes_per_second=1000, clock=clock)
+
+        assert limiter.reserve(1000) == 0
+        self.assertAlmostEqual(limiter.reserve(500), 0.5)
+
+    def test_aimd(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_requests_per_second=100, clock=clock)
+
+        limiter.on_response(429)
+        assert limiter.rate_fraction == 0.5
+        limiter.on_response(503)
+        assert limiter.rate_fraction == 0.25
+
+        limiter.on_response(200)
+        self.assertAlmostEqual(limiter.rate_fraction, 0.25 + AdaptiveRateLimiter.INCREASE_STEP)
+
+        # Client errors other than 429 do not change the rate
+        limiter.on_response(404)
+        self.assertAlmostEqual(limiter.rate_fraction, 0.25 + AdaptiveRateLimiter.INCREASE_STEP)
+
+        for _ in range(100):
+            limiter.on_response(500)
+        assert limiter.rate_fraction == AdaptiveRateLimiter.MIN_RATE_FRACTION
+
+        for _ in range(100):
+            limiter.on_response(200)
+        assert limiter.rate_fraction == 1.0
+
+    def test_retry_after(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_requests_per_second=1000, clock=clock)
+
+        limiter.on_response(429, 30)
+        assert limiter.reserve() == 30
+        clock.now = 31
+        assert limiter.reserve() == 0
+
+    def test_acquire_skips_requests_after_the_deadline(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_requests_per_second=1000, clock=clock, sleep=clock.sleep)
+
+        limiter.on_response(429, 30)
+        assert not limiter.acquire(deadline=5)
+        assert clock.now == 0
+        assert limiter.acquire(deadline=40)
+        assert clock.now == 30
+
+    def test_interrupted_acquire_skips_the_request(self):
+        limiter = AdaptiveRateLimiter(max_requests_per_second=1000)
+        limiter.on_response(429, 30)
+
+        waits = []
+        assert not limiter.acquire(wait=lambda seconds: waits.append(seconds) or True)
+        assert len(waits) == 1 and 29 < waits[0] <= 30
+
+    def test_unlimited_limiter_caps_at_the_observed_rate(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(clock=clock)
+        for _ in range(40):
+            limiter.reserve()
+            clock.now += 0.25
+        self.assertIsNone(limiter.max_requests_per_second)
+
+        limiter.on_response(429)
+        self.assertAlmostEqual(limiter.max_requests_per_second, 4)
+        assert limiter.rate_fraction == 0.5
+        # The bucket holds one second worth of tokens at the halved rate of 2 requests per second
+        self.assertEqual([limiter.reserve() for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(limiter.reserve(), 0.5)
+
+        # Back at the cap, further successes raise it additively
+        for _ in range(10):
+            limiter.on_response(200)
+        assert limiter.rate_fraction == 1.0
+        limiter.on_response(200)
+        self.assertAlmostEqual(limiter.max_requests_per_second, 4 * (1 + AdaptiveRateLimiter.INCREASE_STEP))
+
+    def test_shutdown_interrupts_the_retry_after_wait(self):
+        transport = MagicMock()
+        waiter = Waiter()
+        shutdown = threading.Event()
+        http_client = HttpClient(logging.getLogger("test"), "http://localhost/mbeacon", 1, "app", True,
+                                 transport=transport, wait=lambda seconds: waiter.wait(seconds, shutdown.is_set))
+        http_client.rate_limiter.on_response(429, 30)
+
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(http_client.send_status_request(None)))
+        thread.start()
+        time.sleep(0.1)
+
+        http_client.deadline = time.monotonic() + 5
+        shutdown.set()
+        waiter.notify_all()
+        thread.join(1)
+
+        assert not thread.is_alive()
+        assert responses[0].is_error_response()
+        transport.request.assert_not_called()
+
+
+class RateLimitedSinkTransport(LocalSinkTransport):
+    """Answers the first beacon requests with 429 and Retry-After instead of writing them."""
+
+    def __init__(self, directory: str, rejections: int, retry_after: float):
+        super().__init__(directory)
+        self.rejections = rejections
+        self.retry_after = retry_after
+
+    def request(self, method, url, headers, body, timeout):
+        if method == "POST" and self.rejections > 0:
+            self.rejections -= 1
+            response_headers = HTTPMessage()
+            response_headers["Retry-After"] = str(self.retry_after)
+            return mureq.Response(url, 429, response_headers, b"")
+        return super().request(method, url, headers, body, timeout)
+
+
+class TestTooManyRequests(LocalSinkTestCase):
+
+    def test_sender_backs_off_without_dropping_data(self):
+        transport = RateLimitedSinkTransport(self.directory, rejections=1, retry_after=0.5)
+        openkit = self.create_openkit(transport)
+        session = openkit.create_session("1.2.3.4")
+        session.enter_action("rate limited").leave_action()
+        session.end()
+
+        context = openkit._beacon_sender.context
+        deadline = time.monotonic() + 5
+        while transport.rejections and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(transport.rejections, 0)
+        rejected_at = time.monotonic()
+
+        # The sender waits for Retry-After in capture on, the records stay in the cache until then
+        self.assertIsInstance(context.current_state, BeaconSendingCaptureOnState)
+        self.assertTrue(context.capture_state.enabled)
+        self.assertTrue(openkit.shutdown(5))
+        self.assertGreaterEqual(time.monotonic() - rejected_at, 0.4)
+        self.assertTrue(any("na=rate%20limited" in body for body in self.sent_bodies()))
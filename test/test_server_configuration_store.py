@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from openkit import OpenKit
+from openkit.core.configuration.server_configuration import ServerConfiguration
+from openkit.core.configuration.server_configuration_store import ServerConfigurationStore
+
+
+class TestServerConfigurationStore(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "server_configuration.json")
+        self.logger = logging.getLogger("test")
+
+    def create_store(self, application_id="app", max_age_ms=60 * 1000):
+        return ServerConfigurationStore(self.logger, self.path, application_id, max_age_ms)
+
+    def test_round_trip(self):
+        self.create_store().save(ServerConfiguration(multiplicity=3), 30 * 1000, {"http://localhost/mbeacon": 7})
+
+        snapshot = self.create_store().load()
+        self.assertEqual(snapshot.server_configuration.multiplicity, 3)
+        self.assertEqual(snapshot.send_interval, 30 * 1000)
+        self.assertEqual(snapshot.server_ids, {"http://localhost/mbeacon": 7})
+
+    def test_unusable_snapshots_are_ignored(self):
+        self.assertIsNone(self.create_store().load())
+
+        self.create_store().save(ServerConfiguration(), 1000, {})
+        self.assertIsNone(self.create_store(application_id="other").load())
+
+        with open(self.path, encoding="UTF-8") as file:
+            snapshot = json.load(file)
+        snapshot["saved_at"] -= 2 * 60 * 1000
+        with open(self.path, "w", encoding="UTF-8") as file:
+            json.dump(snapshot, file)
+        self.assertIsNone(self.create_store().load())
+
+        with open(self.path, "w", encoding="UTF-8") as file:
+            file.write("{")
+        self.assertIsNone(self.create_store().load())
+
+    def test_malformed_snapshots_are_ignored(self):
+        self.create_store().save(ServerConfiguration(), 1000, {})
+        with open(self.path, encoding="UTF-8") as file:
+            valid = json.load(file)
+
+        malformed = [
+            None,
+            [valid],
+            {**valid, "server_configuration": None},
+            {key: value for key, value in valid.items() if key != "send_interval"},
+            {key: value for key, value in valid.items() if key != "server_configuration"},
+            {**valid, "saved_at": "yesterday"},
+        ]
+        for snapshot in malformed:
+            with open(self.path, "w", encoding="UTF-8") as file:
+                json.dump(snapshot, file)
+            self.assertIsNone(self.create_store().load(), snapshot)
+
+        transport = MagicMock()
+        transport.request.side_effect = OSError("collector unreachable")
+        openkit = OpenKit("http://localhost/mbeacon", "app", 1, logger=self.logger, transport=transport,
+                          server_configuration_path=self.path)
+        self.addCleanup(openkit.shutdown, 1)
+        self.assertFalse(openkit.wait_for_init_completion(200))
+        self.assertFalse(openkit._beacon_sender.context.terminal)
+
+    def test_unchanged_configuration_is_written_once(self):
+        store = self.create_store()
+        store.save(ServerConfiguration(), 1000, {})
+        modified = os.stat(self.path).st_mtime_ns
+        os.utime(self.path, ns=(modified - 10 ** 9, modified - 10 ** 9))
+
+        store.save(ServerConfiguration(), 1000, {})
+        self.assertEqual(os.stat(self.path).st_mtime_ns, modified - 10 ** 9)
+
+        store.save(ServerConfiguration(multiplicity=2), 1000, {})
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, modified - 10 ** 9)
+
+    def test_openkit_starts_from_the_snapshot(self):
+        self.create_store().save(ServerConfiguration(multiplicity=3), 30 * 1000, {})
+
+        transport = MagicMock()
+        transport.request.side_effect = OSError("collector unreachable")
+        openkit = OpenKit("http://localhost/mbeacon", "app", 1, logger=self.logger, transport=transport,
+                          server_configuration_path=self.path)
+        self.addCleanup(openkit.shutdown, 1)
+
+        start = time.monotonic()
+        self.assertTrue(openkit.wait_for_init_completion(5000))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(openkit._beacon_sender.last_server_configuration.multiplicity, 3)
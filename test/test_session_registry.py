@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import MagicMock
+
+from openkit.core.objects.session import SessionState
+from openkit.core.session_registry import SessionRegistry
+
+
+def create_session(configured=False):
+    session = MagicMock()
+    session.beacon.server_configuration_set = configured
+    session.state = SessionState(session)
+    return session
+
+
+class TestSessionRegistry(unittest.TestCase):
+
+    def test_sessions_follow_their_state(self):
+        registry = SessionRegistry()
+        new_session = create_session()
+        open_session = create_session(configured=True)
+        registry.add(new_session)
+        registry.add(open_session)
+
+        self.assertEqual(registry.not_configured_sessions(), [new_session])
+        self.assertEqual(registry.open_and_configured_sessions(), [open_session])
+        self.assertEqual(registry.finished_and_configured_sessions(), [])
+
+        new_session.beacon.server_configuration_set = True
+        new_session.state.notify_configured()
+        open_session.state.mark_as_finished()
+
+        self.assertEqual(registry.not_configured_sessions(), [])
+        self.assertEqual(registry.open_and_configured_sessions(), [new_session])
+        self.assertEqual(registry.finished_and_configured_sessions(), [open_session])
+
+        registry.remove(open_session)
+        self.assertEqual(len(registry), 1)
+        self.assertIsNone(open_session.state.registry)
+
+    def test_session_finished_before_configuration(self):
+        registry = SessionRegistry()
+        session = create_session()
+        registry.add(session)
+
+        session.state.mark_as_finished()
+        self.assertEqual(registry.not_configured_sessions(), [session])
+
+        session.beacon.server_configuration_set = True
+        session.state.notify_configured()
+        self.assertEqual(registry.finished_and_configured_sessions(), [session])
+        self.assertEqual(registry.open_and_configured_sessions(), [])
@@ -1,3 +1,4 @@
+import time
 import unittest
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock
@@ -37,7 +38,8 @@ class TestSessionWatchdog(unittest.TestCase):
         session_2.current_session.beacon.session_start_time = datetime.now() - timedelta(milliseconds=2000)  # Session started 2 seconds ago
 
         # Add the sessions to be split by timeout
-        watchdog.sessions_to_split_by_timeout.extend([session_1, session_2])
+        watchdog.add_to_split_by_timeout(session_1)
+        watchdog.add_to_split_by_timeout(session_2)
 
         watchdog.split_timed_out_sessions()
 
@@ -46,3 +48,28 @@ class TestSessionWatchdog(unittest.TestCase):
 
         # Check that split_and_create_initial_session was NOT called (it is still under the timeout time)
         self.assertFalse(session_2.split_and_create_initial_session.called)
+
+        # Both sessions stay scheduled, session 2 is due once it has been idle for its timeout
+        self.assertEqual(len(watchdog.sessions_to_split_by_timeout), 2)
+        watchdog.remove_from_split_by_timeout(session_1)
+        self.assertAlmostEqual(watchdog.time_to_next_deadline(), 0.5, delta=0.1)
+
+    def test_dequeued_sessions_are_skipped(self):
+        watchdog = SessionWatchdogContext()
+        session_1 = MagicMock()
+        session_1.try_end.return_value = False
+        session_2 = MagicMock()
+        session_2.try_end.return_value = False
+
+        watchdog.close_or_enqueue_for_closing(session_1, timedelta(seconds=-1))
+        watchdog.close_or_enqueue_for_closing(session_2, timedelta(seconds=10))
+        watchdog.dequeue_from_closing(session_1)
+        self.assertAlmostEqual(watchdog.time_to_next_deadline(), 10, delta=0.1)
+
+        watchdog.close_expired_sessions()
+        self.assertFalse(session_1.end.called)
+        self.assertFalse(session_2.end.called)
+
+        watchdog.close_expired_sessions(time.time() + 11)
+        session_2.end.assert_called_once_with(send_end_event=False)
+        self.assertIsNone(watchdog.time_to_next_deadline())
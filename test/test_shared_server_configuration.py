@@ -0,0 +1,56 @@
+import time
+
+from openkit.core.configuration.server_configuration import ServerConfiguration, SharedServerConfiguration
+from test.local_sink import LocalSinkTestCase
+
+
+class TestSharedServerConfiguration(LocalSinkTestCase):
+
+    def create_openkit(self, **options):
+        return super().create_openkit(status_response={"mobileAgentConfig": {"maxEventsPerSession": 50}}, **options)
+
+    def wait_until_configured(self, session):
+        deadline = time.monotonic() + 5
+        while not session.current_session.state.is_configured:
+            if time.monotonic() > deadline:
+                self.fail("session not configured in time")
+            time.sleep(0.01)
+
+    def test_publish_bumps_the_version_only_on_change(self):
+        shared = SharedServerConfiguration()
+        configuration = ServerConfiguration(multiplicity=2)
+
+        self.assertTrue(shared.publish(configuration))
+        self.assertFalse(shared.publish(configuration))
+        self.assertEqual(shared.version, 1)
+        self.assertIs(shared.current, configuration)
+
+    def test_updates_reach_live_sessions(self):
+        openkit = self.create_openkit()
+        sessions = [openkit.create_session("1.2.3.4") for _ in range(3)]
+        for session in sessions:
+            self.wait_until_configured(session)
+            self.assertEqual(session.server_config.max_events_per_session, 50)
+
+        context = openkit._beacon_sender.context
+        updated = ServerConfiguration(multiplicity=3, max_events_per_session=20)
+        context.server_configuration = updated
+
+        for session in sessions:
+            self.assertIs(session.current_session.beacon.configuration.server_configuration, updated)
+            self.assertIs(session.server_config, updated)
+
+    def test_proxy_splits_with_the_configuration_of_its_session(self):
+        openkit = self.create_openkit()
+        session = openkit.create_session("1.2.3.4")
+        self.wait_until_configured(session)
+        first_session = session.current_session
+
+        session.top_level_action_count = 49
+        session.enter_action("action").leave_action()
+        self.assertIs(session.current_session, first_session)
+
+        session.top_level_action_count = 50
+        session.enter_action("split").leave_action()
+        self.assertIsNot(session.current_session, first_session)
+        self.assertTrue(session.current_session.state.is_configured)
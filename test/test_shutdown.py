@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+from openkit.protocol.transport import LocalSinkTransport
+from test.local_sink import LocalSinkTestCase
+
+
+class SlowSinkTransport(LocalSinkTransport):
+    """Beacon requests take delay seconds, or block until released when delay is None."""
+
+    def __init__(self, directory: str, delay=None):
+        super().__init__(directory)
+        self.delay = delay
+        self.release = threading.Event()
+        self.beacon_timeouts = []
+        self.in_flight = 0
+        self.closed_in_flight = None
+
+    def request(self, method, url, headers, body, timeout):
+        if method == "POST":
+            self.beacon_timeouts.append(timeout)
+            self.in_flight += 1
+            try:
+                if self.delay is not None:
+                    time.sleep(self.delay)
+                elif not self.release.wait(timeout):
+                    raise TimeoutError("Beacon request timed out")
+            finally:
+                self.in_flight -= 1
+        return super().request(method, url, headers, body, timeout)
+
+    def close(self):
+        self.closed_in_flight = self.in_flight
+        super().close()
+
+
+class TestShutdown(LocalSinkTestCase):
+
+    def test_sessions_are_flushed_in_parallel(self):
+        openkit = self.create_openkit(SlowSinkTransport(self.directory, delay=0.2))
+        for i in range(8):
+            openkit.create_session(f"10.0.0.{i}").enter_action("action").leave_action()
+
+        start = time.monotonic()
+        self.assertTrue(openkit.shutdown(5))
+        # One request after the other would take 1.6 seconds
+        self.assertLess(time.monotonic() - start, 1.0)
+
+        beacons = [request for request in self.sent_requests() if request["method"] == "POST"]
+        self.assertEqual(len(beacons), 8)
+
+    def test_shutdown_returns_false_when_the_deadline_passes(self):
+        transport = SlowSinkTransport(self.directory)
+        openkit = self.create_openkit(transport)
+        self.addCleanup(transport.release.set)
+        openkit.create_session("1.2.3.4").enter_action("action").leave_action()
+
+        start = time.monotonic()
+        self.assertFalse(openkit.shutdown(0.5))
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_flush_stops_at_the_deadline(self):
+        transport = SlowSinkTransport(self.directory)
+        openkit = self.create_openkit(transport)
+        for i in range(16):
+            openkit.create_session(f"10.0.0.{i}").enter_action("action").leave_action()
+
+        self.assertFalse(openkit.shutdown(0.3))
+        sender_thread = openkit._beacon_sender.thread
+        sender_thread.join(5)
+        self.assertFalse(sender_thread.is_alive())
+
+        # Only the first request of each flush thread was sent, none of them outlived the deadline
+        self.assertEqual(len(transport.beacon_timeouts), 8)
+        self.assertTrue(all(timeout <= 0.3 for timeout in transport.beacon_timeouts))
+        self.assertEqual(transport.closed_in_flight, 0)
+
+    def test_shutdown_without_timeout_does_not_wait_for_the_flush(self):
+        transport = SlowSinkTransport(self.directory)
+        openkit = self.create_openkit(transport)
+        self.addCleanup(transport.release.set)
+        openkit.create_session("1.2.3.4").enter_action("action").leave_action()
+        self.assertFalse(openkit.shutdown())
+
+        idle = self.create_openkit(LocalSinkTransport(self.directory), wait_for_init=False, prefetch_status=False)
+        self.assertTrue(idle.shutdown())
+
+    def test_shutdown_timeout_at_exit(self):
+        script = textwrap.dedent(f"""
+            import logging
+            from openkit import OpenKit
+            from openkit.protocol.transport import LocalSinkTransport
+
+            openkit = OpenKit("http://localhost/mbeacon", "app", 1, logger=logging.getLogger("test"),
+                              transport=LocalSinkTransport({self.directory!r}), shutdown_timeout_at_exit=5)
+            openkit.wait_for_init_completion(5000)
+            openkit.create_session("1.2.3.4").enter_action("exiting").leave_action()
+        """)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", script], cwd=root, check=True, timeout=30)
+
+        self.assertTrue(any("na=exiting" in body for body in self.sent_bodies()))
@@ -0,0 +1,37 @@
+from unittest.mock import MagicMock
+
+from openkit.core.objects.null_session import NullSession
+from openkit.core.objects.session_proxy import SessionProxy
+from openkit.protocol.status_response import StatusResponse
+from openkit.providers.traffic_control import traffic_control_value
+from test.local_sink import LocalSinkTestCase
+
+
+class TestTrafficControl(LocalSinkTestCase):
+
+    def create_sampling_openkit(self, percentage):
+        status = {"appConfig": {"capture": 1, "trafficControlPercentage": percentage}}
+        return self.create_openkit(status_response=status)
+
+    def test_status_response_percentage(self):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"appConfig": {"trafficControlPercentage": 25}}
+        self.assertEqual(StatusResponse(response).traffic_control_percentage, 25)
+        self.assertEqual(StatusResponse(None).traffic_control_percentage, 100)
+
+    def test_value_is_deterministic_per_device(self):
+        self.assertEqual(traffic_control_value(42), traffic_control_value(42))
+        values = {traffic_control_value(device_id) for device_id in range(1000)}
+        self.assertTrue(all(0 <= value < 100 for value in values))
+        self.assertGreater(len(values), 90)
+
+    def test_sampled_out_sessions_are_null_sessions(self):
+        openkit = self.create_sampling_openkit(0)
+        self.assertIsInstance(openkit.create_session("1.2.3.4"), NullSession)
+
+        openkit = self.create_sampling_openkit(50)
+        sampled_in = next(d for d in range(100) if traffic_control_value(d) < 50)
+        sampled_out = next(d for d in range(100) if traffic_control_value(d) >= 50)
+        self.assertIsInstance(openkit.create_session("1.2.3.4", device_id=sampled_out), NullSession)
+        self.assertIsInstance(openkit.create_session("1.2.3.4", device_id=sampled_in), SessionProxy)
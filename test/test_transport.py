@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+from openkit.protocol.transport import LocalSinkTransport, PooledHttpTransport, replay_ndjson
+from openkit.vendor.mureq.mureq import Response
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def handle_one_request(self):
+        KeepAliveHandler.connections.add(self.client_address)
+        super().handle_one_request()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("content-length", 0)))
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTransport(unittest.TestCase):
+
+    def test_pooled_transport_reuses_connections(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        transport = PooledHttpTransport()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/mbeacon?type=m"
+            for i in range(5):
+                response = transport.request("POST", url, {}, f"data{i}".encode(), 5)
+                assert response.status_code == 200
+                assert response.body == f"data{i}".encode()
+
+            assert len(KeepAliveHandler.connections) == 1
+        finally:
+            transport.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_local_sink_and_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sink = LocalSinkTransport(directory, max_file_size_in_bytes=400, max_files=3)
+            status = sink.request("GET", "https://collector/mbeacon?type=m&srvid=1", {}, None, 1)
+            assert status.status_code == 200
+            assert json.loads(status.body)["appConfig"]["capture"] == 1
+
+            for i in range(10):
+                sink.request("POST", "https://collector/mbeacon?type=m&srvid=1", {"X-Client-IP": "1.2.3.4"},
+                             f"vv=3&sn={i}".encode(), 1)
+            sink.close()
+
+            # Files were rotated and old ones dropped
+            files = sorted(os.listdir(directory))
+            assert files == ["beacons.ndjson", "beacons.ndjson.1", "beacons.ndjson.2"]
+
+            target = MagicMock()
+            target.request.return_value = Response("", 200, {}, b"{}")
+            accepted = replay_ndjson(os.path.join(directory, "beacons.ndjson"), target, "http://other/mbeacon")
+            assert accepted == target.request.call_count > 0
+
+            method, url, headers, body, _ = target.request.call_args[0]
+            assert method == "POST"
+            assert url == "http://other/mbeacon?type=m&srvid=1"
+            assert headers == {"X-Client-IP": "1.2.3.4"}
+            assert body == b"vv=3&sn=9"